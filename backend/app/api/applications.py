@@ -11,6 +11,8 @@ from app.schemas.application import (
 from app.services.application_service import ApplicationService
 from app.services.auth_service import AuthService
 from app.core.config import settings
+from app.core.pagination import list_page_size, next_cursor, page_size
+from app.core.streaming import ndjson_response
 
 
 # Create router for applications endpoints
@@ -48,6 +50,9 @@ async def get_current_user_from_token(
 @router.get("/my-applications")
 async def get_my_applications(
     status_filter: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
     access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
     authorization: Optional[str] = Header(None)
 ):
@@ -57,17 +62,28 @@ async def get_my_applications(
     
     Query params:
         status_filter: Optional filter (APPLIED, COMPLETED, CANCELLED)
+        limit: Page size (the full list is returned without limit or cursor)
+        cursor: next_cursor from the previous page
+        stream: Return every application as NDJSON instead of a page
     """
     user = await get_current_user_from_token(access_token, authorization)
 
     # Always scope by JWT subject (Mongo user _id), never by frontend-provided ids
     user_id = user.get("user_id")
     
-    applications = await ApplicationService.get_user_applications(user_id, status_filter)
+    if stream:
+        return ndjson_response(ApplicationService.stream_user_applications(user_id, status_filter))
+    
+    limit = list_page_size(limit, cursor)
+    try:
+        applications = await ApplicationService.get_user_applications(user_id, status_filter, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return {
         "applications": applications,
-        "count": len(applications)
+        "count": len(applications),
+        "next_cursor": next_cursor(applications, limit, "created_at")
     }
 
 
@@ -161,6 +177,36 @@ async def get_application(
     }
 
 
+@router.get("/{application_id}/messages")
+async def get_application_messages(
+    application_id: str,
+    before: Optional[int] = None,
+    limit: Optional[int] = None,
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Get the application's chat thread, one page at a time (oldest first within a page)
+    Pass the returned next_before as `before` to load older messages
+    """
+    user = await get_current_user_from_token(access_token, authorization)
+
+    page = await ApplicationService.get_application_messages(
+        application_id,
+        user.get("user_id"),
+        before=before,
+        limit=page_size(limit or settings.THREAD_PAGE_SIZE),
+    )
+
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Application not found"
+        )
+
+    return page
+
+
 @router.post("/{application_id}/messages")
 async def send_application_message(
     application_id: str,
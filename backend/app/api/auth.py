@@ -19,6 +19,7 @@ from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse, ErrorRe
 from app.services.auth_service import AuthService
 from app.core.config import settings
 from app.core.database import Database
+from app.core.security import PasswordHasherBusy
 import os
 from uuid import uuid4
 from bson import ObjectId
@@ -108,6 +109,7 @@ async def upload_resume(
         {"_id": ObjectId(user_id)},
         {"$set": update_payload}
     )
+    AuthService.invalidate_cached_user(user_id)
     return {"resume_url": resume_url, "resume_text": resume_text, "resume_embedding": (resume_embedding is not None), "message": "Resume uploaded and text extracted successfully."}
 
 
@@ -159,6 +161,7 @@ async def upload_profile_photo(
         {"_id": ObjectId(user_id)},
         {"$set": {"profile_photo": profile_photo_url, "updated_at": datetime.utcnow()}}
     )
+    AuthService.invalidate_cached_user(user_id)
     
     return {
         "profile_photo": profile_photo_url,
@@ -178,6 +181,15 @@ class UpdateProfileRequest(BaseModel):
     resume_url: Optional[str] = None
 
 
+def _password_hasher_busy() -> HTTPException:
+    """Fast 429 returned when the bcrypt pool is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts in progress. Please try again shortly.",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(signup_data: SignupRequest, response: Response):
     """
@@ -192,9 +204,13 @@ async def signup(signup_data: SignupRequest, response: Response):
         
     Raises:
         HTTPException 400: If user already exists
+        HTTPException 429: If the password hashing queue is saturated
     """
     # Create new user using auth service
-    user = await AuthService.create_user(signup_data)
+    try:
+        user = await AuthService.create_user(signup_data)
+    except PasswordHasherBusy:
+        raise _password_hasher_busy()
     
     if not user:
         # User already exists
@@ -205,7 +221,10 @@ async def signup(signup_data: SignupRequest, response: Response):
     
     # Authenticate the newly created user to get token
     login_request = LoginRequest(email=signup_data.email, password=signup_data.password)
-    auth_result = await AuthService.authenticate_user(login_request)
+    try:
+        auth_result = await AuthService.authenticate_user(login_request)
+    except PasswordHasherBusy:
+        raise _password_hasher_busy()
     
     if not auth_result:
         raise HTTPException(
@@ -247,9 +266,13 @@ async def login(login_data: LoginRequest, response: Response):
         
     Raises:
         HTTPException 401: If credentials are invalid
+        HTTPException 429: If the password hashing queue is saturated
     """
     # Authenticate user using auth service
-    auth_result = await AuthService.authenticate_user(login_data)
+    try:
+        auth_result = await AuthService.authenticate_user(login_data)
+    except PasswordHasherBusy:
+        raise _password_hasher_busy()
     
     if not auth_result:
         # Invalid credentials or inactive account
@@ -279,16 +302,35 @@ async def login(login_data: LoginRequest, response: Response):
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(
+    response: Response,
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None)
+):
     """
-    Logout user by clearing the authentication cookie
+    Logout user by revoking the token and clearing the authentication cookie
     
     Args:
         response: Response object to clear cookie
+        access_token: JWT token from cookie
+        authorization: Bearer token from Authorization header
         
     Returns:
         Success message
     """
+    token = access_token
+    if not token and authorization:
+        parts = authorization.split()
+        if len(parts) == 2 and parts[0].lower() == "bearer":
+            token = parts[1]
+
+    # Revoke the token so it stops working even if a copy is kept elsewhere
+    if token:
+        try:
+            await AuthService.revoke_token(token)
+        except Exception as e:
+            print(f"Error revoking token on logout: {e}")
+
     # Clear the authentication cookie
     response.delete_cookie(
         key=settings.COOKIE_NAME,
@@ -300,6 +342,37 @@ async def logout(response: Response):
     return {"message": "Logout successful"}
 
 
+@router.post("/logout-all")
+async def logout_all(
+    response: Response,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Logout user everywhere by revoking every token issued to them so far
+    
+    Args:
+        response: Response object to clear cookie
+        user_id: Authenticated user's ID
+        
+    Returns:
+        Success message
+        
+    Raises:
+        HTTPException 401: If not authenticated
+    """
+    await AuthService.revoke_user_sessions(user_id, reason="logout_all")
+
+    # Clear the authentication cookie
+    response.delete_cookie(
+        key=settings.COOKIE_NAME,
+        httponly=settings.COOKIE_HTTPONLY,
+        secure=settings.COOKIE_SECURE,
+        samesite=settings.COOKIE_SAMESITE
+    )
+    
+    return {"message": "Logged out of all sessions"}
+
+
 @router.get("/me", response_model=dict)
 async def get_current_user(
     access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
@@ -346,10 +419,18 @@ async def get_current_user(
             detail="Invalid or expired token"
         )
     
+    # Load full profile (resume, contact details) only for this endpoint
+    profile = await AuthService.load_user_profile(user_data["user_id"])
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+    
     # Return user data
     return {
         "message": "User authenticated",
-        "user": user_data
+        "user": profile
     }
 
 
@@ -463,6 +544,7 @@ async def update_profile(
             {"_id": ObjectId(user_data["user_id"])},
             {"$set": update_dict}
         )
+        AuthService.invalidate_cached_user(user_data["user_id"])
         
         if result.modified_count == 0:
             raise HTTPException(
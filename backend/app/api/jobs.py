@@ -7,15 +7,18 @@ from typing import Optional, List
 from app.schemas.job import (
     CreateJobRequest, UpdateJobRequest, JobResponse, 
     ApplyJobRequest, ApplicationResponse,
-    UpdateApplicationStatusRequest, SendApplicantMessageRequest
+    UpdateApplicationStatusRequest, SendApplicantMessageRequest,
+    BulkUpdateApplicationStatusRequest
 )
 from app.services.job_service import JobService
 from app.services.auth_service import AuthService
 from app.core.config import settings
 from app.api.auth import extract_keywords_from_text
 import re
-from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.core.database import Database
+from app.core.pagination import list_page_size, next_cursor, page_size
+from app.core.streaming import ndjson_response
 
 
 # Create router for job endpoints
@@ -87,55 +90,94 @@ async def get_jobs(
     status: str = "open",
     skip: int = 0,
     limit: int = 20,
-    employer_id: Optional[str] = None
+    employer_id: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """
     Get list of jobs with optional filters
     Public endpoint - no authentication required
+    
+    Pass the returned next_cursor as `cursor` to fetch the following page.
+    `skip` is deprecated: it makes MongoDB walk every earlier document.
     """
-    jobs = await JobService.get_jobs(job_type, category, status, skip, limit, employer_id)
+    try:
+        jobs = await JobService.get_jobs(job_type, category, status, skip, limit, employer_id, cursor=cursor)
+    except ValueError as e:
+        # `status` is shadowed by the query parameter here
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "jobs": jobs,
-        "count": len(jobs)
+        "count": len(jobs),
+        "next_cursor": next_cursor(jobs, limit, "created_at")
     }
 
 
 @router.get("/my-jobs")
 async def get_my_posted_jobs(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
     access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
     authorization: Optional[str] = Header(None)
 ):
     """
-    Get all jobs posted by current user
+    Get jobs posted by current user, newest first
     Requires authentication
+    
+    Pass `limit` to page through results and the returned next_cursor as `cursor` to fetch
+    the following page; without either the full list is returned.
+    With `stream=true` every job is returned as NDJSON (one job per line).
     """
     user = await get_current_user_from_token(access_token, authorization)
     
-    jobs = await JobService.get_user_posted_jobs(user["user_id"])
+    if stream:
+        return ndjson_response(JobService.stream_user_posted_jobs(user["user_id"]))
+    
+    limit = list_page_size(limit, cursor)
+    try:
+        jobs = await JobService.get_user_posted_jobs(user["user_id"], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return {
         "jobs": jobs,
-        "count": len(jobs)
+        "count": len(jobs),
+        "next_cursor": next_cursor(jobs, limit, "created_at")
     }
 
 
 @router.get("/my-applications")
 async def get_my_applications(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
     access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
     authorization: Optional[str] = Header(None)
 ):
     """
-    Get all job applications submitted by current user
+    Get job applications submitted by current user, most recent first
     Requires authentication
+    
+    Pass `limit` to page through results and the returned next_cursor as `cursor` to fetch
+    the following page; without either the full list is returned.
+    With `stream=true` every application is returned as NDJSON.
     """
     user = await get_current_user_from_token(access_token, authorization)
     
-    applications = await JobService.get_user_applications(user["user_id"])
+    if stream:
+        return ndjson_response(JobService.stream_user_applications(user["user_id"]))
+    
+    limit = list_page_size(limit, cursor)
+    try:
+        applications = await JobService.get_user_applications(user["user_id"], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return {
         "applications": applications,
-        "count": len(applications)
+        "count": len(applications),
+        "next_cursor": next_cursor(applications, limit, "applied_at")
     }
 
 
@@ -148,17 +190,11 @@ async def get_long_term_job_matches(
     Get long-term jobs sorted by match with user's resume keywords
     """
     user = await get_current_user_from_token(access_token, authorization)
-    users_collection = Database.get_collection("users")
-    # ensure ObjectId
-    try:
-        user_obj_id = ObjectId(user["user_id"]) if not isinstance(user["user_id"], ObjectId) else user["user_id"]
-    except Exception:
-        user_obj_id = user["user_id"]
-
-    user_doc = await users_collection.find_one({"_id": user_obj_id})
-    resume_text = user_doc.get("resume_text", "") if user_doc else ""
+    # Resume text and embedding are only loaded here, never on the auth path
+    user_doc = await AuthService.load_user_profile(user["user_id"], include_embedding=True)
+    resume_text = (user_doc.get("resume_text") or "") if user_doc else ""
 
-    jobs = await JobService.get_jobs(job_type="long_term", status="open")
+    jobs = await JobService.get_jobs(job_type="long_term", status="open", projection="match")
     # Include sample/seeded jobs in results so Explore can show seeded content.
     # We will prefer real posted jobs over samples when sorting the final list.
 
@@ -195,6 +231,10 @@ async def get_long_term_job_matches(
 
     jobs = [j for j in jobs if not requires_more_than_two_years(j)]
 
+    # Exclude jobs the user already applied to
+    applied_job_ids = await JobService.get_applied_job_ids(user["user_id"], [j["_id"] for j in jobs])
+    jobs = [j for j in jobs if j["_id"] not in applied_job_ids]
+
     matched_jobs = []
 
     # Prefer semantic embedding matching when both resume and job embeddings are present
@@ -311,6 +351,10 @@ async def get_long_term_job_matches(
         return (is_sample, -int(job.get('matchScore', 0)))
 
     matched_jobs.sort(key=sort_key)
+
+    # Embeddings were only needed for scoring; never ship them to the client
+    for job in matched_jobs:
+        job.pop("embedding", None)
     return {"jobs": matched_jobs, "count": len(matched_jobs)}
 
 
@@ -417,16 +461,35 @@ async def apply_to_job(
 @router.get("/{job_id}/applicants")
 async def get_job_applicants(
     job_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    stream: bool = False,
     access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
     authorization: Optional[str] = Header(None)
 ):
     """
-    Get all applicants for a job
+    Get applicants for a job, most recent first
     Only job owner can access
+    
+    Pass `limit` to page through results and the returned next_cursor as `cursor` to fetch
+    the following page; without either the full list is returned.
+    With `stream=true` every applicant is returned as NDJSON.
     """
     user = await get_current_user_from_token(access_token, authorization)
     
-    applicants = await JobService.get_job_applicants(job_id, user["user_id"])
+    if stream:
+        if not await JobService.is_job_owner(job_id, user["user_id"]):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found or you don't have permission to view applicants"
+            )
+        return ndjson_response(JobService.stream_job_applicants(job_id))
+    
+    limit = list_page_size(limit, cursor)
+    try:
+        applicants = await JobService.get_job_applicants(job_id, user["user_id"], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     if applicants is None:
         raise HTTPException(
@@ -436,7 +499,45 @@ async def get_job_applicants(
     
     return {
         "applicants": applicants,
-        "count": len(applicants)
+        "count": len(applicants),
+        "next_cursor": next_cursor(applicants, limit, "applied_at")
+    }
+
+
+@router.patch("/{job_id}/applicants/status")
+async def bulk_update_applicant_status(
+    job_id: str,
+    request: BulkUpdateApplicationStatusRequest,
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Update many applicants at once (pending/negotiating/rejected)
+    Only job owner can access; sent to MongoDB as one bulk write
+    """
+    user = await get_current_user_from_token(access_token, authorization)
+
+    try:
+        result = await JobService.bulk_update_applicant_status(
+            job_id=job_id,
+            employer_id=user["user_id"],
+            updates=[update.model_dump() for update in request.updates],
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An applicant already has another active application for this job"
+        )
+
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or you don't have permission"
+        )
+
+    return {
+        "message": "Applicant statuses updated",
+        **result,
     }
 
 
@@ -451,13 +552,19 @@ async def update_applicant_status(
     """Update applicant status (pending/negotiating/accepted/rejected/completed)"""
     user = await get_current_user_from_token(access_token, authorization)
 
-    updated = await JobService.update_applicant_status(
-        job_id=job_id,
-        application_id=application_id,
-        employer_id=user["user_id"],
-        new_status=request.status,
-        negotiated_price=request.negotiated_price,
-    )
+    try:
+        updated = await JobService.update_applicant_status(
+            job_id=job_id,
+            application_id=application_id,
+            employer_id=user["user_id"],
+            new_status=request.status,
+            negotiated_price=request.negotiated_price,
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Applicant already has another active application for this job"
+        )
 
     if not updated:
         raise HTTPException(
@@ -471,6 +578,38 @@ async def update_applicant_status(
     }
 
 
+@router.get("/{job_id}/applicants/{application_id}/messages")
+async def get_applicant_messages(
+    job_id: str,
+    application_id: str,
+    before: Optional[int] = None,
+    limit: Optional[int] = None,
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Get an applicant's chat thread, one page at a time (oldest first within a page)
+    Pass the returned next_before as `before` to load older messages
+    """
+    user = await get_current_user_from_token(access_token, authorization)
+
+    page = await JobService.get_applicant_messages(
+        job_id=job_id,
+        application_id=application_id,
+        employer_id=user["user_id"],
+        before=before,
+        limit=page_size(limit or settings.THREAD_PAGE_SIZE),
+    )
+
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Applicant not found or you don't have permission"
+        )
+
+    return page
+
+
 @router.post("/{job_id}/applicants/{application_id}/messages")
 async def send_applicant_message(
     job_id: str,
@@ -547,6 +686,7 @@ async def seed_longterm_jobs(count: int = 10, make_sample: bool = True):
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow(),
             "is_active": True,
+            "applicants_count": 0,
             # Mark as sample only when requested
             **({"is_sample": True} if make_sample else {}),
             "status": "open",
@@ -1,28 +1,57 @@
 """
 Negotiation API — WebSocket-based real-time chat + REST helpers.
 Messages are held in-memory per session while the chat is active,
-then flushed to MongoDB as a single JSON doc when the session ends.
+then appended to MongoDB (only those not yet flushed) when the session ends or goes idle.
+Every live message is also journaled in micro-batches so a crash loses at most one batch window.
+With several workers, the one holding a negotiation's lease owns the session; the others keep a
+replica fed over the message bus and forward their clients' actions to the owner.
 """
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status, Cookie, Header
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Set
 from pydantic import BaseModel, Field
 from datetime import datetime
 from bson import ObjectId
+from pymongo import UpdateOne
+from app.core.bus import WORKER_ID, message_bus
 from app.core.database import Database
+from app.core.journal import negotiation_journal
+from app.core.leases import negotiation_leases
+from app.core.outbound import CONNECTION_CAP_CLOSE_CODE, OutboundSocket
+from app.core.shutdown import shutdown_coordinator
 from app.services.auth_service import AuthService
+from app.services.message_service import MessageService
+from app.services.notification_service import NotificationService
 from app.core.config import settings
 from app.api.notifications import NotificationManager
+from functools import partial
 import json
 import asyncio
+import time
 import uuid
 
 router = APIRouter(prefix="/api/negotiations", tags=["Negotiations"])
 
 
 # ── In-memory session store ───────────────────────────────────────────────
-# negotiation_id -> { "messages": [...], "connections": {user_id: ws}, "meta": {...} }
+# negotiation_id -> {
+#     "messages": [...], "connections": {user_id: OutboundSocket}, "meta": {...},
+#     "flushed": int,               # messages[:flushed] are already in MongoDB
+#     "message_count": int, "last_offer_amount": float | None,
+#     "owner": bool,                # holds the lease; replicas never persist or journal
+#     "remote": {worker_id: (connections, seen_at)},   # owner only: clients on other workers
+#     "approx_bytes": int,          # estimated memory held by messages (gauge only)
+# }
 active_sessions: Dict[str, dict] = {}
 
+# Seconds to wait after the last client disconnects before persisting and evicting a session
+SESSION_IDLE_FLUSH_SECONDS = 10
+
+# Pending idle flushes (replaced by one bulk flush on shutdown)
+_flush_tasks: Set[asyncio.Task] = set()
+
+# Renews owned leases and promotes replicas whose owner went away (multi-worker only)
+_ownership_task: Optional[asyncio.Task] = None
+
 
 # ── Auth helpers ──────────────────────────────────────────────────────────
 
@@ -68,8 +97,22 @@ def _col():
     return Database.get_collection("negotiations")
 
 
-def _notif_col():
-    return Database.get_collection("notifications")
+def _journal_col():
+    return Database.get_collection("negotiation_journal")
+
+
+def _channel(negotiation_id: str) -> str:
+    return f"negotiation:{negotiation_id}"
+
+
+def _count_filter(count: int) -> dict:
+    """Match a negotiation holding exactly `count` stored messages (documents predating message_count by array size)."""
+    return {
+        "$or": [
+            {"message_count": count},
+            {"message_count": {"$exists": False}, "messages": {"$size": count}},
+        ]
+    }
 
 
 def _serialize(doc):
@@ -78,53 +121,522 @@ def _serialize(doc):
     return doc
 
 
-async def _flush_session(negotiation_id: str, final_status: str = "closed", final_price: Optional[float] = None):
-    """Save in-memory messages to MongoDB and clean up the session."""
-    session = active_sessions.get(negotiation_id)
-    if not session:
-        return
+def _last_offer(doc: dict) -> Optional[float]:
+    """Latest offer of a stored negotiation (only documents from before last_offer_amount are scanned)."""
+    if "last_offer_amount" in doc:
+        return doc["last_offer_amount"]
+    for m in reversed(doc.get("messages", [])):
+        if m.get("offer_amount"):
+            return m["offer_amount"]
+    return None
 
-    col = _col()
+
+def _message_bytes(msg: dict) -> int:
+    """Rough memory estimate of a chat message (fixed dict overhead plus its values as text)."""
+    return 240 + sum(len(str(v)) for v in msg.values())
+
+
+def _session_from_doc(doc: dict) -> dict:
+    """Build an in-memory session from a stored negotiation; everything loaded counts as flushed."""
+    messages = list(doc.get("messages", []))
+    return {
+        "negotiation_id": str(doc["_id"]),
+        "messages": messages,
+        "connections": {},
+        "meta": {
+            "worker_id": str(doc["worker_id"]),
+            "employer_id": str(doc["employer_id"]),
+            "original_price": doc["original_price"],
+            "status": doc.get("status", "active"),
+        },
+        "flushed": len(messages),
+        "message_count": len(messages),
+        "last_offer_amount": _last_offer(doc),
+        "owner": False,
+        "remote": {},
+        "ready": asyncio.Event(),
+        "approx_bytes": sum(_message_bytes(m) for m in messages),
+    }
+
+
+def _record_message(session: dict, msg: dict) -> int:
+    """Add a message to a session and keep its summary fields current; returns its seq."""
+    seq = len(session["messages"])
+    session["messages"].append(msg)
+    session["message_count"] = seq + 1
+    session["approx_bytes"] += _message_bytes(msg)
+    if msg.get("offer_amount"):
+        session["last_offer_amount"] = msg["offer_amount"]
+    return seq
+
+
+def _append_message(session: dict, msg: dict):
+    """Add a message to an owned session and journal it."""
+    seq = _record_message(session, msg)
+    # Journaled within one batch window; the session flush appends it to the negotiation later
+    negotiation_journal.append({
+        "negotiation_id": session["negotiation_id"],
+        "seq": seq,
+        "message": msg,
+        "created_at": datetime.utcnow(),
+    })
+
+
+def _pending_update(session: dict, fields: Optional[dict] = None) -> tuple:
+    """
+    Update persisting only messages past the flushed watermark.
+    Returns (update, watermark); set session["flushed"] to the watermark once the write succeeds.
+    """
+    watermark = len(session["messages"])
     update: dict = {
         "$set": {
-            "messages": session["messages"],
-            "status": final_status,
+            "message_count": session["message_count"],
+            "last_offer_amount": session["last_offer_amount"],
             "updated_at": datetime.utcnow(),
+            **(fields or {}),
         }
     }
-    if final_price is not None:
-        update["$set"]["final_price"] = final_price
+    new_messages = session["messages"][session["flushed"]:watermark]
+    if new_messages:
+        update["$push"] = {"messages": {"$each": new_messages}}
+    return update, watermark
+
+
+async def _persist_session(negotiation_id: str, fields: Optional[dict] = None):
+    """
+    Append unflushed messages (and any extra fields) to the stored negotiation.
+    The append only applies while the stored count still equals the watermark; if journal
+    recovery already appended some of these messages the watermark catches up and it retries.
+    """
+    session = active_sessions.get(negotiation_id)
+    if not session:
+        return
+    col = _col()
+    for _ in range(2):
+        flushed = session["flushed"]
+        update, watermark = _pending_update(session, fields)
+        result = await col.update_one({"_id": ObjectId(negotiation_id), **_count_filter(flushed)}, update)
+        if result.matched_count:
+            session["flushed"] = max(session["flushed"], watermark)
+            break
+        stored = await col.find_one({"_id": ObjectId(negotiation_id)}, {"message_count": 1})
+        if not stored:
+            return
+        session["flushed"] = min(max(flushed, stored.get("message_count", 0)), len(session["messages"]))
 
-    await col.update_one({"_id": ObjectId(negotiation_id)}, update)
+    # Journal entries are only needed until their messages are stored
+    await _journal_col().delete_many({"negotiation_id": negotiation_id, "seq": {"$lt": session["flushed"]}})
+
+
+async def recover_sessions_from_journal() -> int:
+    """
+    Append journaled messages that never reached their negotiation (crash or kill before a flush).
+    Called on startup; sessions are then rebuilt from the negotiation document on the next
+    connect. Safe with several workers: each append only applies on top of the expected count.
+
+    Returns:
+        Number of negotiations recovered
+    """
+    journal = _journal_col()
+    col = _col()
+    recovered = 0
 
-    # Close all WebSocket connections
-    for uid, ws in list(session.get("connections", {}).items()):
+    for negotiation_id in await journal.distinct("negotiation_id"):
+        if negotiation_id in active_sessions:
+            continue
         try:
-            await ws.send_json({"type": "session_ended", "status": final_status, "final_price": final_price})
-            await ws.close()
-        except Exception:
-            pass
+            neg = await col.find_one({"_id": ObjectId(negotiation_id)}, {"message_count": 1, "last_offer_amount": 1})
+            if not neg:
+                await journal.delete_many({"negotiation_id": negotiation_id})
+                continue
+            if "message_count" in neg:
+                stored_count = neg["message_count"]
+            else:
+                legacy = await col.find_one({"_id": ObjectId(negotiation_id)}, {"messages": 1})
+                stored_count = len(legacy.get("messages", []))
+
+            # Only a gap-free run directly after the stored messages can be appended
+            missing = []
+            async for entry in journal.find({"negotiation_id": negotiation_id, "seq": {"$gte": stored_count}}).sort("seq", 1):
+                if entry["seq"] != stored_count + len(missing):
+                    break
+                missing.append(entry["message"])
+
+            if missing:
+                offers = [m["offer_amount"] for m in missing if m.get("offer_amount")]
+                result = await col.update_one(
+                    {"_id": ObjectId(negotiation_id), **_count_filter(stored_count)},
+                    {
+                        "$push": {"messages": {"$each": missing}},
+                        "$set": {
+                            "message_count": stored_count + len(missing),
+                            "last_offer_amount": offers[-1] if offers else neg.get("last_offer_amount"),
+                            "updated_at": datetime.utcnow(),
+                        },
+                    },
+                )
+                if not result.matched_count:
+                    continue  # Another worker appended first
+                recovered += 1
 
-    active_sessions.pop(negotiation_id, None)
+            await journal.delete_many({"negotiation_id": negotiation_id, "seq": {"$lt": stored_count + len(missing)}})
+        except Exception as e:
+            print(f"Error recovering negotiation {negotiation_id} from journal: {e}")
 
+    return recovered
 
-async def _broadcast(negotiation_id: str, message: dict, exclude_uid: Optional[str] = None):
-    """Broadcast a message to all WebSocket clients in a session."""
+
+async def _publish(negotiation_id: str, event: dict):
+    """Send a session event to the other workers serving this negotiation (no-op with one process)."""
+    if negotiation_leases.local:
+        return
+    try:
+        await message_bus.publish(_channel(negotiation_id), {**event, "origin": WORKER_ID})
+    except Exception as e:
+        print(f"Error publishing negotiation {negotiation_id} event: {e}")
+
+
+async def _open_session(negotiation_id: str, doc: dict) -> dict:
+    """
+    Get the local session of a negotiation, creating it from the stored document on first use.
+    The worker that wins the lease owns the session; otherwise a replica is kept and the owner
+    is asked for the messages it has not stored yet.
+    """
+    session = active_sessions.get(negotiation_id)
+    if session:
+        await session["ready"].wait()
+        return session
+
+    session = _session_from_doc(doc)
+    active_sessions[negotiation_id] = session
+    try:
+        if not negotiation_leases.local:
+            await message_bus.subscribe(_channel(negotiation_id), partial(_on_session_event, negotiation_id))
+        session["owner"] = await negotiation_leases.acquire(negotiation_id)
+        if not session["owner"]:
+            await _publish(negotiation_id, {"event": "sync"})
+    except Exception as e:
+        # Stays a replica; the ownership loop retries the lease
+        print(f"Error acquiring negotiation {negotiation_id}: {e}")
+    finally:
+        session["ready"].set()
+    return session
+
+
+async def _evict(negotiation_id: str):
+    """Drop the local session, its channel subscription and (when owned) its lease."""
+    session = active_sessions.pop(negotiation_id, None)
+    if not session:
+        return
+    if not negotiation_leases.local:
+        await message_bus.unsubscribe(_channel(negotiation_id))
+    if session["owner"]:
+        await negotiation_leases.release(negotiation_id)
+
+
+def _remote_connections(session: dict) -> int:
+    """Clients of this session connected to other workers (owner only; stale reports are dropped)."""
+    cutoff = time.monotonic() - settings.NEGOTIATION_LEASE_SECONDS
+    for worker, (_, seen_at) in list(session["remote"].items()):
+        if seen_at < cutoff:
+            session["remote"].pop(worker, None)
+    return sum(count for count, _ in session["remote"].values())
+
+
+async def _announce_presence(negotiation_id: str, session: dict):
+    """Tell the owner how many of the session's clients this (replica) worker serves."""
+    if not session["owner"]:
+        await _publish(negotiation_id, {"event": "presence", "connections": len(session["connections"])})
+
+
+def _schedule_idle_flush(negotiation_id: str):
+    """Persist and evict the session later unless a client reconnects meanwhile."""
+    if shutdown_coordinator.draining:
+        return
+    task = asyncio.create_task(_delayed_flush(negotiation_id))
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_tasks.discard)
+
+
+async def _submit(negotiation_id: str, session: dict, command: dict):
+    """Run a chat action on the owning worker (in place when this worker owns the session)."""
+    if session["owner"]:
+        await _apply(negotiation_id, command)
+    else:
+        await _publish(negotiation_id, {"event": "command", **command})
+
+
+async def _apply(negotiation_id: str, command: dict):
+    """
+    Apply a chat action to an owned session.
+    Commands: {"op": "message", "msg"}, {"op": "accept", "msg", "final_price", "announce"}, {"op": "reject"}
+    """
+    session = active_sessions.get(negotiation_id)
+    if not session or not session["owner"]:
+        return
+    op = command.get("op")
+    if op == "message":
+        _append_message(session, command["msg"])
+        # Broadcast to ALL connections (including sender) for real-time display
+        await _broadcast(negotiation_id, {"type": "message", **command["msg"]})
+    elif op == "accept":
+        _append_message(session, command["msg"])
+        if command.get("announce"):
+            # Broadcast acceptance before flushing
+            await _broadcast(negotiation_id, {
+                "type": "accepted",
+                "final_price": command["final_price"],
+                "message": command["msg"],
+            })
+        await _flush_session(negotiation_id, "accepted", command["final_price"])
+    elif op == "reject":
+        await _flush_session(negotiation_id, "rejected")
+
+
+async def _on_session_event(negotiation_id: str, event: dict):
+    """Message bus handler for a negotiation channel (events published by other workers)."""
+    if event.get("origin") == WORKER_ID:
+        return
+    session = active_sessions.get(negotiation_id)
+    if not session:
+        return
+    kind = event.get("event")
+    origin = event.get("origin")
+
+    if kind == "deliver":
+        payload = event["payload"]
+        if payload.get("type") == "message" and not session["owner"]:
+            _record_message(session, {k: v for k, v in payload.items() if k != "type"})
+        _send_local(session, payload, event.get("exclude_uid"))
+    elif kind == "ended":
+        await _end_local(negotiation_id, event.get("status", "closed"), event.get("final_price"))
+    elif not session["owner"]:
+        if kind == "snapshot" and event.get("to") == WORKER_ID and len(event["messages"]) >= len(session["messages"]):
+            session["messages"] = event["messages"]
+            session["message_count"] = len(event["messages"])
+            session["approx_bytes"] = sum(_message_bytes(m) for m in event["messages"])
+            session["last_offer_amount"] = event.get("last_offer_amount")
+            _send_local(session, {"type": "history", "messages": session["messages"], "status": session["meta"]["status"]})
+        elif kind == "owner":
+            await _announce_presence(negotiation_id, session)
+    elif kind == "command":
+        await _apply(negotiation_id, event)
+    elif kind == "sync":
+        await _publish(negotiation_id, {
+            "event": "snapshot",
+            "to": origin,
+            "messages": session["messages"],
+            "last_offer_amount": session["last_offer_amount"],
+        })
+    elif kind == "presence":
+        if event.get("connections"):
+            session["remote"][origin] = (event["connections"], time.monotonic())
+        else:
+            session["remote"].pop(origin, None)
+            if not session["connections"] and not _remote_connections(session):
+                _schedule_idle_flush(negotiation_id)
+
+
+async def _promote(negotiation_id: str, session: dict):
+    """Take over a replica whose owner let its lease lapse; it already holds every delivered message."""
+    stored = await _col().find_one({"_id": ObjectId(negotiation_id)}, {"message_count": 1})
+    if stored and "message_count" in stored:
+        session["flushed"] = min(stored["message_count"], len(session["messages"]))
+    session["owner"] = True
+    session["remote"] = {}
+    await _publish(negotiation_id, {"event": "owner"})
+    if not session["connections"]:
+        _schedule_idle_flush(negotiation_id)
+
+
+async def _maintain_ownership():
+    """Renew owned leases, demote sessions taken over elsewhere and promote orphaned replicas."""
+    interval = max(1, settings.NEGOTIATION_LEASE_SECONDS / 3)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            for negotiation_id in await negotiation_leases.renew():
+                session = active_sessions.get(negotiation_id)
+                if session and session["owner"]:
+                    # Another worker owns it now; its flushes win and ours would be refused
+                    session["owner"] = False
+                    session["remote"] = {}
+                    await _publish(negotiation_id, {"event": "sync"})
+            for negotiation_id, session in list(active_sessions.items()):
+                if session["owner"]:
+                    continue
+                if await negotiation_leases.acquire(negotiation_id):
+                    await _promote(negotiation_id, session)
+                else:
+                    # Keeps this worker's clients counted by the owner
+                    await _announce_presence(negotiation_id, session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error maintaining negotiation ownership: {e}")
+
+
+def start_session_ownership():
+    """Start the lease maintenance loop (called on startup; not needed with one process)."""
+    global _ownership_task
+    if _ownership_task is None and not negotiation_leases.local:
+        _ownership_task = asyncio.create_task(_maintain_ownership())
+
+
+async def stop_session_ownership():
+    """Stop the lease maintenance loop (called on shutdown)."""
+    global _ownership_task
+    if _ownership_task:
+        _ownership_task.cancel()
+        try:
+            await _ownership_task
+        except asyncio.CancelledError:
+            pass
+        _ownership_task = None
+
+
+async def _end_local(negotiation_id: str, final_status: str, final_price: Optional[float] = None):
+    """Tell this worker's clients the session ended, close their sockets and drop the session."""
     session = active_sessions.get(negotiation_id)
     if not session:
         return
+    for conn in list(session.get("connections", {}).values()):
+        conn.send({"type": "session_ended", "status": final_status, "final_price": final_price})
+        conn.close()
+    await _evict(negotiation_id)
+
+
+async def _flush_session(negotiation_id: str, final_status: str = "closed", final_price: Optional[float] = None):
+    """Save new in-memory messages to MongoDB and end the session on every worker (owner only)."""
+    session = active_sessions.get(negotiation_id)
+    if not session or not session["owner"]:
+        return
+
+    fields: dict = {"status": final_status}
+    if final_price is not None:
+        fields["final_price"] = final_price
+
+    await _persist_session(negotiation_id, fields)
+
+    # Close all WebSocket connections (ours first, then the replicas')
+    await _publish(negotiation_id, {"event": "ended", "status": final_status, "final_price": final_price})
+    await _end_local(negotiation_id, final_status, final_price)
+
+
+def _send_local(session: dict, message: dict, exclude_uid: Optional[str] = None):
+    """Queue a message on the session's clients connected to this worker (never waits on a socket)."""
     dead = []
-    for uid, ws in list(session.get("connections", {}).items()):
+    for uid, conn in list(session.get("connections", {}).items()):
         if exclude_uid and uid == exclude_uid:
             continue
-        try:
-            await ws.send_json(message)
-        except Exception:
+        if not conn.send(message):
+            # Disconnected, or evicted as a slow consumer
             dead.append(uid)
     for uid in dead:
         session["connections"].pop(uid, None)
 
 
+async def _broadcast(negotiation_id: str, message: dict, exclude_uid: Optional[str] = None):
+    """Broadcast a message to all WebSocket clients in a session, on this worker and the others."""
+    session = active_sessions.get(negotiation_id)
+    if not session:
+        return
+    # Local clients first so the owning worker never waits on the bus
+    _send_local(session, message, exclude_uid)
+    await _publish(negotiation_id, {"event": "deliver", "payload": message, "exclude_uid": exclude_uid})
+
+
+async def _delayed_flush(negotiation_id: str):
+    """Persist and evict a session nobody reconnected to (status is left unchanged)."""
+    await asyncio.sleep(SESSION_IDLE_FLUSH_SECONDS)  # Wait for potential reconnects
+    session = active_sessions.get(negotiation_id)
+    if not session or session["connections"]:
+        return
+    if not session["owner"]:
+        # Replicas hold nothing that is not owned elsewhere
+        await _evict(negotiation_id)
+        return
+    if _remote_connections(session):
+        return
+    try:
+        await _persist_session(negotiation_id)
+    except Exception as e:
+        # Keep the session so the next flush retries the unflushed messages
+        print(f"Error flushing negotiation {negotiation_id}: {e}")
+        return
+    if not session["connections"] and session["flushed"] >= len(session["messages"]):
+        # Remove from memory to save RAM
+        await _evict(negotiation_id)
+
+
+async def prune_sessions() -> int:
+    """Heartbeat prune hook: drop closed (reaped or evicted) sockets from every session."""
+    pruned = 0
+    for negotiation_id, session in list(active_sessions.items()):
+        closed = [uid for uid, conn in session["connections"].items() if conn.closed]
+        if not closed:
+            continue
+        for uid in closed:
+            session["connections"].pop(uid, None)
+        pruned += len(closed)
+        await _announce_presence(negotiation_id, session)
+        if not session["connections"]:
+            _schedule_idle_flush(negotiation_id)
+    return pruned
+
+
+def session_stats() -> dict:
+    """Gauges of live sessions held by this worker (memory is an estimate from message sizes)."""
+    sizes = [session["approx_bytes"] for session in active_sessions.values()]
+    return {
+        "sessions": len(sizes),
+        "owned": sum(1 for session in active_sessions.values() if session["owner"]),
+        "sockets": sum(len(session["connections"]) for session in active_sessions.values()),
+        "messages": sum(len(session["messages"]) for session in active_sessions.values()),
+        "approx_bytes": sum(sizes),
+        "max_session_bytes": max(sizes, default=0),
+        "avg_session_bytes": sum(sizes) // len(sizes) if sizes else 0,
+    }
+
+
+async def drain_sessions():
+    """
+    Shutdown hook: persist every owned session in one bulk write, then tell clients to reconnect.
+    Appends rejected by the count guard stay in the journal and are recovered on the next startup.
+    """
+    for task in list(_flush_tasks):
+        task.cancel()
+
+    operations = []
+    for nid, session in active_sessions.items():
+        if not session["owner"] or session["flushed"] >= len(session["messages"]):
+            continue
+        update, _ = _pending_update(session)
+        operations.append(UpdateOne({"_id": ObjectId(nid), **_count_filter(session["flushed"])}, update))
+    if operations:
+        try:
+            await _col().bulk_write(operations, ordered=False)
+        except Exception as e:
+            print(f"Error flushing negotiation sessions on shutdown: {e}")
+    try:
+        # Lets replicas on other workers take over without waiting for the leases to expire
+        await negotiation_leases.release_all()
+    except Exception as e:
+        print(f"Error releasing negotiation leases on shutdown: {e}")
+
+    connections = [conn for session in active_sessions.values() for conn in session["connections"].values()]
+    for conn in connections:
+        conn.send({
+            "type": "session_ended",
+            "status": "active",
+            "reconnect": True,
+            "retry_after_ms": shutdown_coordinator.reconnect_delay_ms(),
+        })
+        conn.close(code=1012, reason="Server restarting")
+    await asyncio.gather(*[conn.wait_closed(settings.WS_SEND_TIMEOUT_SECONDS) for conn in connections])
+    active_sessions.clear()
+
+
 # ── REST Endpoints ────────────────────────────────────────────────────────
 
 @router.post("/start", status_code=status.HTTP_201_CREATED)
@@ -148,16 +660,7 @@ async def start_negotiation(
     })
     if existing:
         neg_id = str(existing["_id"])
-        if neg_id not in active_sessions:
-            active_sessions[neg_id] = {
-                "messages": existing.get("messages", []),
-                "connections": {},
-                "meta": {
-                    "worker_id": str(existing["worker_id"]),
-                    "employer_id": str(existing["employer_id"]),
-                    "original_price": existing["original_price"],
-                },
-            }
+        await _open_session(neg_id, existing)
         return {"negotiation": _serialize(existing), "message": "Negotiation already exists"}
 
     first_msg = {
@@ -178,6 +681,8 @@ async def start_negotiation(
         "original_price": body.original_price,
         "status": "active",
         "messages": [first_msg],
+        "message_count": 1,
+        "last_offer_amount": body.offer_amount or None,
         "final_price": None,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
@@ -187,15 +692,7 @@ async def start_negotiation(
     neg_id = str(result.inserted_id)
     doc["_id"] = neg_id
 
-    active_sessions[neg_id] = {
-        "messages": [first_msg],
-        "connections": {},
-        "meta": {
-            "worker_id": str(user["user_id"]),
-            "employer_id": str(body.employer_id),
-            "original_price": body.original_price,
-        },
-    }
+    await _open_session(neg_id, doc)
 
     # ── Application Sync ──
     # Ensure worker appears in employer's applicant list
@@ -207,7 +704,7 @@ async def start_negotiation(
         existing_app = await app_col.find_one({
             "job_id": body.job_id,
             "$or": [{"worker_id": user["user_id"]}, {"applicant_id": user["user_id"]}]
-        })
+        }, {"_id": 1})
         
         if not existing_app:
             # Create a "negotiating" application status
@@ -231,13 +728,14 @@ async def start_negotiation(
                         "type": job_doc.get("job_type", "daily"),
                         "cover_image": job_doc.get("cover_image")
                     },
-                    "messages": [first_msg]
+                    **MessageService.thread_fields(first_msg),
                 }
-                await app_col.insert_one(new_app)
-                # Add to job.applicants list for employer visibility
+                result = await app_col.insert_one(new_app)
+                await MessageService.start_thread(str(result.inserted_id), first_msg)
+                # Count the new applicant for employer visibility
                 await job_col.update_one(
                     {"_id": ObjectId(body.job_id)},
-                    {"$push": {"applicants": user["user_id"]}}
+                    {"$inc": {"applicants_count": 1}}
                 )
     except Exception as e:
         print(f"Error syncing application on negotiation start: {e}")
@@ -252,16 +750,8 @@ async def start_negotiation(
             "job_id": body.job_id,
             "worker_id": user["user_id"], # Added for frontend deep linking
         }
-        await _notif_col().insert_one({
-            "user_id": body.employer_id,
-            **notif,
-            "read": False,
-            "created_at": datetime.utcnow(),
-        })
-        await NotificationManager.send_personal_message(str(body.employer_id), {
-            "type": "personal_notification",
-            "data": notif
-        })
+        # Stored and pushed (with its seq) by the notification writer
+        NotificationService.record(body.employer_id, notif)
     except Exception:
         pass
 
@@ -311,14 +801,9 @@ async def accept_negotiation(
     if uid != neg["worker_id"] and uid != neg["employer_id"]:
         raise HTTPException(status_code=403, detail="Not part of this negotiation")
 
-    # Find the last offered price
-    session = active_sessions.get(negotiation_id)
-    messages = session["messages"] if session else neg.get("messages", [])
-    final_price = None
-    for m in reversed(messages):
-        if m.get("offer_amount"):
-            final_price = m["offer_amount"]
-            break
+    # The last offered price is tracked on the session (the owner's, or a replica of it)
+    session = await _open_session(negotiation_id, neg)
+    final_price = session["last_offer_amount"]
     if not final_price:
         final_price = neg["original_price"]
 
@@ -332,27 +817,16 @@ async def accept_negotiation(
         "offer_amount": final_price,
         "sent_at": datetime.utcnow().isoformat(),
     }
-    if session:
-        session["messages"].append(accept_msg)
-
-    # Broadcast acceptance before flushing
-    await _broadcast(negotiation_id, {
-        "type": "accepted",
+    # The owning worker appends it, broadcasts the acceptance and flushes
+    await _submit(negotiation_id, session, {
+        "op": "accept",
+        "msg": accept_msg,
         "final_price": final_price,
-        "message": accept_msg,
+        "announce": True,
     })
-
-    await _flush_session(negotiation_id, "accepted", final_price)
-
-    # If no in-memory session, update DB directly (for REST-only flow)
-    if not session:
-        await col.update_one(
-            {"_id": ObjectId(negotiation_id)},
-            {
-                "$set": {"status": "accepted", "final_price": final_price, "updated_at": datetime.utcnow()},
-                "$push": {"messages": accept_msg},
-            },
-        )
+    if active_sessions.get(negotiation_id) is session and not session["connections"]:
+        # Replica opened only for this request
+        _schedule_idle_flush(negotiation_id)
 
     # Notify other party
     other_id = neg["employer_id"] if role == "worker" else neg["worker_id"]
@@ -364,13 +838,7 @@ async def accept_negotiation(
             "negotiation_id": negotiation_id,
             "job_id": neg["job_id"],
         }
-        await _notif_col().insert_one({
-            "user_id": other_id,
-            **notif,
-            "read": False,
-            "created_at": datetime.utcnow(),
-        })
-        await NotificationManager.send_personal_message(str(other_id), notif)
+        NotificationService.record(other_id, notif)
     except Exception:
         pass
 
@@ -414,9 +882,13 @@ async def reject_negotiation(
     if uid != neg["worker_id"] and uid != neg["employer_id"]:
         raise HTTPException(status_code=403, detail="Not part of this negotiation")
 
-    await _flush_session(negotiation_id, "rejected")
+    session = await _open_session(negotiation_id, neg)
+    await _submit(negotiation_id, session, {"op": "reject"})
+    if active_sessions.get(negotiation_id) is session and not session["connections"]:
+        # Replica opened only for this request
+        _schedule_idle_flush(negotiation_id)
 
-    # If no in-memory session, update DB directly
+    # Also set the status directly in case the owning worker is gone
     await col.update_one(
         {"_id": ObjectId(negotiation_id)},
         {"$set": {"status": "rejected", "updated_at": datetime.utcnow()}},
@@ -433,13 +905,7 @@ async def reject_negotiation(
             "negotiation_id": negotiation_id,
             "job_id": neg["job_id"],
         }
-        await _notif_col().insert_one({
-            "user_id": other_id,
-            **notif,
-            "read": False,
-            "created_at": datetime.utcnow(),
-        })
-        await NotificationManager.send_personal_message(other_id, notif)
+        NotificationService.record(other_id, notif)
     except Exception:
         pass
 
@@ -564,6 +1030,11 @@ async def negotiation_ws(ws: WebSocket, negotiation_id: str, token: str = ""):
     On accept:  { "type": "accepted", "final_price": ... }
     On close:   { "type": "session_ended", "status": "..." }
     """
+    # Refuse new sessions while this worker drains; clients reconnect to another worker
+    if shutdown_coordinator.draining:
+        await ws.close(code=1012, reason="Server restarting")
+        return
+
     # Authenticate
     user = await auth_from_token(token)
     if not user:
@@ -586,36 +1057,29 @@ async def negotiation_ws(ws: WebSocket, negotiation_id: str, token: str = ""):
     role = "worker" if uid == neg["worker_id"] else "employer"
     sender_name = user.get("full_name") or user.get("email", "").split("@")[0] or role.title()
 
-    # Ensure in-memory session exists
-    if negotiation_id not in active_sessions:
-        active_sessions[negotiation_id] = {
-            "messages": neg.get("messages", []),
-            "connections": {},
-            "meta": {
-                "worker_id": neg["worker_id"],
-                "employer_id": neg["employer_id"],
-                "original_price": neg["original_price"],
-            },
-        }
-
-    session = active_sessions[negotiation_id]
+    # Ensure in-memory session exists (owned here, or a replica of the owner's)
+    session = await _open_session(negotiation_id, neg)
 
     await ws.accept()
-    session["connections"][uid] = ws
-
-    # Send existing messages on connect
-    try:
-        await ws.send_json({
-            "type": "history",
-            "messages": session["messages"],
-            "status": neg.get("status", "active"),
-        })
-    except Exception:
-        pass
+    conn = OutboundSocket(ws)
+    # One socket per user per session: a reconnect replaces the previous one
+    previous = session["connections"].get(uid)
+    if previous:
+        previous.close(code=CONNECTION_CAP_CLOSE_CODE, reason="Replaced by a newer connection")
+    session["connections"][uid] = conn
+    await _announce_presence(negotiation_id, session)
+
+    # Send existing messages on connect (queued ahead of anything broadcast later)
+    conn.send({
+        "type": "history",
+        "messages": session["messages"],
+        "status": neg.get("status", "active"),
+    })
 
     try:
         while True:
             data = await ws.receive_json()
+            conn.touch()
             msg_type = data.get("type", "message")
 
             if msg_type == "message":
@@ -629,13 +1093,7 @@ async def negotiation_ws(ws: WebSocket, negotiation_id: str, token: str = ""):
                     "offer_amount": data.get("offer_amount"),
                     "sent_at": datetime.utcnow().isoformat(),
                 }
-                session["messages"].append(msg)
-
-                # Broadcast to ALL connections (including sender) for real-time display
-                await _broadcast(negotiation_id, {
-                    "type": "message",
-                    **msg,
-                })
+                await _submit(negotiation_id, session, {"op": "message", "msg": msg})
 
                 # ALSO send a global personal notification to the OTHER party
                 other_id = str(session["meta"]["employer_id"] if role == "worker" else session["meta"]["worker_id"])
@@ -656,12 +1114,7 @@ async def negotiation_ws(ws: WebSocket, negotiation_id: str, token: str = ""):
 
             elif msg_type == "accept":
                 # Find final price
-                final_price = data.get("final_price")
-                if not final_price:
-                    for m in reversed(session["messages"]):
-                        if m.get("offer_amount"):
-                            final_price = m["offer_amount"]
-                            break
+                final_price = data.get("final_price") or session["last_offer_amount"]
                 if not final_price:
                     final_price = session["meta"]["original_price"]
 
@@ -673,8 +1126,12 @@ async def negotiation_ws(ws: WebSocket, negotiation_id: str, token: str = ""):
                     "offer_amount": final_price,
                     "sent_at": datetime.utcnow().isoformat(),
                 }
-                session["messages"].append(accept_msg)
-                await _flush_session(negotiation_id, "accepted", final_price)
+                await _submit(negotiation_id, session, {
+                    "op": "accept",
+                    "msg": accept_msg,
+                    "final_price": final_price,
+                    "announce": False,
+                })
                 
                 # ── Auto-Application Sync in WS ──
                 try:
@@ -697,37 +1154,23 @@ async def negotiation_ws(ws: WebSocket, negotiation_id: str, token: str = ""):
                 break
 
             elif msg_type == "reject":
-                await _flush_session(negotiation_id, "rejected")
+                await _submit(negotiation_id, session, {"op": "reject"})
                 break
 
     except WebSocketDisconnect:
-        pass
+        conn.discard()
     except Exception as e:
         print(f"WS error: {e}")
     finally:
-        # Remove this connection
-        if negotiation_id in active_sessions:
-            active_sessions[negotiation_id]["connections"].pop(uid, None)
-            
+        # Remove this connection (unless the same user already reconnected); anything
+        # still queued, like session_ended after an accept, is sent before closing
+        conn.close()
+        if active_sessions.get(negotiation_id) is session:
+            if session["connections"].get(uid) is conn:
+                session["connections"].pop(uid, None)
+            await _announce_presence(negotiation_id, session)
+
             # If no connections left, initiate a delayed background flush to persist to DB
-            if not active_sessions[negotiation_id]["connections"]:
-                async def _delayed_flush(nid: str):
-                    await asyncio.sleep(10)  # Wait 10 seconds for potential reconnects
-                    if nid in active_sessions and not active_sessions[nid]["connections"]:
-                        # Still no connections, flush safely to DB
-                        # Note: We fetch current status to ensure we don't accidentally close an active negotiation
-                        col_local = _col()
-                        neg_local = await col_local.find_one({"_id": ObjectId(nid)})
-                        if neg_local:
-                            current_status = neg_local.get("status", "active")
-                            # Just flush the messages without changing status, 
-                            # we leave it active but stored nicely.
-                            await col_local.update_one(
-                                {"_id": ObjectId(nid)},
-                                {"$set": {"messages": active_sessions[nid]["messages"], "updated_at": datetime.utcnow()}}
-                            )
-                            # Remove from memory to save RAM
-                            active_sessions.pop(nid, None)
-
-                asyncio.create_task(_delayed_flush(negotiation_id))
+            if not session["connections"]:
+                _schedule_idle_flush(negotiation_id)
 
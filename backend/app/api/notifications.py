@@ -1,39 +1,216 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, List
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status, Cookie, Header
+from typing import Dict, List, Optional
+from functools import partial
 from app.services.auth_service import AuthService
+from app.core.bus import message_bus, user_channel
+from app.core.config import settings
+from app.core.outbound import CONNECTION_CAP_CLOSE_CODE, OutboundSocket
+from app.core.pagination import next_cursor, page_size
+from app.services.notification_service import NotificationService
+from app.core.shutdown import shutdown_coordinator
 import asyncio
 
 router = APIRouter(prefix="/api/notifications", tags=["Notifications"])
 
-# user_id -> list of active websockets
-active_connections: Dict[str, List[WebSocket]] = {}
+# user_id -> list of active websockets (this process only; other workers are reached through the bus)
+active_connections: Dict[str, List[OutboundSocket]] = {}
+
+# Sockets still replaying missed notifications -> live messages held until the replay is sent
+_replaying: Dict[OutboundSocket, List[dict]] = {}
 
 async def _auth_token(token: str):
     if not token:
         return None
     return await AuthService.verify_user_token(token)
 
+async def get_current_user(
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None),
+):
+    token = access_token
+    if not token and authorization:
+        parts = authorization.split()
+        if len(parts) == 2 and parts[0].lower() == "bearer":
+            token = parts[1]
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    user = await _auth_token(token)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+    return user
+
 class NotificationManager:
     @staticmethod
     async def send_personal_message(user_id: str, message: dict):
-        """Send a message to all active WebSocket connections for a specific user."""
+        """Send a message to every connection of a user, on whichever worker it is."""
+        try:
+            await message_bus.publish(user_channel(str(user_id)), message)
+        except Exception as e:
+            print(f"Error publishing notification: {e}")
+
+    @staticmethod
+    async def deliver_local(user_id: str, message: dict):
+        """Queue a message on the user's WebSocket connections held by this process (never waits on a socket)."""
         if user_id in active_connections:
             websockets = active_connections[user_id]
             dead = []
-            for ws in websockets:
-                try:
-                    await ws.send_json(message)
-                except Exception:
-                    dead.append(ws)
-            # Cleanup dead connections
-            for ws in dead:
-                if ws in websockets:
-                    websockets.remove(ws)
+            for conn in websockets:
+                if conn in _replaying:
+                    _replaying[conn].append(message)
+                elif not conn.send(message):
+                    dead.append(conn)
+            # Cleanup dead and evicted (slow) connections
+            for conn in dead:
+                if conn in websockets:
+                    websockets.remove(conn)
             if not websockets:
-                active_connections.pop(user_id, None)
+                await NotificationManager._release(user_id)
+
+    @staticmethod
+    async def _release(user_id: str):
+        """Forget a user with no connections left here and drop their bus subscription."""
+        if active_connections.get(user_id):
+            return
+        active_connections.pop(user_id, None)
+        try:
+            await message_bus.unsubscribe(user_channel(user_id))
+        except Exception as e:
+            print(f"Error unsubscribing notifications: {e}")
+
+async def _replay(user_id: str, conn: OutboundSocket, last_seq: int):
+    """Send the notifications stored after last_seq, then the live ones held meanwhile."""
+    missed = await NotificationService.get_since(user_id, last_seq)
+    replayed_to = missed[-1]["seq"] if missed else last_seq
+    # Held pushes the replay already covers are dropped (messages without seq were never stored)
+    held = [m for m in _replaying.pop(conn, []) if m.get("seq") is None or m["seq"] > replayed_to]
+
+    for doc in missed:
+        conn.send(NotificationService.live_message(doc))
+    conn.send({
+        "type": "replay_complete",
+        "last_seq": replayed_to,
+        # More were missed than one replay carries; the client should reload the inbox
+        "truncated": len(missed) >= settings.NOTIFICATION_REPLAY_LIMIT,
+    })
+    sent_to = replayed_to
+    for message in held:
+        seq = message.get("seq")
+        if seq is not None:
+            if seq <= sent_to:
+                # Delivered twice through the bus
+                continue
+            sent_to = seq
+        conn.send(message)
+
+async def prune_connections() -> int:
+    """Heartbeat prune hook: drop closed (reaped or evicted) sockets and users left without one."""
+    pruned = 0
+    for user_id, websockets in list(active_connections.items()):
+        closed = [conn for conn in websockets if conn.closed]
+        for conn in closed:
+            websockets.remove(conn)
+            _replaying.pop(conn, None)
+        pruned += len(closed)
+        if not websockets:
+            await NotificationManager._release(user_id)
+    return pruned
+
+def connection_stats() -> dict:
+    """Gauges of notification sockets held by this worker."""
+    counts = [len(websockets) for websockets in active_connections.values()]
+    return {
+        "users": len(counts),
+        "sockets": sum(counts),
+        "max_per_user": max(counts, default=0),
+        "replaying": len(_replaying),
+    }
+
+async def drain_connections():
+    """Shutdown hook: ask every connected client to reconnect (after a jittered delay) and close."""
+    connections = [conn for websockets in list(active_connections.values()) for conn in websockets]
+    for conn in connections:
+        conn.send({"type": "reconnect", "retry_after_ms": shutdown_coordinator.reconnect_delay_ms()})
+        conn.close(code=1012, reason="Server restarting")
+    await asyncio.gather(*[conn.wait_closed(settings.WS_SEND_TIMEOUT_SECONDS) for conn in connections])
+    active_connections.clear()
+
+@router.get("")
+async def get_notifications(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    unread_only: bool = False,
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Notification inbox, newest first
+
+    Query params:
+        limit: Page size
+        cursor: next_cursor from the previous page
+        unread_only: Only unread notifications
+    """
+    user = await get_current_user(access_token, authorization)
+    limit = page_size(limit)
+    try:
+        notifications = await NotificationService.get_notifications(user["user_id"], limit, cursor, unread_only)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return {
+        "notifications": notifications,
+        "count": len(notifications),
+        "next_cursor": next_cursor(notifications, limit, "created_at"),
+    }
+
+@router.get("/unread-count")
+async def get_unread_count(
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None),
+):
+    """Unread notification count (badge)."""
+    user = await get_current_user(access_token, authorization)
+    return {"unread": await NotificationService.get_unread_count(user["user_id"])}
+
+@router.post("/read-all")
+async def mark_all_read(
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None),
+):
+    """Mark every notification of the current user as read."""
+    user = await get_current_user(access_token, authorization)
+    marked = await NotificationService.mark_all_read(user["user_id"])
+    if marked is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to mark notifications as read")
+    return {"message": "Notifications marked as read", "marked": marked}
+
+@router.post("/{notification_id}/read")
+async def mark_read(
+    notification_id: str,
+    access_token: Optional[str] = Cookie(None, alias=settings.COOKIE_NAME),
+    authorization: Optional[str] = Header(None),
+):
+    """Mark one notification as read."""
+    user = await get_current_user(access_token, authorization)
+    notification = await NotificationService.mark_read(user["user_id"], notification_id)
+    if not notification:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
+    return {"notification": notification}
 
 @router.websocket("/ws")
-async def notification_ws(ws: WebSocket, token: str = ""):
+async def notification_ws(ws: WebSocket, token: str = "", last_seq: Optional[int] = None):
+    """
+    Live notifications.
+    Connect: ws://host/api/notifications/ws?token=<jwt>[&last_seq=<n>]
+
+    Stored notifications arrive as {"type": "personal_notification", "data": {...}, "seq": n}.
+    With last_seq, everything stored after it is replayed first, followed by
+    {"type": "replay_complete", "last_seq": n, "truncated": bool}.
+    """
+    if shutdown_coordinator.draining:
+        await ws.close(code=1012, reason="Server restarting")
+        return
+
     user = await _auth_token(token)
     if not user:
         await ws.close(code=4001, reason="Unauthorized")
@@ -41,22 +218,39 @@ async def notification_ws(ws: WebSocket, token: str = ""):
 
     uid = user["user_id"]
     await ws.accept()
+    conn = OutboundSocket(ws)
+    if last_seq is not None:
+        # Live pushes wait until the gap is replayed so nothing arrives out of order
+        _replaying[conn] = []
 
     if uid not in active_connections:
         active_connections[uid] = []
-    active_connections[uid].append(ws)
+        # Subscribe this worker to the user's channel while they are connected here
+        await message_bus.subscribe(user_channel(uid), partial(NotificationManager.deliver_local, uid))
+    active_connections[uid].append(conn)
+    # Cap sockets per user (leaked tabs, reconnect loops); the oldest ones go first
+    while len(active_connections[uid]) > max(1, settings.WS_MAX_CONNECTIONS_PER_USER):
+        oldest = active_connections[uid].pop(0)
+        _replaying.pop(oldest, None)
+        oldest.close(code=CONNECTION_CAP_CLOSE_CODE, reason="Too many connections")
+
+    if last_seq is not None:
+        await _replay(uid, conn, last_seq)
 
     try:
         while True:
-            # We only keep the connection alive to push data
+            # We only keep the connection alive to push data (and receive pongs)
             await ws.receive_text()
+            conn.touch()
     except WebSocketDisconnect:
         pass
     except Exception:
         pass
     finally:
+        conn.discard()
+        _replaying.pop(conn, None)
         if uid in active_connections:
-            if ws in active_connections[uid]:
-                active_connections[uid].remove(ws)
+            if conn in active_connections[uid]:
+                active_connections[uid].remove(conn)
             if not active_connections[uid]:
-                active_connections.pop(uid, None)
+                await NotificationManager._release(uid)
@@ -0,0 +1,91 @@
+"""
+Background work module
+A single in-process worker draining a FIFO queue of deferred database writes
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class BackgroundWorker:
+    """
+    FIFO queue of deferred jobs run one at a time by a single task
+    Running jobs in submission order keeps successive cascades for the same
+    document from overtaking each other
+    """
+
+    def __init__(self, name: str, max_queue: int = 10000):
+        self.name = name
+        self.queue: "asyncio.Queue[Tuple[str, Callable[[], Awaitable[Any]]]]" = asyncio.Queue(maxsize=max_queue)
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, label: str, job: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Queue a job for the worker
+
+        Args:
+            label: Short description used in error logs
+            job: Zero-argument coroutine function to run
+
+        Returns:
+            False if the worker is not running or the queue is full (caller should run the job inline)
+        """
+        if self._task is None:
+            return False
+        try:
+            self.queue.put_nowait((label, job))
+            return True
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+
+    async def _run(self):
+        while True:
+            label, job = await self.queue.get()
+            try:
+                await job()
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Error in {self.name} job {label}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def start(self):
+        """Start the worker task (called on startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout_seconds: float = 10.0):
+        """
+        Drain queued jobs, then stop the worker (called on shutdown)
+        Jobs still queued after the timeout are dropped and reported
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            print(f"⚠️ {self.name}: dropping {self.queue.qsize()} queued jobs at shutdown")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and job counters"""
+        return {
+            "running": self._task is not None,
+            "queued": self.queue.qsize(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+# Deferred job -> applications status cascades (see JobService.update_job)
+cascade_worker = BackgroundWorker("job-cascade")
@@ -0,0 +1,166 @@
+"""
+Message bus module
+Channel-based pub/sub used to reach sockets connected to other worker processes.
+Each worker only subscribes to the channels of users (or sessions) it currently serves.
+"""
+import asyncio
+import json
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi.encoders import jsonable_encoder
+from .config import settings
+
+
+# Identifies this process on shared channels and in ownership leases
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Called with the decoded message published on a subscribed channel
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def user_channel(user_id: str) -> str:
+    """Channel reaching every socket of a user, on whichever worker it is connected"""
+    return f"user:{user_id}"
+
+
+class MessageBus:
+    """Interface shared by the bus backends"""
+
+    def __init__(self):
+        self.handlers: Dict[str, Handler] = {}
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    async def start(self):
+        """Connect the backend (called on startup)"""
+
+    async def stop(self):
+        """Disconnect the backend (called on shutdown)"""
+
+    async def subscribe(self, channel: str, handler: Handler):
+        """Deliver messages published on `channel` to `handler` in this process"""
+        self.handlers[channel] = handler
+
+    async def unsubscribe(self, channel: str):
+        """Stop receiving messages for `channel`"""
+        self.handlers.pop(channel, None)
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        """Publish a message to every process subscribed to `channel`"""
+        raise NotImplementedError
+
+    async def _dispatch(self, channel: str, message: Dict[str, Any]):
+        handler = self.handlers.get(channel)
+        if handler is None:
+            return
+        self.received += 1
+        try:
+            await handler(message)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error handling bus message on {channel}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get backend name, subscribed channel count and message counters"""
+        return {
+            "backend": settings.MESSAGE_BUS,
+            "channels": len(self.handlers),
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+
+class InProcessBus(MessageBus):
+    """Single-process backend: publishing calls the local handler directly"""
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        self.published += 1
+        await self._dispatch(channel, message)
+
+
+class RedisBus(MessageBus):
+    """
+    Redis pub/sub backend (any server speaking the Redis protocol)
+    Channels are namespaced with MESSAGE_BUS_CHANNEL_PREFIX; one reader task per process
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.client = None
+        self.pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    def _channel(self, channel: str) -> str:
+        return f"{settings.MESSAGE_BUS_CHANNEL_PREFIX}{channel}"
+
+    async def start(self):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        # Keeps the pub/sub connection open even while no user channel is subscribed
+        await self.pubsub.subscribe(self._channel("_control"))
+        for channel in self.handlers:
+            await self.pubsub.subscribe(self._channel(channel))
+        self._reader = asyncio.create_task(self._read())
+        print(f"📡 Message bus connected ({settings.REDIS_URL})")
+
+    async def _read(self):
+        prefix_length = len(settings.MESSAGE_BUS_CHANNEL_PREFIX)
+        while True:
+            try:
+                raw = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if raw is None or raw.get("type") != "message":
+                    continue
+                await self._dispatch(raw["channel"][prefix_length:], json.loads(raw["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"Error reading message bus: {e}")
+                await asyncio.sleep(1)
+
+    async def stop(self):
+        if self._reader:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def subscribe(self, channel: str, handler: Handler):
+        first = channel not in self.handlers
+        await super().subscribe(channel, handler)
+        if first and self.pubsub is not None:
+            await self.pubsub.subscribe(self._channel(channel))
+
+    async def unsubscribe(self, channel: str):
+        if channel in self.handlers:
+            await super().unsubscribe(channel)
+            if self.pubsub is not None:
+                await self.pubsub.unsubscribe(self._channel(channel))
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        self.published += 1
+        payload = json.dumps(jsonable_encoder(message), separators=(",", ":"))
+        await self.client.publish(self._channel(channel), payload)
+
+
+def create_bus() -> MessageBus:
+    """Build the backend selected by MESSAGE_BUS ('memory' or 'redis')"""
+    if settings.MESSAGE_BUS == "redis":
+        return RedisBus()
+    return InProcessBus()
+
+
+# Process-wide bus (notifications use channels "user:<user_id>", chat uses "negotiation:<id>")
+message_bus = create_bus()
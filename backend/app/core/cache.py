@@ -0,0 +1,138 @@
+"""
+In-process cache module
+Provides a bounded TTL/LRU cache used to skip repeated database lookups on hot paths
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+
+class TTLCache:
+    """
+    Bounded least-recently-used cache whose entries also expire after a time-to-live
+    Entries may be tagged with a group key so all entries of one owner can be dropped together
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        """
+        Args:
+            max_size: Maximum number of entries kept before the oldest is evicted
+            ttl_seconds: Default lifetime of an entry in seconds
+        """
+        self.max_size = max(1, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+
+        # key -> (expires_at, group, value), ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[Hashable], Any]]" = OrderedDict()
+        # group -> keys currently cached for that group
+        self._groups: Dict[Hashable, Set[Hashable]] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, group: Optional[Hashable] = None, ttl: Optional[float] = None):
+        """
+        Store a value, evicting the least recently used entry when full
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            group: Optional group key used for bulk invalidation
+            ttl: Optional lifetime overriding the default (never extends past it)
+        """
+        lifetime = self.ttl_seconds if ttl is None else min(ttl, self.ttl_seconds)
+        if lifetime <= 0:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + lifetime, group, value)
+        if group is not None:
+            self._groups.setdefault(group, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def invalidate_group(self, group: Hashable) -> int:
+        """
+        Drop every entry tagged with a group
+
+        Args:
+            group: Group key passed to set()
+
+        Returns:
+            Number of entries removed
+        """
+        keys = self._groups.pop(group, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        self._entries.clear()
+        self._groups.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with size, hits, misses, hit ratio, evictions and invalidations
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: Hashable):
+        """Remove a single entry and its group membership"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        group = entry[1]
+        if group is not None:
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    self._groups.pop(group, None)
@@ -16,10 +16,67 @@ class Settings(BaseSettings):
     JWT_SECRET: str  # Secret key for JWT token generation and verification
     JWT_ALGORITHM: str = "HS256"  # Algorithm used for JWT encoding
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # Token expiry: 7 days
+    AUTH_MODE: str = "database"  # "database" (load user per request) or "stateless" (trust signed claims; bans need token revocation)
+    REVOCATION_REFRESH_SECONDS: int = 30  # How often the revoked_tokens collection is re-read
     
     # MongoDB Configuration
     MONGO_URL: str  # MongoDB connection string
     DATABASE_NAME: str = "fite"  # Database name inside cluster0
+    ENSURE_INDEXES_ON_STARTUP: bool = True  # Create missing indexes from app/core/indexes.py on startup
+
+    # MongoDB Connection Pool Configuration
+    MONGO_MAX_POOL_SIZE: int = 100  # Maximum connections per server
+    MONGO_MIN_POOL_SIZE: int = 10  # Connections kept open (and pre-warmed on startup)
+    MONGO_MAX_IDLE_TIME_MS: int = 300000  # Close connections idle longer than this (5 minutes)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 2000  # Fail a request waiting longer than this for a free connection
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000  # Fail fast when no suitable server is reachable
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000  # TCP/TLS connect timeout for new connections
+    MONGO_COMPRESSORS: str = "zstd,snappy,zlib"  # Wire compression, in order of preference (unavailable ones are skipped)
+
+    # Readiness Probe Configuration (/ready)
+    READINESS_PING_TIMEOUT_MS: int = 1000  # Ping slower than this marks the worker not ready
+    READINESS_MAX_LOOP_LAG_MS: int = 500  # Event-loop lag above this marks the worker not ready
+
+    # List Pagination Configuration (my jobs, applicants, applications)
+    LIST_PAGE_SIZE: int = 100  # Default page size when a cursor is given without a limit
+    LIST_MAX_PAGE_SIZE: int = 500  # Largest page a client may request (use ?stream=true for everything)
+
+    # Negotiation Journal Configuration (write-behind log of live chat messages)
+    JOURNAL_FLUSH_INTERVAL_MS: int = 200  # Longest time a message waits before it is journaled
+    JOURNAL_BATCH_SIZE: int = 100  # Journal immediately once this many messages are waiting
+    JOURNAL_MAX_BUFFER: int = 50000  # Oldest unjournaled messages are dropped beyond this
+    JOURNAL_RETENTION_SECONDS: int = 7 * 24 * 3600  # Journal entries are deleted by TTL after this
+
+    # Notification Persistence Configuration (write-behind batches)
+    NOTIFICATION_FLUSH_INTERVAL_MS: int = 250  # Longest time a notification waits before it is stored
+    NOTIFICATION_BATCH_SIZE: int = 200  # Store immediately once this many notifications are waiting
+    NOTIFICATION_REPLAY_LIMIT: int = 200  # Most missed notifications replayed when a socket reconnects
+
+    # Message Bus Configuration (cross-worker notification and chat fan-out)
+    MESSAGE_BUS: str = "memory"  # "memory" (single process) or "redis" (any Redis-protocol server)
+    REDIS_URL: str = "redis://localhost:6379/0"  # Used when MESSAGE_BUS is "redis"
+    MESSAGE_BUS_CHANNEL_PREFIX: str = "fite:"  # Namespace for pub/sub channel names
+    NEGOTIATION_LEASE_SECONDS: int = 15  # Ownership lease of a live negotiation session across workers
+
+    # WebSocket Delivery Configuration (per-socket outbound queues and heartbeats)
+    WS_OUTBOUND_QUEUE_SIZE: int = 256  # Messages buffered per socket before the client is dropped as a slow consumer
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0  # A single send stalled longer than this also drops the client
+    WS_PING_INTERVAL_SECONDS: float = 25.0  # Quiet sockets are pinged this often (clients answer with a pong)
+    WS_IDLE_TIMEOUT_SECONDS: float = 75.0  # Sockets silent this long (no pong either) are closed as half-open
+    WS_SWEEP_INTERVAL_SECONDS: float = 15.0  # How often the sweeper pings, reaps and prunes
+    WS_MAX_CONNECTIONS_PER_USER: int = 5  # Notification sockets per user per worker; the oldest is closed beyond this
+
+    # Graceful Shutdown Configuration
+    SHUTDOWN_DEADLINE_SECONDS: float = 10.0  # Total time allowed for draining sessions and sockets
+    SHUTDOWN_RECONNECT_JITTER_MS: int = 5000  # Clients are told to reconnect after a random delay up to this
+
+    # Application Message Threads (application_messages collection)
+    APPLICATION_MESSAGE_BUCKET_SIZE: int = 50  # Messages per bucket document
+    THREAD_PAGE_SIZE: int = 50  # Messages per thread page
+
+    # Write Path Configuration
+    APPLICANT_STATUS_TRANSACTIONS: bool = False  # Run applicant status transitions in a transaction (needs a replica set)
+    DEFER_JOB_STATUS_CASCADE: bool = False  # Apply job status -> application cascades in a background worker
     
     # CORS Configuration
     FRONTEND_URL: str = "http://localhost:5173"  # Frontend URL for CORS
@@ -32,7 +89,15 @@ class Settings(BaseSettings):
     COOKIE_SECURE: bool = False  # Set to True in production with HTTPS
     COOKIE_SAMESITE: str = "lax"  # SameSite policy
     COOKIE_MAX_AGE: Optional[int] = None  # None for session cookies (cleared when browser closes)
-    
+
+    # Principal Cache Configuration (verify_user_token results)
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000  # Maximum number of cached token/user entries
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # Seconds before a cached principal is re-read from MongoDB
+
+    # Password Hashing Configuration (bcrypt runs in a dedicated thread pool)
+    PASSWORD_HASH_WORKERS: int = 2  # Concurrent bcrypt operations per process
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Waiting operations allowed before requests get HTTP 429
+
     class Config:
         """Pydantic config to load from .env file"""
         env_file = ".env"
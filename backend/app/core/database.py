@@ -3,8 +3,12 @@ Database connection module for MongoDB
 Handles connection initialization and provides database access
 """
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from typing import Optional, Dict, Any, AsyncIterator
+from contextlib import asynccontextmanager
+import asyncio
+import time
 from .config import settings
+from .monitoring import pool_monitor, ping_latency
 
 
 class Database:
@@ -22,17 +26,105 @@ class Database:
         Creates connection to cluster0 and selects 'fite' database
         """
         try:
-            # Create async MongoDB client
-            cls.client = AsyncIOMotorClient(settings.MONGO_URL)
+            # Create async MongoDB client with an explicitly sized pool
+            cls.client = AsyncIOMotorClient(settings.MONGO_URL, **cls.client_options())
             
             # Test the connection by pinging the database
             await cls.client.admin.command('ping')
             print(f"✅ Successfully connected to MongoDB - Database: {settings.DATABASE_NAME}")
+
+            # Open minPoolSize connections now so the first requests skip TCP/TLS handshakes
+            await cls.prewarm_pool()
             
         except Exception as e:
             print(f"❌ Error connecting to MongoDB: {e}")
             raise e
     
+    @staticmethod
+    def client_options() -> Dict[str, Any]:
+        """
+        Build connection pool and compression options from settings
+        
+        Returns:
+            Keyword arguments for AsyncIOMotorClient
+        """
+        options: Dict[str, Any] = {
+            "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+            # Pool events feed the checked-out / available counters reported by /ready
+            "event_listeners": [pool_monitor],
+        }
+        compressors = [c.strip() for c in settings.MONGO_COMPRESSORS.split(",") if c.strip()]
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        return options
+    
+    @classmethod
+    async def prewarm_pool(cls):
+        """
+        Pre-warm the connection pool up to minPoolSize
+        Runs concurrent pings so each one checks out (and opens) its own connection
+        """
+        if not cls.client or settings.MONGO_MIN_POOL_SIZE <= 0:
+            return
+        try:
+            await asyncio.gather(*[
+                cls.client.admin.command('ping') for _ in range(settings.MONGO_MIN_POOL_SIZE)
+            ])
+            print(f"🔥 MongoDB connection pool pre-warmed ({settings.MONGO_MIN_POOL_SIZE} connections)")
+        except Exception as e:
+            # The pool will still fill lazily; never block startup on pre-warming
+            print(f"⚠️ Could not pre-warm MongoDB connection pool: {e}")
+    
+    @classmethod
+    async def ping(cls, timeout_seconds: float) -> float:
+        """
+        Ping MongoDB within a time limit and record the latency
+        
+        Args:
+            timeout_seconds: Maximum time to wait for the ping
+            
+        Returns:
+            Ping round-trip time in milliseconds
+            
+        Raises:
+            Exception: If not connected, the ping fails or it times out
+        """
+        if not cls.client:
+            raise Exception("Database not connected. Call connect_db() first.")
+        started = time.perf_counter()
+        await asyncio.wait_for(cls.client.admin.command('ping'), timeout=timeout_seconds)
+        latency_ms = (time.perf_counter() - started) * 1000
+        ping_latency.record(latency_ms)
+        return latency_ms
+    
+    @classmethod
+    @asynccontextmanager
+    async def transaction(cls, enabled: bool = True) -> AsyncIterator[Optional[Any]]:
+        """
+        Run a block inside a multi-document transaction
+        Transactions need a replica set or sharded cluster; when disabled the block
+        runs without a session and this yields None
+        
+        Args:
+            enabled: Whether to open a transaction at all
+            
+        Yields:
+            Client session to pass as `session=` to every operation, or None
+        """
+        if not enabled:
+            yield None
+            return
+        if not cls.client:
+            raise Exception("Database not connected. Call connect_db() first.")
+        async with await cls.client.start_session() as session:
+            async with session.start_transaction():
+                yield session
+    
     @classmethod
     async def close_db(cls):
         """
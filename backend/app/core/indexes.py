@@ -0,0 +1,210 @@
+"""
+Index registry module
+Declares the MongoDB indexes every hot query relies on and ensures them at startup
+"""
+from typing import Dict, List, Any
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from .config import settings
+from .database import Database
+from app.models.application import ACTIVE_APPLICATION_STATUSES
+
+
+# Index options compared when checking an existing index against its declaration
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+# collection name -> declared indexes
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # Login, signup duplicate check and legacy-token lookup
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "jobs": [
+        # Public listing: GET /api/jobs/ always filters is_active=True and sorts newest first
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="active_status_created",
+            partialFilterExpression={"is_active": True},
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("job_type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="active_status_type_created",
+            partialFilterExpression={"is_active": True},
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("category", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="active_status_category_created",
+            partialFilterExpression={"is_active": True},
+        ),
+        # Employer's own postings (keyset-paginated on created_at, _id)
+        IndexModel(
+            [("employer_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="employer_created_id",
+        ),
+    ],
+    "applications": [
+        # Applicants of a job (employer view) and status cascades on job updates
+        IndexModel([("job_id", ASCENDING), ("applied_at", DESCENDING), ("_id", DESCENDING)], name="job_applied_id"),
+        IndexModel([("job_id", ASCENDING), ("status", ASCENDING)], name="job_status"),
+        # One active application per user and job; duplicate applies fail the insert itself.
+        # Legacy applications need applicant_id (app.migrations.application_applicant_id).
+        # $in in a partial filter needs MongoDB 6.0+. Creation fails (and is reported)
+        # while duplicate active applications still exist.
+        IndexModel(
+            [("job_id", ASCENDING), ("applicant_id", ASCENDING)],
+            name="job_applicant_active_unique",
+            unique=True,
+            partialFilterExpression={"status": {"$in": ACTIVE_APPLICATION_STATUSES}},
+        ),
+        # A user's applications ($or over legacy worker_id / applicant_id), keyset-paginated
+        IndexModel([("applicant_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="applicant_created_id"),
+        IndexModel([("applicant_id", ASCENDING), ("applied_at", DESCENDING), ("_id", DESCENDING)], name="applicant_applied_id"),
+        IndexModel([("worker_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="worker_created_id"),
+    ],
+    "application_messages": [
+        # One bucket per (thread, bucket number); also serves thread page reads
+        IndexModel([("application_id", ASCENDING), ("bucket", ASCENDING)], name="application_bucket_unique", unique=True),
+    ],
+    "negotiations": [
+        # Duplicate check on start and per-job listing
+        IndexModel([("job_id", ASCENDING), ("worker_id", ASCENDING), ("status", ASCENDING)], name="job_worker_status"),
+        IndexModel([("job_id", ASCENDING), ("updated_at", DESCENDING)], name="job_updated"),
+        # "My negotiations" ($or over worker_id / employer_id)
+        IndexModel([("worker_id", ASCENDING), ("updated_at", DESCENDING)], name="worker_updated"),
+        IndexModel([("employer_id", ASCENDING), ("updated_at", DESCENDING)], name="employer_updated"),
+    ],
+    "negotiation_journal": [
+        # Recovery reads and post-flush cleanup per negotiation, in message order
+        IndexModel([("negotiation_id", ASCENDING), ("seq", ASCENDING)], name="negotiation_seq"),
+        # Safety net for entries whose negotiation was never flushed
+        IndexModel([("created_at", ASCENDING)], name="created_ttl", expireAfterSeconds=settings.JOURNAL_RETENTION_SECONDS),
+    ],
+    "negotiation_leases": [
+        # Removes leases whose worker stopped renewing them (expired ones can be taken over before that)
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    "ratings": [
+        IndexModel([("worker_id", ASCENDING), ("created_at", DESCENDING)], name="worker_created"),
+        IndexModel([("job_id", ASCENDING), ("employer_id", ASCENDING), ("worker_id", ASCENDING)], name="job_employer_worker"),
+    ],
+    "notifications": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+        # Unread inbox pages and mark-all-read
+        IndexModel(
+            [("user_id", ASCENDING), ("read", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_read_created_id",
+        ),
+        # Replay of the gap after a reconnecting socket's last_seq
+        IndexModel([("user_id", ASCENDING), ("seq", ASCENDING)], name="user_seq"),
+    ],
+    "revoked_tokens": [
+        # Revocations are dropped by MongoDB once every affected token has expired
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+    ],
+}
+
+
+def _key_signature(key: Any) -> List[tuple]:
+    """Normalize an index key spec (SON, dict or list of pairs) for comparison"""
+    items = key.items() if hasattr(key, "items") else key
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in items]
+
+
+def _options(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the compared options from an index document"""
+    return {opt: spec[opt] for opt in _COMPARED_OPTIONS if spec.get(opt) is not None and spec.get(opt) is not False}
+
+
+async def ensure_indexes() -> Dict[str, Any]:
+    """
+    Create missing declared indexes and report drift
+    Safe to run on every startup: existing matching indexes are left untouched,
+    and indexes that differ from their declaration are reported, never dropped
+
+    Returns:
+        Report with created, drifted and undeclared indexes per collection
+    """
+    db = Database.get_database()
+    report: Dict[str, Any] = {"created": [], "drift": [], "undeclared": [], "errors": []}
+
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        try:
+            existing = await collection.index_information()
+        except Exception as e:
+            report["errors"].append(f"{collection_name}: {e}")
+            continue
+
+        existing_by_key = {
+            tuple(_key_signature(info["key"])): name for name, info in existing.items()
+        }
+        declared_names = {"_id_"}
+        missing: List[IndexModel] = []
+
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            key = tuple(_key_signature(spec["key"]))
+            declared_names.add(name)
+
+            current = existing.get(name)
+            if current is None and key in existing_by_key:
+                # Same keys under another name (e.g. created by hand)
+                current_name = existing_by_key[key]
+                current = existing[current_name]
+                declared_names.add(current_name)
+
+            if current is None:
+                missing.append(model)
+                continue
+
+            if tuple(_key_signature(current["key"])) != key or _options(current) != _options(spec):
+                report["drift"].append({
+                    "collection": collection_name,
+                    "name": name,
+                    "declared": {"key": list(key), **_options(spec)},
+                    "existing": {"key": _key_signature(current["key"]), **_options(current)},
+                })
+
+        for name in existing:
+            if name not in declared_names:
+                report["undeclared"].append(f"{collection_name}.{name}")
+
+        if missing:
+            try:
+                created = await collection.create_indexes(missing)
+                report["created"].extend(f"{collection_name}.{name}" for name in created)
+            except Exception as e:
+                report["errors"].append(f"{collection_name}: {e}")
+
+    return report
+
+
+async def index_usage_report() -> List[Dict[str, Any]]:
+    """
+    Report indexes that have not been used since the server last started
+    Based on $indexStats, so counters are per mongod and reset on restart
+
+    Returns:
+        List of {"collection", "name", "since"} for indexes with zero recorded accesses
+    """
+    db = Database.get_database()
+    unused: List[Dict[str, Any]] = []
+
+    for collection_name in INDEXES:
+        try:
+            cursor = db[collection_name].aggregate([{"$indexStats": {}}])
+            async for stat in cursor:
+                if stat.get("name") == "_id_":
+                    continue
+                if int(stat.get("accesses", {}).get("ops", 0)) == 0:
+                    unused.append({
+                        "collection": collection_name,
+                        "name": stat.get("name"),
+                        "since": stat.get("accesses", {}).get("since"),
+                    })
+        except Exception as e:
+            print(f"Error reading index stats for {collection_name}: {e}")
+
+    return unused
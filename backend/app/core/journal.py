@@ -0,0 +1,138 @@
+"""
+Write-behind journal module
+Buffers entries in memory and appends them to a MongoDB collection in micro-batches,
+so hot paths never wait on the database and a crash loses at most one batch window
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pymongo.errors import BulkWriteError
+from .config import settings
+from .database import Database
+
+
+class WriteBehindJournal:
+    """
+    Micro-batched journal writer
+    A batch is written every JOURNAL_FLUSH_INTERVAL_MS, or as soon as
+    JOURNAL_BATCH_SIZE entries are waiting (unless overridden per journal)
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        flush_interval_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_buffer: Optional[int] = None,
+        before_write: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+        on_written: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+    ):
+        self.collection_name = collection_name
+        self.flush_interval_ms = flush_interval_ms or settings.JOURNAL_FLUSH_INTERVAL_MS
+        self.batch_size = batch_size or settings.JOURNAL_BATCH_SIZE
+        self.max_buffer = max_buffer or settings.JOURNAL_MAX_BUFFER
+        # Called with each batch before it is inserted (may fill in fields) and with the
+        # entries actually stored afterwards
+        self.before_write = before_write
+        self.on_written = on_written
+        self.buffer: List[Dict[str, Any]] = []
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    def append(self, entry: Dict[str, Any]):
+        """
+        Queue an entry for the next batch (never blocks)
+        When the database is unreachable for long the oldest entries are dropped
+        """
+        self.buffer.append(entry)
+        overflow = len(self.buffer) - self.max_buffer
+        if overflow > 0:
+            del self.buffer[:overflow]
+            self.dropped += overflow
+        if len(self.buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write everything buffered so far in one insert_many"""
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        try:
+            if self.before_write:
+                await self.before_write(batch)
+            await Database.get_collection(self.collection_name).insert_many(batch, ordered=False)
+            written = batch
+        except BulkWriteError as e:
+            # Only the rejected entries are retried; duplicates were stored by an earlier attempt
+            errors = {err["index"]: err.get("code") for err in e.details.get("writeErrors", [])}
+            retry = [entry for i, entry in enumerate(batch) if i in errors and errors[i] != 11000]
+            written = [entry for i, entry in enumerate(batch) if i not in errors]
+            if retry:
+                self.failed_batches += 1
+                self.buffer = retry + self.buffer
+                print(f"Error writing {len(retry)} {self.collection_name} entries: {e}")
+        except Exception as e:
+            # Put the batch back in front of newer entries and retry on the next tick
+            self.failed_batches += 1
+            self.buffer = batch + self.buffer
+            print(f"Error writing {self.collection_name} batch: {e}")
+            return
+
+        self.written += len(written)
+        if written and self.on_written:
+            try:
+                await self.on_written(written)
+            except Exception as e:
+                print(f"Error after writing {self.collection_name} batch: {e}")
+
+    async def _run(self):
+        interval = max(1, self.flush_interval_ms) / 1000
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        """Start the batch writer (called on startup)"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the batch writer and write what is left (called on shutdown)"""
+        if self._task:
+            # Let a batch already being written finish instead of cancelling it mid-insert
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await self._task
+            except Exception as e:
+                print(f"Error stopping {self.collection_name} writer: {e}")
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get buffered, written and dropped entry counts"""
+        return {
+            "buffered": len(self.buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
+
+
+# Live negotiation chat messages not yet appended to their negotiation document
+negotiation_journal = WriteBehindJournal("negotiation_journal")
+
+# Notification documents; request handlers only enqueue them
+notification_writer = WriteBehindJournal(
+    "notifications",
+    flush_interval_ms=settings.NOTIFICATION_FLUSH_INTERVAL_MS,
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+)
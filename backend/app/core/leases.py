@@ -0,0 +1,104 @@
+"""
+Lease module
+Time-bounded ownership of keys shared by several worker processes, stored in MongoDB.
+A lease is held until released or until its holder stops renewing it.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Set
+from pymongo.errors import DuplicateKeyError
+from .bus import WORKER_ID
+from .config import settings
+from .database import Database
+
+
+class LeaseTable:
+    """
+    Leases of one kind of key (one document per held key)
+
+    Document structure:
+    {
+        "_id": "<key>",
+        "owner": "<WORKER_ID>",
+        "expires_at": datetime
+    }
+
+    With the in-process message bus there is a single worker, so every lease is
+    granted locally without touching the database.
+    """
+
+    def __init__(self, collection_name: str, ttl_seconds: int):
+        self.collection_name = collection_name
+        self.ttl_seconds = ttl_seconds
+        self.held: Set[str] = set()
+        self.lost = 0
+
+    @property
+    def local(self) -> bool:
+        return settings.MESSAGE_BUS == "memory"
+
+    def _collection(self):
+        return Database.get_collection(self.collection_name)
+
+    def _expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+
+    async def acquire(self, key: str) -> bool:
+        """
+        Take the lease on `key` unless another worker holds an unexpired one
+
+        Returns:
+            True if this worker now holds the lease
+        """
+        if not self.local:
+            try:
+                await self._collection().update_one(
+                    {"_id": key, "$or": [{"owner": WORKER_ID}, {"expires_at": {"$lte": datetime.utcnow()}}]},
+                    {"$set": {"owner": WORKER_ID, "expires_at": self._expiry()}},
+                    upsert=True,
+                )
+            except DuplicateKeyError:
+                # The filter missed because another worker holds the lease
+                return False
+        self.held.add(key)
+        return True
+
+    async def renew(self) -> Set[str]:
+        """
+        Extend every held lease (call well within the TTL)
+
+        Returns:
+            Keys whose lease was taken over by another worker meanwhile
+        """
+        if self.local or not self.held:
+            return set()
+        keys = list(self.held)
+        collection = self._collection()
+        await collection.update_many(
+            {"_id": {"$in": keys}, "owner": WORKER_ID},
+            {"$set": {"expires_at": self._expiry()}},
+        )
+        kept = set(await collection.distinct("_id", {"_id": {"$in": keys}, "owner": WORKER_ID}))
+        lost = {key for key in keys if key not in kept and key in self.held}
+        self.held -= lost
+        self.lost += len(lost)
+        return lost
+
+    async def release(self, key: str):
+        """Give up the lease on `key` so another worker can take it at once"""
+        self.held.discard(key)
+        if not self.local:
+            await self._collection().delete_one({"_id": key, "owner": WORKER_ID})
+
+    async def release_all(self):
+        """Give up every held lease (called on shutdown)"""
+        keys, self.held = list(self.held), set()
+        if keys and not self.local:
+            await self._collection().delete_many({"_id": {"$in": keys}, "owner": WORKER_ID})
+
+    def stats(self) -> Dict[str, Any]:
+        """Get held and lost lease counts"""
+        return {"held": len(self.held), "lost": self.lost}
+
+
+# Live negotiation sessions: the holder keeps the authoritative session and persists it
+negotiation_leases = LeaseTable("negotiation_leases", settings.NEGOTIATION_LEASE_SECONDS)
@@ -0,0 +1,197 @@
+"""
+Runtime monitoring module
+Collects MongoDB pool usage, ping latency and event-loop lag for the readiness probe
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Optional
+from pymongo import monitoring
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Connection pool event listener (CMAP) tracking open and checked-out connections
+    The driver keeps one pool per server, so checked-out connections are also counted per
+    server address. Callbacks run on driver threads, so counters are guarded by a lock
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.checked_out_by_server: Dict[str, int] = {}
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.checked_out_by_server.pop(self._server(event), None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        server = self._server(event)
+        with self._lock:
+            self.checked_out += 1
+            self.checked_out_by_server[server] = self.checked_out_by_server.get(server, 0) + 1
+
+    def connection_checked_in(self, event):
+        server = self._server(event)
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+            self.checked_out_by_server[server] = max(0, self.checked_out_by_server.get(server, 0) - 1)
+
+    @staticmethod
+    def _server(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def stats(self) -> Dict[str, Any]:
+        """Get current pool usage"""
+        with self._lock:
+            return {
+                "open": self.open_connections,
+                "checked_out": self.checked_out,
+                # Busiest single pool; each pool is capped at maxPoolSize on its own
+                "max_server_checked_out": max(self.checked_out_by_server.values(), default=0),
+                "checked_out_by_server": dict(self.checked_out_by_server),
+                "available": max(0, self.open_connections - self.checked_out),
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+            }
+
+
+class LatencyWindow:
+    """Rolling window of latency samples (milliseconds) with percentile summaries"""
+
+    def __init__(self, size: int = 256):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, value_ms: float):
+        self.samples.append(value_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the current window, or None if empty"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+        return round(ordered[index], 2)
+
+    def summary(self) -> Dict[str, Any]:
+        """Get sample count and p50/p95/p99/max"""
+        return {
+            "samples": len(self.samples),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(max(self.samples), 2) if self.samples else None,
+        }
+
+
+class EventLoopLagMonitor:
+    """
+    Measures event-loop lag by sleeping a fixed interval and timing the overshoot
+    A busy or blocked loop wakes up late, which shows up as lag
+    """
+
+    def __init__(self, interval_seconds: float = 0.5):
+        self.interval_seconds = interval_seconds
+        self.window = LatencyWindow(size=120)
+        self.last_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval_seconds)
+            lag_ms = max(0.0, (time.perf_counter() - started - self.interval_seconds) * 1000)
+            self.last_lag_ms = lag_ms
+            self.window.record(lag_ms)
+
+    def start(self):
+        """Start sampling (called on startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling (called on shutdown)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get last measured lag and rolling percentiles"""
+        return {"last_ms": round(self.last_lag_ms, 2), **self.window.summary()}
+
+
+class OperationStats:
+    """
+    Per-operation counters for multi-step write paths
+    Records how many database round trips each run took and how long it ran
+    """
+
+    def __init__(self):
+        self.operations: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, round_trips: int, duration_ms: float):
+        """Record one run of an operation (e.g. 'applicant_status.accepted')"""
+        entry = self.operations.get(name)
+        if entry is None:
+            entry = {"count": 0, "round_trips": 0, "max_round_trips": 0, "latency": LatencyWindow(size=128)}
+            self.operations[name] = entry
+        entry["count"] += 1
+        entry["round_trips"] += round_trips
+        entry["max_round_trips"] = max(entry["max_round_trips"], round_trips)
+        entry["latency"].record(duration_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-operation run count, average and max round trips, and latency percentiles"""
+        return {
+            name: {
+                "count": entry["count"],
+                "avg_round_trips": round(entry["round_trips"] / entry["count"], 2),
+                "max_round_trips": entry["max_round_trips"],
+                **entry["latency"].summary(),
+            }
+            for name, entry in self.operations.items()
+        }
+
+
+# Process-wide monitors
+pool_monitor = PoolMonitor()
+ping_latency = LatencyWindow()
+loop_lag_monitor = EventLoopLagMonitor()
+write_path_stats = OperationStats()
@@ -0,0 +1,245 @@
+"""
+Outbound WebSocket module
+Each connection gets a bounded outbound queue drained by its own writer task, so producers
+never wait on a socket and one stalled client cannot delay delivery to the others.
+One heartbeat sweeper pings quiet sockets and reaps the ones that stopped answering.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from fastapi import WebSocket
+from .config import settings
+
+
+# Queued in place of a message to close the socket once everything before it was sent
+_CLOSE = object()
+
+# Close code sent to clients dropped for not keeping up (RFC 6455 "try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Close code sent to clients that stopped answering pings ("going away")
+IDLE_CLOSE_CODE = 1001
+
+# Close code sent to a user's oldest socket when a new one exceeds the per-user cap ("policy violation")
+CONNECTION_CAP_CLOSE_CODE = 1008
+
+
+class OutboundStats:
+    """Process-wide counters for outbound WebSocket delivery"""
+
+    def __init__(self):
+        self.open = 0
+        self.queued = 0
+        self.sent = 0
+        self.evicted = 0
+        self.send_errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get open socket count and delivery counters"""
+        return {
+            "open": self.open,
+            "queued": self.queued,
+            "sent": self.sent,
+            "evicted_slow_consumers": self.evicted,
+            "send_errors": self.send_errors,
+        }
+
+
+outbound_stats = OutboundStats()
+
+# Background closes of evicted sockets (kept referenced until they finish)
+_closing: Set[asyncio.Task] = set()
+
+# Every socket whose writer is still running (walked by the heartbeat sweeper)
+live_sockets: Set["OutboundSocket"] = set()
+
+
+class OutboundSocket:
+    """
+    WebSocket wrapper with a bounded send queue
+
+    send() enqueues without blocking. A client whose queue overflows, or whose socket
+    stalls a single send for WS_SEND_TIMEOUT_SECONDS, is closed as a slow consumer.
+    Endpoints call touch() for every frame received; the sweeper uses it for liveness.
+    """
+
+    def __init__(self, ws: WebSocket, max_queue: Optional[int] = None):
+        self.ws = ws
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue or settings.WS_OUTBOUND_QUEUE_SIZE))
+        self.closed = False
+        self.last_seen = time.monotonic()
+        self.last_ping = self.last_seen
+        live_sockets.add(self)
+        outbound_stats.open += 1
+        self._writer = asyncio.create_task(self._run())
+        self._writer.add_done_callback(self._finished)
+
+    def send(self, message: Dict[str, Any]) -> bool:
+        """
+        Queue a JSON message for this socket (never blocks)
+
+        Returns:
+            False if the socket is closed or was just evicted for a full queue
+        """
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._evict()
+            return False
+        outbound_stats.queued += 1
+        return True
+
+    def close(self, code: int = 1000, reason: Optional[str] = None):
+        """Close the socket after the messages already queued are sent (never blocks)"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.queue.put_nowait((_CLOSE, code, reason))
+        except asyncio.QueueFull:
+            self.abort(code, reason)
+
+    def touch(self):
+        """Record that the client sent something (any frame counts as a pong)"""
+        self.last_seen = time.monotonic()
+
+    def discard(self):
+        """Stop the writer of a socket the client already disconnected"""
+        if not self._writer.done():
+            self._writer.cancel()
+        self.closed = True
+
+    async def wait_closed(self, timeout: float):
+        """Wait up to `timeout` seconds for the queue to be sent and the socket closed"""
+        done, _ = await asyncio.wait({self._writer}, timeout=timeout)
+        if not done:
+            self.discard()
+
+    def _finished(self, _task: asyncio.Task):
+        self.closed = True
+        live_sockets.discard(self)
+        outbound_stats.open -= 1
+
+    def _evict(self):
+        outbound_stats.evicted += 1
+        self.abort(SLOW_CONSUMER_CLOSE_CODE, "Slow consumer")
+
+    def abort(self, code: int, reason: Optional[str]):
+        """Drop whatever is queued and close right away"""
+        self.discard()
+
+        async def _close():
+            try:
+                await asyncio.wait_for(self.ws.close(code=code, reason=reason), timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+            except Exception:
+                pass
+
+        task = asyncio.create_task(_close())
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+
+    async def _run(self):
+        while True:
+            message = await self.queue.get()
+            if isinstance(message, tuple) and message[0] is _CLOSE:
+                _, code, reason = message
+                try:
+                    await asyncio.wait_for(self.ws.close(code=code, reason=reason), timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+                except Exception:
+                    pass
+                return
+            try:
+                await asyncio.wait_for(self.ws.send_json(message), timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+                outbound_stats.sent += 1
+            except asyncio.TimeoutError:
+                # The writer is done either way; close without waiting on the stalled socket
+                self.closed = True
+                outbound_stats.evicted += 1
+                asyncio.get_running_loop().call_soon(self.abort, SLOW_CONSUMER_CLOSE_CODE, "Slow consumer")
+                return
+            except Exception:
+                self.closed = True
+                outbound_stats.send_errors += 1
+                return
+
+
+class HeartbeatSweeper:
+    """
+    Single periodic task covering every live socket
+    Sends {"type": "ping"} to sockets quiet for WS_PING_INTERVAL_SECONDS (clients answer
+    {"type": "pong"}), closes sockets silent for WS_IDLE_TIMEOUT_SECONDS, then runs the
+    registered prune hooks that drop closed sockets from the endpoints' registries
+    """
+
+    def __init__(self):
+        self._hooks: List[Tuple[str, Callable[[], Awaitable[int]]]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+        self.pings = 0
+        self.reaped = 0
+        self.pruned = 0
+
+    def register(self, name: str, hook: Callable[[], Awaitable[int]]):
+        """Register a prune hook returning how many closed sockets it dropped"""
+        self._hooks.append((name, hook))
+
+    async def sweep(self):
+        """Ping quiet sockets, reap silent ones and prune the registries"""
+        now = time.monotonic()
+        for sock in list(live_sockets):
+            if sock.closed:
+                continue
+            if now - sock.last_seen > settings.WS_IDLE_TIMEOUT_SECONDS:
+                # Half-open connection (the client vanished without a close frame)
+                self.reaped += 1
+                sock.abort(IDLE_CLOSE_CODE, "Idle timeout")
+            elif now - max(sock.last_seen, sock.last_ping) >= settings.WS_PING_INTERVAL_SECONDS:
+                sock.last_ping = now
+                if sock.send({"type": "ping"}):
+                    self.pings += 1
+
+        for name, hook in self._hooks:
+            try:
+                self.pruned += await hook()
+            except Exception as e:
+                print(f"Error pruning {name} sockets: {e}")
+        self.sweeps += 1
+
+    async def _run(self):
+        interval = max(1.0, min(settings.WS_SWEEP_INTERVAL_SECONDS, settings.WS_PING_INTERVAL_SECONDS))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Error sweeping sockets: {e}")
+
+    def start(self):
+        """Start the sweeper (called on startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the sweeper (called on shutdown)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get live socket gauge and sweeper counters"""
+        return {
+            "live_sockets": len(live_sockets),
+            "sweeps": self.sweeps,
+            "pings": self.pings,
+            "reaped_idle": self.reaped,
+            "pruned": self.pruned,
+        }
+
+
+heartbeat = HeartbeatSweeper()
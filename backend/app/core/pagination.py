@@ -0,0 +1,127 @@
+"""
+Pagination module
+Opaque keyset cursors over (sort field, _id) so deep pages stay an index range scan
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from .config import settings
+
+
+def encode_cursor(sort_value: Any, doc_id: Any) -> str:
+    """
+    Encode the position after a document as an opaque cursor
+
+    Args:
+        sort_value: Value of the sort field (datetime or JSON-serializable)
+        doc_id: Document _id (ObjectId or string)
+
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(sort_value, datetime):
+        value = {"d": sort_value.isoformat()}
+    else:
+        value = {"v": sort_value}
+    raw = json.dumps({**value, "i": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from a previous response
+
+    Returns:
+        Tuple of (sort value, ObjectId)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        sort_value = datetime.fromisoformat(data["d"]) if "d" in data else data["v"]
+        return sort_value, ObjectId(data["i"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_filter(field: str, cursor: str, descending: bool = True) -> Dict[str, Any]:
+    """
+    Build the range filter selecting documents after a cursor
+    Requires the query to sort by (field, _id) in the same direction
+
+    Args:
+        field: Sort field name (e.g. 'created_at')
+        cursor: Cursor string from a previous response
+        descending: Whether the sort is descending
+
+    Returns:
+        MongoDB filter to merge into the query with $and
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    sort_value, doc_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {
+        "$or": [
+            {field: {op: sort_value}},
+            {field: sort_value, "_id": {op: doc_id}},
+        ]
+    }
+
+
+def next_cursor(items: List[Dict[str, Any]], limit: int, field: str) -> Optional[str]:
+    """
+    Cursor for the page after `items`, or None when this was the last page
+
+    Args:
+        items: Documents of the current page (with raw sort field and _id)
+        limit: Page size requested
+        field: Sort field name
+
+    Returns:
+        Cursor string or None
+    """
+    if limit <= 0 or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.get(field), last["_id"])
+
+
+def page_size(limit: Optional[int]) -> int:
+    """
+    Clamp a client-supplied page size to the configured bounds
+
+    Args:
+        limit: Requested page size, or None for the default
+
+    Returns:
+        Page size between 1 and LIST_MAX_PAGE_SIZE
+    """
+    if limit is None:
+        return settings.LIST_PAGE_SIZE
+    return max(1, min(limit, settings.LIST_MAX_PAGE_SIZE))
+
+
+def list_page_size(limit: Optional[int], cursor: Optional[str]) -> int:
+    """
+    Page size for list endpoints that returned everything before they were paginated
+    Clients sending neither `limit` nor `cursor` still get the full list in one response
+
+    Args:
+        limit: Requested page size
+        cursor: Cursor from a previous page
+
+    Returns:
+        0 (no limit) when both are absent, otherwise page_size(limit)
+    """
+    if limit is None and cursor is None:
+        return 0
+    return page_size(limit)
@@ -0,0 +1,193 @@
+"""
+Token revocation module
+Keeps a compact in-memory copy of the revoked_tokens collection so tokens can be
+rejected without a per-request database lookup
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any
+from .config import settings
+from .database import Database
+
+
+class RevocationList:
+    """
+    In-memory revocation filter refreshed periodically from MongoDB
+
+    Document structure (revoked_tokens collection):
+    {
+        "jti": "3f2a...",          # Revoked token id, or None to revoke every token of the user
+        "user_id": "65f0...",
+        "reason": "logout",        # 'logout', 'banned', 'forced_logout', ...
+        "revoked_at": datetime,
+        "expires_at": datetime     # After this no affected token can still be valid
+    }
+    """
+
+    # jti -> expiry epoch of the revoked token
+    revoked_jtis: Dict[str, float] = {}
+    # user_id -> epoch; tokens of that user issued before it are rejected
+    user_cutoffs: Dict[str, float] = {}
+
+    _last_revoked_at: Optional[datetime] = None
+    _refresh_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _collection():
+        return Database.get_collection("revoked_tokens")
+
+    @staticmethod
+    def _epoch(value: datetime) -> float:
+        """Convert a naive UTC datetime to a unix timestamp (sub-second precision kept)"""
+        return value.replace(tzinfo=timezone.utc).timestamp()
+
+    @classmethod
+    def _apply(cls, doc: Dict[str, Any]):
+        """Merge one revoked_tokens document into the in-memory filter"""
+        expires_at = doc.get("expires_at")
+        expires_epoch = cls._epoch(expires_at) if expires_at else time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+        if doc.get("jti"):
+            cls.revoked_jtis[doc["jti"]] = expires_epoch
+        elif doc.get("user_id"):
+            cutoff = cls._epoch(doc["revoked_at"]) if doc.get("revoked_at") else time.time()
+            user_id = str(doc["user_id"])
+            cls.user_cutoffs[user_id] = max(cutoff, cls.user_cutoffs.get(user_id, 0.0))
+
+        revoked_at = doc.get("revoked_at")
+        if revoked_at and (cls._last_revoked_at is None or revoked_at > cls._last_revoked_at):
+            cls._last_revoked_at = revoked_at
+
+    @classmethod
+    def _prune(cls):
+        """Forget revocations whose tokens have expired anyway"""
+        now = time.time()
+        for jti in [j for j, exp in cls.revoked_jtis.items() if exp <= now]:
+            cls.revoked_jtis.pop(jti, None)
+        max_age = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        for user_id in [u for u, cutoff in cls.user_cutoffs.items() if cutoff + max_age <= now]:
+            cls.user_cutoffs.pop(user_id, None)
+
+    @classmethod
+    async def refresh(cls):
+        """
+        Load revocations added since the last refresh
+        The first call loads every unexpired revocation
+        """
+        query: Dict[str, Any] = {"expires_at": {"$gt": datetime.utcnow()}}
+        if cls._last_revoked_at is not None:
+            query["revoked_at"] = {"$gte": cls._last_revoked_at}
+
+        cursor = cls._collection().find(query, {"_id": 0, "jti": 1, "user_id": 1, "revoked_at": 1, "expires_at": 1})
+        async for doc in cursor:
+            cls._apply(doc)
+        cls._prune()
+
+    @classmethod
+    def is_revoked(cls, payload: Dict[str, Any]) -> bool:
+        """
+        Check a decoded token payload against the filter
+
+        Args:
+            payload: Decoded JWT payload
+
+        Returns:
+            True if the token or all tokens of its user were revoked
+        """
+        jti = payload.get("jti")
+        if jti and jti in cls.revoked_jtis:
+            return True
+
+        user_id = payload.get("sub")
+        if user_id and str(user_id) in cls.user_cutoffs:
+            issued_at = payload.get("iat")
+            # Tokens without an issue time predate revocation support; treat them as revoked.
+            # A token issued right after the cutoff (e.g. logging in again) stays valid
+            if issued_at is None or float(issued_at) < cls.user_cutoffs[str(user_id)]:
+                return True
+        return False
+
+    @classmethod
+    async def revoke_token(cls, payload: Dict[str, Any], reason: str = "logout"):
+        """
+        Revoke a single token (e.g. on logout)
+
+        Args:
+            payload: Decoded JWT payload of the token to revoke
+            reason: Why the token was revoked
+        """
+        jti = payload.get("jti")
+        if not jti:
+            return
+
+        now = datetime.utcnow()
+        exp = payload.get("exp")
+        expires_at = datetime.utcfromtimestamp(exp) if exp else now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        doc = {
+            "jti": jti,
+            "user_id": str(payload.get("sub", "")),
+            "reason": reason,
+            "revoked_at": now,
+            "expires_at": expires_at,
+        }
+        await cls._collection().insert_one(doc)
+        cls.revoked_jtis[jti] = cls._epoch(expires_at)
+
+    @classmethod
+    async def revoke_user(cls, user_id: str, reason: str = "forced_logout"):
+        """
+        Revoke every token issued to a user so far (bans and forced logouts)
+
+        Args:
+            user_id: User's MongoDB _id as string
+            reason: Why the tokens were revoked
+        """
+        now = datetime.utcnow()
+        doc = {
+            "jti": None,
+            "user_id": str(user_id),
+            "reason": reason,
+            "revoked_at": now,
+            "expires_at": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        }
+        await cls._collection().insert_one(doc)
+        cls.user_cutoffs[str(user_id)] = cls._epoch(now)
+
+    @classmethod
+    async def _refresh_loop(cls):
+        """Background task re-reading the revoked_tokens collection"""
+        while True:
+            await asyncio.sleep(max(1, settings.REVOCATION_REFRESH_SECONDS))
+            try:
+                await cls.refresh()
+            except Exception as e:
+                print(f"Error refreshing token revocations: {e}")
+
+    @classmethod
+    async def start(cls):
+        """Load revocations and start the periodic refresh (called on startup)"""
+        try:
+            await cls.refresh()
+        except Exception as e:
+            print(f"Error loading token revocations: {e}")
+        cls._refresh_task = asyncio.create_task(cls._refresh_loop())
+
+    @classmethod
+    async def stop(cls):
+        """Stop the periodic refresh (called on shutdown)"""
+        if cls._refresh_task:
+            cls._refresh_task.cancel()
+            try:
+                await cls._refresh_task
+            except asyncio.CancelledError:
+                pass
+            cls._refresh_task = None
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Get size of the in-memory filter"""
+        return {
+            "revoked_tokens": len(cls.revoked_jtis),
+            "revoked_users": len(cls.user_cutoffs),
+        }
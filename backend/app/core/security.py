@@ -2,8 +2,11 @@
 Security module for JWT token generation and password hashing
 Handles all authentication-related cryptographic operations
 """
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Callable
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from .config import settings
@@ -12,6 +15,24 @@ from .config import settings
 # Password hashing context using bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool so bcrypt never runs on the event loop (bcrypt releases the GIL)
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+    thread_name_prefix="password-hash",
+)
+
+# Counters for the password hashing pool
+_password_hash_stats = {
+    "pending": 0,  # Submitted and not finished (running + queued)
+    "completed": 0,
+    "rejected": 0,
+    "max_queue_depth": 0,
+}
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full and the request should be retried later"""
+
 
 def hash_password(password: str) -> str:
     """
@@ -40,6 +61,97 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_password_hash(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a bcrypt operation in the password hashing pool
+    
+    Args:
+        func: Blocking hash/verify function
+        *args: Arguments passed to func
+        
+    Returns:
+        Result of func
+        
+    Raises:
+        PasswordHasherBusy: If the pool already has PASSWORD_HASH_MAX_QUEUE operations waiting
+    """
+    workers = max(1, settings.PASSWORD_HASH_WORKERS)
+    capacity = workers + max(0, settings.PASSWORD_HASH_MAX_QUEUE)
+    if _password_hash_stats["pending"] >= capacity:
+        _password_hash_stats["rejected"] += 1
+        raise PasswordHasherBusy("Password hashing queue is full")
+
+    _password_hash_stats["pending"] += 1
+    queue_depth = max(0, _password_hash_stats["pending"] - workers)
+    if queue_depth > _password_hash_stats["max_queue_depth"]:
+        _password_hash_stats["max_queue_depth"] = queue_depth
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_hash_executor, func, *args)
+    finally:
+        _password_hash_stats["pending"] -= 1
+        _password_hash_stats["completed"] += 1
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop
+    
+    Args:
+        password: Plain text password to hash
+        
+    Returns:
+        Hashed password string (bcrypt format)
+        
+    Raises:
+        PasswordHasherBusy: If the hashing queue is saturated
+    """
+    return await _run_password_hash(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password without blocking the event loop
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if password matches, False otherwise
+        
+    Raises:
+        PasswordHasherBusy: If the hashing queue is saturated
+    """
+    return await _run_password_hash(verify_password, plain_password, hashed_password)
+
+
+def password_hasher_stats() -> Dict[str, Any]:
+    """
+    Get password hashing pool metrics
+    
+    Returns:
+        Dictionary with worker count, running/queued operations and counters
+    """
+    workers = max(1, settings.PASSWORD_HASH_WORKERS)
+    pending = _password_hash_stats["pending"]
+    return {
+        "workers": workers,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "running": min(pending, workers),
+        "queue_depth": max(0, pending - workers),
+        "max_queue_depth": _password_hash_stats["max_queue_depth"],
+        "completed": _password_hash_stats["completed"],
+        "rejected": _password_hash_stats["rejected"],
+    }
+
+
+def shutdown_password_hasher():
+    """Stop the password hashing pool (called on application shutdown)"""
+    password_hash_executor.shutdown(wait=False, cancel_futures=True)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -55,13 +167,19 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     to_encode = data.copy()
     
     # Set expiration time
+    issued_at = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = issued_at + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = issued_at + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    # Add expiration to token payload
-    to_encode.update({"exp": expire})
+    # Add expiration, issue time and a unique id (used for revocation) to token payload.
+    # iat keeps sub-second precision so a token issued right after a revoke-all is not caught by it
+    to_encode.update({
+        "exp": expire,
+        "iat": issued_at.replace(tzinfo=timezone.utc).timestamp(),
+        "jti": uuid.uuid4().hex,
+    })
     
     # Encode JWT token
     encoded_jwt = jwt.encode(
@@ -0,0 +1,61 @@
+"""
+Graceful shutdown module
+Coordinates draining of in-memory state (chat sessions, sockets) within a deadline
+"""
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+from .config import settings
+
+
+class ShutdownCoordinator:
+    """
+    Runs registered drain hooks in order when the process shuts down
+    Once draining starts, WebSocket endpoints refuse new connections and /ready reports 503
+    """
+
+    def __init__(self):
+        self.draining = False
+        self._hooks: List[Tuple[str, Callable[[], Awaitable[None]]]] = []
+
+    def register(self, name: str, hook: Callable[[], Awaitable[None]]):
+        """Register a drain hook (run in registration order)"""
+        self._hooks.append((name, hook))
+
+    @staticmethod
+    def reconnect_delay_ms() -> int:
+        """Random reconnect delay so clients of a restarting worker do not reconnect all at once"""
+        return random.randint(0, max(0, settings.SHUTDOWN_RECONNECT_JITTER_MS))
+
+    async def drain(self) -> Dict[str, str]:
+        """
+        Stop accepting new sockets and run every drain hook within SHUTDOWN_DEADLINE_SECONDS
+        A hook that overruns the remaining time is cancelled and the next one still runs
+
+        Returns:
+            Outcome per hook ('ok', 'timeout', 'skipped' or the error)
+        """
+        self.draining = True
+        deadline = time.monotonic() + settings.SHUTDOWN_DEADLINE_SECONDS
+        results: Dict[str, str] = {}
+
+        for name, hook in self._hooks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                results[name] = "skipped"
+                continue
+            try:
+                await asyncio.wait_for(hook(), timeout=remaining)
+                results[name] = "ok"
+            except asyncio.TimeoutError:
+                results[name] = "timeout"
+            except Exception as e:
+                results[name] = f"error: {e}"
+
+        print(f"🧹 Drained: {', '.join(f'{name}={outcome}' for name, outcome in results.items()) or 'nothing'}")
+        return results
+
+
+# Process-wide coordinator; API modules register their drain hooks on import
+shutdown_coordinator = ShutdownCoordinator()
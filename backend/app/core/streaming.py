@@ -0,0 +1,53 @@
+"""
+Streaming module
+Newline-delimited JSON responses encoded document by document as they come off a Motor cursor
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Dict
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+logger = logging.getLogger(__name__)
+
+
+def _line(doc: Dict[str, Any]) -> bytes:
+    return (json.dumps(jsonable_encoder(doc), separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def _encode_ndjson(documents: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    Encode each document as one JSON line
+    The 200 status is already sent when a cursor fails mid-stream, so the failure is reported
+    as a final {"error": ...} line and the response is then aborted
+    """
+    try:
+        async for doc in documents:
+            yield _line(doc)
+    except Exception:
+        logger.exception("NDJSON stream failed")
+        yield _line({"error": "Stream interrupted; the list is incomplete"})
+        raise
+
+
+def ndjson_response(documents: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """
+    Stream documents as NDJSON
+    Only the current cursor batch is held in memory, so the response size is unbounded
+    while worker memory is not. Clients must treat a line with an "error" key (or an
+    aborted response) as a truncated list
+
+    Args:
+        documents: Async iterator of serialized documents
+
+    Returns:
+        StreamingResponse with one JSON document per line
+    """
+    return StreamingResponse(
+        _encode_ndjson(documents),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Cache-Control": "no-store", "X-Content-Type-Options": "nosniff"},
+    )
@@ -2,13 +2,28 @@
 FastAPI Application Entry Point
 Initializes the application, database connection, and routes
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
+import time
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.database import Database
+from app.core.revocation import RevocationList
+from app.core.background import cascade_worker
+from app.core.bus import message_bus
+from app.core.journal import negotiation_journal, notification_writer
+from app.core.leases import negotiation_leases
+from app.core.outbound import heartbeat, outbound_stats
+from app.core.shutdown import shutdown_coordinator
+from app.core.indexes import ensure_indexes, index_usage_report
+from app.core.monitoring import pool_monitor, ping_latency, loop_lag_monitor, write_path_stats
 from app.core.config import settings
+from app.core.security import password_hasher_stats, shutdown_password_hasher
+from app.services.auth_service import AuthService
 from app.api import auth, jobs
 from app.api import applications
 from app.api import rating
@@ -16,19 +31,86 @@ from app.api import negotiation
 from app.api import notifications
 
 
+# Process start time (reported by the liveness probe)
+STARTED_AT = time.monotonic()
+
+# Drained in this order on shutdown, while MongoDB is still connected
+shutdown_coordinator.register("negotiation_sessions", negotiation.drain_sessions)
+shutdown_coordinator.register("notification_sockets", notifications.drain_connections)
+
+# Closed sockets are dropped from these registries on every heartbeat sweep
+heartbeat.register("notification_sockets", notifications.prune_connections)
+heartbeat.register("negotiation_sessions", negotiation.prune_sessions)
+
+
+async def _bootstrap_indexes():
+    """Ensure declared indexes exist and log drift / unused indexes"""
+    try:
+        report = await ensure_indexes()
+        if report["created"]:
+            print(f"📇 Created indexes: {', '.join(report['created'])}")
+        for drift in report["drift"]:
+            print(f"⚠️ Index drift on {drift['collection']}.{drift['name']}: declared {drift['declared']}, found {drift['existing']}")
+        if report["undeclared"]:
+            print(f"⚠️ Undeclared indexes: {', '.join(report['undeclared'])}")
+        for error in report["errors"]:
+            print(f"❌ Error ensuring indexes: {error}")
+
+        unused = await index_usage_report()
+        if unused:
+            print(f"ℹ️ Indexes unused since server start: {', '.join(u['collection'] + '.' + u['name'] for u in unused)}")
+    except Exception as e:
+        # Never block startup on index maintenance
+        print(f"❌ Error bootstrapping indexes: {e}")
+
+
+async def _recover_negotiations():
+    """Append journaled chat messages lost by a previous crash to their negotiations"""
+    try:
+        recovered = await negotiation.recover_sessions_from_journal()
+        if recovered:
+            print(f"♻️ Recovered {recovered} negotiation sessions from the journal")
+    except Exception as e:
+        print(f"❌ Error recovering negotiation journal: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager
     Handles startup and shutdown events
     """
-    # Startup: Connect to MongoDB
+    # Startup: Connect to MongoDB, ensure indexes and load token revocations
     await Database.connect_db()
+    if settings.ENSURE_INDEXES_ON_STARTUP:
+        await _bootstrap_indexes()
+    await RevocationList.start()
+    cascade_worker.start()
+    negotiation_journal.start()
+    notification_writer.start()
+    await _recover_negotiations()
+    await message_bus.start()
+    negotiation.start_session_ownership()
+    heartbeat.start()
+    loop_lag_monitor.start()
     print("🚀 Application startup complete")
     
     yield
     
-    # Shutdown: Close MongoDB connection
+    # Shutdown: Drain sessions and sockets, stop background workers and close MongoDB connection
+    # No lease takeovers while sessions are being handed off
+    await negotiation.stop_session_ownership()
+    await heartbeat.stop()
+    await shutdown_coordinator.drain()
+    await message_bus.stop()
+    shutdown_password_hasher()
+    await loop_lag_monitor.stop()
+    await RevocationList.stop()
+    # Finish deferred cascades while the database is still connected
+    await cascade_worker.stop()
+    await negotiation_journal.stop()
+    # Store notifications queued by the last requests
+    await notification_writer.stop()
     await Database.close_db()
     print("🛑 Application shutdown complete")
 
@@ -101,27 +183,88 @@ async def root():
 @app.get("/health")
 async def health_check():
     """
-    Health check endpoint
-    Used to verify API is running and database is connected
+    Liveness endpoint
+    Only verifies the process and its event loop respond; never touches the database,
+    so a slow MongoDB does not get healthy workers restarted
+    
+    Returns:
+        Liveness status and uptime
+    """
+    return {
+        "status": "healthy",
+        "message": "API is running properly",
+        "uptime_seconds": round(time.monotonic() - STARTED_AT, 1),
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint
+    Runs a time-boxed MongoDB ping and checks pool saturation and event-loop lag,
+    so orchestrators can stop routing to (and drain) slow workers
     
     Returns:
-        Health status of API and database
+        Readiness status with ping latency percentiles, pool usage and loop lag
+        (HTTP 503 when not ready)
     """
+    checks = {}
+    ready = True
+
+    # Database ping
     try:
-        # Check if database is connected
-        db = Database.get_database()
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "message": "API is running properly"
-        }
+        latency_ms = await Database.ping(settings.READINESS_PING_TIMEOUT_MS / 1000)
+        checks["database"] = {"status": "connected", "ping_ms": round(latency_ms, 2)}
+    except asyncio.TimeoutError:
+        ready = False
+        checks["database"] = {"status": "timeout", "timeout_ms": settings.READINESS_PING_TIMEOUT_MS}
     except Exception as e:
-        return {
-            "status": "unhealthy",
-            "database": "disconnected",
-            "error": str(e)
-        }
+        ready = False
+        checks["database"] = {"status": "disconnected", "error": str(e)}
+    checks["database"]["latency"] = ping_latency.summary()
+
+    # Connection pool saturation
+    pool = pool_monitor.stats()
+    pool["max_pool_size"] = settings.MONGO_MAX_POOL_SIZE
+    pool["saturated"] = settings.MONGO_MAX_POOL_SIZE > 0 and pool["max_server_checked_out"] >= settings.MONGO_MAX_POOL_SIZE
+    if pool["saturated"]:
+        ready = False
+    checks["pool"] = pool
+
+    # Event-loop lag
+    loop_lag = loop_lag_monitor.stats()
+    loop_lag["threshold_ms"] = settings.READINESS_MAX_LOOP_LAG_MS
+    if loop_lag["last_ms"] > settings.READINESS_MAX_LOOP_LAG_MS:
+        ready = False
+    checks["event_loop_lag"] = loop_lag
+
+    # Draining workers must stop receiving traffic
+    if shutdown_coordinator.draining:
+        ready = False
+        checks["shutdown"] = {"status": "draining"}
+
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "checks": checks,
+        "principal_cache": AuthService.principal_cache_stats(),
+        "password_hasher": password_hasher_stats(),
+        "auth_mode": settings.AUTH_MODE,
+        "revocations": RevocationList.stats(),
+        "write_paths": write_path_stats.stats(),
+        "cascade_worker": cascade_worker.stats(),
+        "negotiation_journal": negotiation_journal.stats(),
+        "notification_writer": notification_writer.stats(),
+        "message_bus": message_bus.stats(),
+        "negotiation_leases": negotiation_leases.stats(),
+        "websocket_outbound": outbound_stats.stats(),
+        "websocket_heartbeat": heartbeat.stats(),
+        "notification_sockets": notifications.connection_stats(),
+        "negotiation_sessions": negotiation.session_stats(),
+    }
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=jsonable_encoder(body),
+    )
 
 
 # For development: Run with uvicorn
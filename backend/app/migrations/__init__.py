@@ -0,0 +1 @@
+# One-time data migrations
@@ -0,0 +1,82 @@
+"""
+Migration: replace jobs.applicants arrays with a maintained applicants_count counter
+Counts come from the applications collection (the source of truth for who applied).
+Every job is recounted, so counters an apply created from zero on a job that was not yet
+migrated are corrected too. Idempotent: only jobs whose count differs (or that still carry
+the applicants array) are written.
+
+Run from the backend directory:
+    python -m app.migrations.applicants_count
+"""
+import asyncio
+from typing import Dict, List
+from pymongo import UpdateOne
+from app.core.database import Database
+
+
+BATCH_SIZE = 500
+
+
+async def _count_applications(job_ids: List[str]) -> Dict[str, int]:
+    """Count non-cancelled applications per job id (matches the old array semantics)"""
+    applications_collection = Database.get_collection("applications")
+    pipeline = [
+        {"$match": {"job_id": {"$in": job_ids}, "status": {"$ne": "cancelled"}}},
+        {"$group": {"_id": "$job_id", "count": {"$sum": 1}}},
+    ]
+    counts: Dict[str, int] = {}
+    async for row in applications_collection.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return counts
+
+
+async def migrate_applicants_count() -> int:
+    """
+    Recount applicants_count on every job and drop the applicants array
+
+    Returns:
+        Number of job documents changed
+    """
+    jobs_collection = Database.get_collection("jobs")
+    cursor = jobs_collection.find({}, {"_id": 1})
+
+    migrated = 0
+    batch: List = []
+
+    async def flush(ids: List) -> int:
+        counts = await _count_applications([str(i) for i in ids])
+        operations = []
+        for job_id in ids:
+            count = counts.get(str(job_id), 0)
+            operations.append(UpdateOne(
+                {
+                    "_id": job_id,
+                    "$or": [{"applicants_count": {"$ne": count}}, {"applicants": {"$exists": True}}],
+                },
+                {"$set": {"applicants_count": count}, "$unset": {"applicants": ""}},
+            ))
+        result = await jobs_collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+
+    async for job in cursor:
+        batch.append(job["_id"])
+        if len(batch) >= BATCH_SIZE:
+            migrated += await flush(batch)
+            batch = []
+    if batch:
+        migrated += await flush(batch)
+
+    return migrated
+
+
+async def main():
+    await Database.connect_db()
+    try:
+        migrated = await migrate_applicants_count()
+        print(f"✅ Migrated applicants_count on {migrated} jobs")
+    finally:
+        await Database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
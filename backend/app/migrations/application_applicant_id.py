@@ -0,0 +1,73 @@
+"""
+Migration: copy worker_id into applicant_id on legacy applications
+The job_applicant_active_unique partial index only sees applicant_id, so applications that
+carry just worker_id are invisible to it and a second active apply would slip through.
+Idempotent: only applications without applicant_id are touched. An application whose copy
+would duplicate another active application of the same user is reported as a conflict and
+left unchanged for a manual look.
+
+Run from the backend directory:
+    python -m app.migrations.application_applicant_id
+"""
+import asyncio
+from typing import Dict, List
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.database import Database
+
+
+BATCH_SIZE = 500
+
+
+async def migrate_application_applicant_id() -> Dict[str, int]:
+    """
+    Backfill applicant_id from worker_id
+
+    Returns:
+        Counts of migrated and conflicting applications
+    """
+    applications_collection = Database.get_collection("applications")
+    cursor = applications_collection.find(
+        {"applicant_id": {"$exists": False}, "worker_id": {"$exists": True}},
+        {"worker_id": 1},
+    )
+
+    counts = {"migrated": 0, "conflicts": 0}
+
+    async def flush(operations: List[UpdateOne]):
+        try:
+            result = await applications_collection.bulk_write(operations, ordered=False)
+            counts["migrated"] += result.modified_count
+        except BulkWriteError as e:
+            counts["migrated"] += e.details.get("nModified", 0)
+            errors = e.details.get("writeErrors", [])
+            counts["conflicts"] += sum(1 for err in errors if err.get("code") == 11000)
+            if any(err.get("code") != 11000 for err in errors):
+                raise
+
+    batch: List[UpdateOne] = []
+    async for app in cursor:
+        batch.append(UpdateOne(
+            {"_id": app["_id"], "applicant_id": {"$exists": False}},
+            {"$set": {"applicant_id": app["worker_id"]}},
+        ))
+        if len(batch) >= BATCH_SIZE:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    return counts
+
+
+async def main():
+    await Database.connect_db()
+    try:
+        counts = await migrate_application_applicant_id()
+        print(f"✅ Backfilled applicant_id on {counts['migrated']} applications ({counts['conflicts']} conflicts)")
+    finally:
+        await Database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
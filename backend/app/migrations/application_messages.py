@@ -0,0 +1,148 @@
+"""
+Migration: move embedded applications.messages arrays into application_messages buckets
+Applications keep only message_count and last_message afterwards.
+
+Each application is first claimed: message_count jumps past the embedded history and
+thread_migration records the numbering, so messages sent from then on already get their
+final seq. Buckets are then upserted from the highest down (an old bucket is only replaced
+once the messages it held are stored in their new place), and the embedded array is only
+dropped after every bucket write succeeded. A crash at any point loses nothing and a rerun
+resumes the claimed applications.
+
+Idempotent: only applications still carrying a `messages` array are touched. An application
+with a message being stored while it is claimed is reported as skipped; run again to retry.
+
+Run from the backend directory:
+    python -m app.migrations.application_messages
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List
+from pymongo import ReplaceOne, UpdateOne
+from app.core.config import settings
+from app.core.database import Database
+from app.services.message_service import MessageService
+
+
+async def _claim(app: Dict[str, Any], buckets: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Fix the final numbering of an application's thread; returns thread_migration or None"""
+    applications_collection = Database.get_collection("applications")
+    count = app.get("message_count", 0)
+    stored = sorted(m.get("seq", -1) for bucket in buckets for m in bucket.get("messages", []))
+    if stored != list(range(count)):
+        return None  # A message is being stored right now
+
+    legacy_count = len(app.get("messages") or [])
+    migration = {"legacy_count": legacy_count, "total": legacy_count + count}
+    result = await applications_collection.update_one(
+        {
+            "_id": app["_id"],
+            "thread_migration": {"$exists": False},
+            "message_count": count if "message_count" in app else {"$exists": False},
+        },
+        {"$set": {"message_count": migration["total"], "thread_migration": migration}},
+    )
+    return migration if result.modified_count == 1 else None
+
+
+def _bucket_write(application_id: str, index: int, chunk: List[Dict[str, Any]], total: int):
+    """Upsert of one rewritten bucket (the last one may already hold messages sent since the claim)"""
+    bucket_size = max(1, settings.APPLICATION_MESSAGE_BUCKET_SIZE)
+    bucket_filter = {"application_id": application_id, "bucket": index}
+    if (index + 1) * bucket_size <= total:
+        sent = [m["sent_at"] for m in chunk if isinstance(m.get("sent_at"), datetime)]
+        return ReplaceOne(
+            bucket_filter,
+            {
+                **bucket_filter,
+                "count": len(chunk),
+                "messages": chunk,
+                "first_at": min(sent) if sent else None,
+                "last_at": max(sent) if sent else None,
+                "renumbered": True,
+            },
+            upsert=True,
+        )
+
+    newer = {"$filter": {"input": {"$ifNull": ["$messages", []]}, "as": "m", "cond": {"$gte": ["$$m.seq", total]}}}
+    return UpdateOne(
+        bucket_filter,
+        [
+            {"$set": {"messages": {"$concatArrays": [chunk, newer]}, "renumbered": True}},
+            {"$set": {
+                "count": {"$size": "$messages"},
+                "first_at": {"$min": "$messages.sent_at"},
+                "last_at": {"$max": "$messages.sent_at"},
+            }},
+        ],
+        upsert=True,
+    )
+
+
+async def _migrate_application(app: Dict[str, Any]) -> bool:
+    """Rewrite one application's thread into buckets; returns whether the application was migrated"""
+    applications_collection = Database.get_collection("applications")
+    messages_collection = Database.get_collection("application_messages")
+    application_id = str(app["_id"])
+    bucket_size = max(1, settings.APPLICATION_MESSAGE_BUCKET_SIZE)
+
+    buckets = await messages_collection.find({"application_id": application_id}).to_list(length=None)
+    migration = app.get("thread_migration") or await _claim(app, buckets)
+    if not migration:
+        return False
+
+    total = migration["total"]
+    thread = [m for m in MessageService.merge_legacy_thread(app.get("messages") or [], buckets, migration) if m["seq"] < total]
+    operations = [
+        _bucket_write(application_id, index, thread[index * bucket_size:(index + 1) * bucket_size], total)
+        for index in reversed(range(-(-total // bucket_size)))
+    ]
+    if operations:
+        await messages_collection.bulk_write(operations, ordered=True)
+
+    # Every bucket is stored; only now drop the embedded copy
+    done = {"$unset": {"messages": "", "thread_migration": ""}}
+    last_message = {k: v for k, v in thread[-1].items() if k != "seq"} if thread else None
+    result = await applications_collection.update_one(
+        {"_id": app["_id"], "thread_migration.total": total, "message_count": total},
+        {**done, "$set": {"last_message": last_message}},
+    )
+    if result.modified_count == 0:
+        # Messages sent since the claim already set last_message
+        await applications_collection.update_one({"_id": app["_id"], "thread_migration.total": total}, done)
+    return True
+
+
+async def migrate_application_messages() -> Dict[str, int]:
+    """
+    Move every embedded thread into application_messages
+
+    Returns:
+        Counts of migrated and skipped (message in flight) applications
+    """
+    applications_collection = Database.get_collection("applications")
+    cursor = applications_collection.find(
+        {"messages": {"$exists": True}},
+        {"messages": 1, "message_count": 1, "thread_migration": 1},
+    )
+
+    counts = {"migrated": 0, "skipped": 0}
+    async for app in cursor:
+        if await _migrate_application(app):
+            counts["migrated"] += 1
+        else:
+            counts["skipped"] += 1
+    return counts
+
+
+async def main():
+    await Database.connect_db()
+    try:
+        counts = await migrate_application_messages()
+        print(f"✅ Migrated message threads of {counts['migrated']} applications ({counts['skipped']} skipped)")
+    finally:
+        await Database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
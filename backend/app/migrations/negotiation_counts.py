@@ -0,0 +1,57 @@
+"""
+Migration: backfill message_count and last_offer_amount on negotiations stored before them
+Both are derived from the embedded messages array in a single pipeline update, so the count
+guard on session flushes and journal recovery compares against a stored field everywhere.
+Idempotent: only negotiations without message_count are touched.
+
+Run from the backend directory:
+    python -m app.migrations.negotiation_counts
+"""
+import asyncio
+from app.core.database import Database
+
+
+async def migrate_negotiation_counts() -> int:
+    """
+    Set message_count and last_offer_amount from each legacy negotiation's messages
+
+    Returns:
+        Number of negotiations migrated
+    """
+    negotiations_collection = Database.get_collection("negotiations")
+    messages = {"$ifNull": ["$messages", []]}
+    offers = {
+        "$filter": {
+            "input": messages,
+            "as": "m",
+            "cond": {"$gt": [{"$ifNull": ["$$m.offer_amount", 0]}, 0]},
+        }
+    }
+    result = await negotiations_collection.update_many(
+        {"message_count": {"$exists": False}},
+        [{
+            "$set": {
+                "message_count": {"$size": messages},
+                "last_offer_amount": {
+                    "$let": {
+                        "vars": {"last": {"$arrayElemAt": [offers, -1]}},
+                        "in": {"$ifNull": ["$$last.offer_amount", None]},
+                    }
+                },
+            }
+        }],
+    )
+    return result.modified_count
+
+
+async def main():
+    await Database.connect_db()
+    try:
+        migrated = await migrate_negotiation_counts()
+        print(f"✅ Backfilled message counts on {migrated} negotiations")
+    finally:
+        await Database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Migration: recount notification_counters.unread from the notifications collection
+Needed once for users with notifications from before counters existed (get_unread_count
+starts missing counters at zero). Every counter is recounted, so it also repairs drift.
+Idempotent: only counters whose value differs are written. Notifications stored or read
+while it runs can be miscounted; run it right after deploying, before users are let back in.
+
+Run from the backend directory:
+    python -m app.migrations.notification_unread_counts
+"""
+import asyncio
+from typing import Dict, List
+from pymongo import UpdateOne
+from app.core.database import Database
+
+
+BATCH_SIZE = 500
+
+
+async def _count_unread() -> Dict[str, int]:
+    """Count unread notifications per user id"""
+    notifications_collection = Database.get_collection("notifications")
+    pipeline = [
+        {"$match": {"read": False}},
+        {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+    ]
+    counts: Dict[str, int] = {}
+    async for row in notifications_collection.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return counts
+
+
+async def migrate_notification_unread_counts() -> int:
+    """
+    Set every user's unread counter to their actual unread notification count
+
+    Returns:
+        Number of counter documents changed or created
+    """
+    counters_collection = Database.get_collection("notification_counters")
+    counts = await _count_unread()
+
+    migrated = 0
+
+    async def flush(operations: List[UpdateOne]) -> int:
+        result = await counters_collection.bulk_write(operations, ordered=False)
+        return result.modified_count + result.upserted_count
+
+    batch: List[UpdateOne] = []
+    for user_id, count in counts.items():
+        batch.append(UpdateOne({"_id": user_id}, {"$set": {"unread": count}}, upsert=True))
+        if len(batch) >= BATCH_SIZE:
+            migrated += await flush(batch)
+            batch = []
+
+    # Counters of users left without unread notifications
+    async for counter in counters_collection.find({"unread": {"$ne": 0}}, {"_id": 1}):
+        if counter["_id"] not in counts:
+            batch.append(UpdateOne({"_id": counter["_id"]}, {"$set": {"unread": 0}}))
+            if len(batch) >= BATCH_SIZE:
+                migrated += await flush(batch)
+                batch = []
+    if batch:
+        migrated += await flush(batch)
+
+    return migrated
+
+
+async def main():
+    await Database.connect_db()
+    try:
+        migrated = await migrate_notification_unread_counts()
+        print(f"✅ Recounted unread notifications on {migrated} counters")
+    finally:
+        await Database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,6 +9,11 @@ from datetime import datetime
 from bson import ObjectId
 
 
+# Statuses in which an application blocks the same user from applying again.
+# Backed by the unique partial index applications.job_applicant_active_unique.
+ACTIVE_APPLICATION_STATUSES = ["pending", "negotiating", "accepted", "ongoing"]
+
+
 class JobSnapshot(BaseModel):
     """Snapshot of job data at time of application"""
     title: str
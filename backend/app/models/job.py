@@ -30,7 +30,7 @@ class JobModel(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None  # For long-term jobs
     status: str = "open"  # open, closed, filled
-    applicants: List[str] = []  # List of user IDs who applied
+    applicants_count: int = 0  # Active applications; who applied lives in the applications collection
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
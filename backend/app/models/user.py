@@ -3,7 +3,7 @@ User model representing the users collection in MongoDB
 Defines the structure and behavior of user documents
 """
 from datetime import datetime
-from typing import Optional, Literal, Any
+from typing import Optional, Literal, Any, TypedDict
 from pydantic import BaseModel, EmailStr, Field, GetJsonSchemaHandler
 from pydantic.json_schema import JsonSchemaValue
 from pydantic_core import core_schema
@@ -105,3 +105,16 @@ class UserResponse(BaseModel):
                 "created_at": "2024-10-25T10:00:00Z"
             }
         }
+
+
+class Principal(TypedDict):
+    """
+    Slim authenticated-user payload resolved from a JWT on every request
+    Carries only identity fields; heavy profile data (resume_text, resume_embedding)
+    is loaded on demand with AuthService.load_user_profile
+    """
+    user_id: str
+    email: str
+    role: str
+    is_active: bool
+    full_name: str
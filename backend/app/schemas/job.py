@@ -98,6 +98,17 @@ class UpdateApplicationStatusRequest(BaseModel):
     negotiated_price: Optional[float] = None
 
 
+class ApplicantStatusUpdate(BaseModel):
+    """One entry of a bulk applicant status update"""
+    application_id: str = Field(..., pattern="^[0-9a-fA-F]{24}$")
+    status: str = Field(..., pattern="^(pending|negotiating|rejected)$")
+
+
+class BulkUpdateApplicationStatusRequest(BaseModel):
+    """Update many applicants of a job at once (accept/complete use the single-applicant endpoint)"""
+    updates: List[ApplicantStatusUpdate] = Field(..., min_length=1, max_length=500)
+
+
 class SendApplicantMessageRequest(BaseModel):
     """Send chat/negotiation message to an applicant thread"""
     message: str = Field(..., min_length=1, max_length=1000)
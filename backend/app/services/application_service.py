@@ -2,10 +2,14 @@
 Application Service
 Business logic for job applications (applied jobs feature)
 """
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, AsyncIterator
 from datetime import datetime, timedelta
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.core.database import Database
+from app.core.pagination import keyset_filter
+from app.services.message_service import MessageService, APPLICATION_LIST_PROJECTION
 from app.schemas.application import ApplyToJobRequest, CancelApplicationRequest
 
 
@@ -23,28 +27,45 @@ class ApplicationService:
         }
     
     @staticmethod
-    async def get_user_applications(user_id: str, status_filter: Optional[str] = None) -> List[Dict]:
+    def _user_applications_cursor(user_id: str, status_filter: Optional[str] = None, cursor: Optional[str] = None):
+        """Motor cursor over a user's applications, newest first (raises ValueError on a bad cursor)"""
+        # Build query (always scoped to current user)
+        query: Dict = ApplicationService._user_scope_query(user_id)
+        if status_filter:
+            query["status"] = str(status_filter).lower()
+        if cursor:
+            query = {"$and": [query, keyset_filter("created_at", cursor)]}
+        
+        applications_collection = Database.get_collection("applications")
+        return applications_collection.find(query, APPLICATION_LIST_PROJECTION).sort([("created_at", -1), ("_id", -1)])
+
+    @staticmethod
+    async def get_user_applications(
+        user_id: str,
+        status_filter: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[Dict]:
         """
-        Get all applications for a user
+        Get one page of applications for a user
         
         Args:
             user_id: ID of the worker/user
             status_filter: Optional status filter (APPLIED, COMPLETED, CANCELLED)
+            limit: Page size (0 for no limit)
+            cursor: Opaque cursor from the previous page
             
         Returns:
             List of applications
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
+        db_cursor = ApplicationService._user_applications_cursor(user_id, status_filter, cursor)
+        
         try:
-            applications_collection = Database.get_collection("applications")
-            
-            # Build query (always scoped to current user)
-            query: Dict = ApplicationService._user_scope_query(user_id)
-            if status_filter:
-                query["status"] = str(status_filter).lower()
-            
             # Fetch applications
-            cursor = applications_collection.find(query).sort("created_at", -1)
-            applications = await cursor.to_list(length=None)
+            applications = await db_cursor.limit(limit).to_list(length=limit or None)
             
             # Convert ObjectId to string
             for app in applications:
@@ -55,7 +76,29 @@ class ApplicationService:
         except Exception as e:
             print(f"Error getting user applications: {e}")
             return []
+
+    @staticmethod
+    async def stream_user_applications(user_id: str, status_filter: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Yield every application of a user, newest first, without materializing the list
+        Cursor errors propagate so the stream ends with an error instead of looking complete
+        """
+        async for app in ApplicationService._user_applications_cursor(user_id, status_filter):
+            app["_id"] = str(app["_id"])
+            yield app
     
+    @staticmethod
+    async def _release_applicant_slot(job_id: str):
+        """Undo an applicants_count increment whose application insert failed"""
+        try:
+            jobs_collection = Database.get_collection("jobs")
+            await jobs_collection.update_one(
+                {"_id": ObjectId(job_id), "applicants_count": {"$gt": 0}},
+                {"$inc": {"applicants_count": -1}}
+            )
+        except Exception as e:
+            print(f"Error releasing applicant count: {e}")
+
     @staticmethod
     async def apply_to_job(user_id: str, user_email: str, application_data: ApplyToJobRequest) -> Optional[Dict]:
         """
@@ -73,32 +116,35 @@ class ApplicationService:
             jobs_collection = Database.get_collection("jobs")
             applications_collection = Database.get_collection("applications")
             
-            # Get job details
-            job = await jobs_collection.find_one({
-                "_id": ObjectId(application_data.job_id),
-                "is_active": True,
-                "status": "open"
-            })
+            # Count the applicant and read the job snapshot in one write; only open jobs match.
+            # Already-applied users are caught by the insert below (unique partial index).
+            job = await jobs_collection.find_one_and_update(
+                {
+                    "_id": ObjectId(application_data.job_id),
+                    "is_active": True,
+                    "status": "open"
+                },
+                {"$inc": {"applicants_count": 1}},
+                projection={"employer_id": 1, "title": 1, "location": 1, "cover_image": 1, "salary": 1},
+                return_document=ReturnDocument.AFTER,
+            )
             if not job:
                 return None
             
-            # Check if already applied (supports legacy docs)
-            # Only treat as "already applied" when there exists an active application
-            # (not cancelled, not completed, not rejected).
-            existing = await applications_collection.find_one({
-                "job_id": application_data.job_id,
-                **ApplicationService._user_scope_query(user_id),
-                "status": {"$nin": ["cancelled", "completed", "rejected"]}
-            })
-            if existing:
-                return None  # Already applied (active application exists)
-            
             worker_name = user_email.split("@")[0] if user_email else "Worker"
 
             # Prefer applicant-supplied name/contact when provided
             applicant_name = application_data.applicant_name or worker_name
             applicant_contact = application_data.applicant_contact or user_email
 
+            first_message = {
+                "sender": "worker",
+                "sender_name": applicant_name,
+                "message": application_data.cover_letter or "Applied to this job",
+                "offer_amount": application_data.offered_price,
+                "sent_at": datetime.utcnow(),
+            }
+
             # Prepare application document
             application = {
                 "worker_id": user_id,
@@ -124,15 +170,7 @@ class ApplicationService:
                 "reviewed_at": None,
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow(),
-                "messages": [
-                    {
-                        "sender": "worker",
-                        "sender_name": applicant_name,
-                        "message": application_data.cover_letter or "Applied to this job",
-                        "offer_amount": application_data.offered_price,
-                        "sent_at": datetime.utcnow(),
-                    }
-                ]
+                **MessageService.thread_fields(first_message),
             }
             
             # Add type-specific metadata
@@ -150,15 +188,16 @@ class ApplicationService:
                     "cover_letter": application_data.cover_letter
                 }
             
-            # Insert application
-            result = await applications_collection.insert_one(application)
-            application["_id"] = str(result.inserted_id)
-
-            # Also add applicant id to job's applicants list for employer view
+            # Insert application alongside its thread's first bucket; undo the counter if it is rejected
             try:
-                await jobs_collection.update_one({"_id": ObjectId(application_data.job_id)}, {"$push": {"applicants": user_id}})
-            except Exception:
-                pass
+                await MessageService.insert_with_thread(applications_collection, application, first_message)
+            except Exception as e:
+                await ApplicationService._release_applicant_slot(application_data.job_id)
+                if isinstance(e, DuplicateKeyError):
+                    return None  # Already applied (active application exists)
+                raise
+            application["_id"] = str(application["_id"])
+            application["messages"] = [{**first_message, "seq": 0}]
 
             return application
             
@@ -225,12 +264,12 @@ class ApplicationService:
                     }
                 }
             )
-            # Also remove the applicant id from the job's applicants list so the job
-            # becomes visible again in Explore (frontend filters by job.applicants)
+            # Decrement the job's applicant counter (never below zero); the job becomes
+            # visible again in Explore because the application is now cancelled
             try:
                 await jobs_collection.update_one(
-                    {"_id": ObjectId(application["job_id"])},
-                    {"$pull": {"applicants": user_id}}
+                    {"_id": ObjectId(application["job_id"]), "applicants_count": {"$gt": 0}},
+                    {"$inc": {"applicants_count": -1}}
                 )
             except Exception:
                 # non-fatal: log and continue
@@ -255,13 +294,41 @@ class ApplicationService:
             
             if application:
                 application["_id"] = str(application["_id"])
-                return application
+                return await MessageService.attach_recent(application)
             return None
             
         except Exception as e:
             print(f"Error getting application: {e}")
             return None
 
+    @staticmethod
+    async def get_application_messages(
+        application_id: str,
+        user_id: str,
+        before: Optional[int] = None,
+        limit: int = 50,
+    ) -> Optional[Dict]:
+        """
+        Get one page of an application's message thread (must belong to user)
+        
+        Returns:
+            Dict with messages (oldest first) and next_before, or None if not found
+        """
+        try:
+            applications_collection = Database.get_collection("applications")
+            application = await applications_collection.find_one(
+                {"_id": ObjectId(application_id), **ApplicationService._user_scope_query(user_id)},
+                {"message_count": 1, "messages": 1, "thread_migration": 1},
+            )
+            if not application:
+                return None
+            application["_id"] = str(application["_id"])
+            return await MessageService.get_application_thread(application, before, limit)
+            
+        except Exception as e:
+            print(f"Error getting application messages: {e}")
+            return None
+
     @staticmethod
     async def send_worker_message(
         user_id: str,
@@ -273,11 +340,9 @@ class ApplicationService:
         """Send worker-side message in an application thread"""
         try:
             applications_collection = Database.get_collection("applications")
+            owned = {"_id": ObjectId(application_id), **ApplicationService._user_scope_query(user_id)}
 
-            application = await applications_collection.find_one({
-                "_id": ObjectId(application_id),
-                **ApplicationService._user_scope_query(user_id),
-            })
+            application = await applications_collection.find_one(owned, {"job_snapshot.type": 1})
             if not application:
                 return None
 
@@ -291,21 +356,25 @@ class ApplicationService:
 
             # Only move to 'negotiating' when the application/job is a daily-wage negotiation
             app_type = (application.get("job_snapshot", {}) or {}).get("type")
-            update_doc = {"$push": {"messages": msg_doc}, "$set": {"updated_at": datetime.utcnow()}}
+            update_doc = MessageService.append_update(msg_doc)
+            update_doc["$set"]["updated_at"] = datetime.utcnow()
             if app_type == 'daily':
                 update_doc["$set"]["status"] = "negotiating"
                 if offer_amount is not None:
                     update_doc["$set"]["daily_meta.final_agreed_price"] = offer_amount
 
-            await applications_collection.update_one(
-                {"_id": ObjectId(application_id), **ApplicationService._user_scope_query(user_id)},
+            updated = await applications_collection.find_one_and_update(
+                owned,
                 update_doc,
+                return_document=ReturnDocument.AFTER,
             )
+            if not updated:
+                return None
+
+            await MessageService.store(application_id, updated["message_count"] - 1, msg_doc)
 
-            updated = await applications_collection.find_one({"_id": ObjectId(application_id), **ApplicationService._user_scope_query(user_id)})
-            if updated:
-                updated["_id"] = str(updated["_id"])
-            return updated
+            updated["_id"] = str(updated["_id"])
+            return await MessageService.attach_recent(updated)
 
         except Exception as e:
             print(f"Error sending worker message: {e}")
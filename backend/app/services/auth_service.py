@@ -4,11 +4,31 @@ Handles user creation, authentication, and retrieval
 """
 from typing import Optional, Dict, Any
 from datetime import datetime
+import hashlib
+import time
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import Database
-from app.core.security import hash_password, verify_password, create_access_token
-from app.models.user import UserInDB, UserResponse
+from app.core.revocation import RevocationList
+from app.core.security import hash_password_async, verify_password_async, create_access_token
+from app.models.user import UserInDB, UserResponse, Principal
 from app.schemas.auth import SignupRequest, LoginRequest
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+
+# Only the identity fields needed to build a Principal are read on the hot auth path
+PRINCIPAL_PROJECTION = {"email": 1, "role": 1, "is_active": 1, "full_name": 1}
+
+# Profile fields returned by /me (never includes hashed_password or the raw resume embedding)
+PROFILE_PROJECTION = {
+    "email": 1, "role": 1, "is_active": 1, "full_name": 1, "created_at": 1, "updated_at": 1,
+    "profile_photo": 1, "phone": 1, "address": 1, "city": 1, "state": 1, "skills": 1,
+    "experience": 1, "resume_url": 1, "resume_text": 1,
+}
+
+# Resolved principals keyed by (JWT subject, token hash), grouped by user id for invalidation
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_MAX_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
 
 
 class AuthService:
@@ -27,6 +47,9 @@ class AuthService:
             
         Returns:
             UserResponse if successful, None if user already exists
+            
+        Raises:
+            PasswordHasherBusy: If the password hashing queue is saturated
         """
         # Get users collection from database
         users_collection = Database.get_collection("users")
@@ -36,8 +59,8 @@ class AuthService:
         if existing_user:
             return None  # User already exists
         
-        # Hash the password using bcrypt
-        hashed_pwd = hash_password(signup_data.password)
+        # Hash the password using bcrypt (off the event loop)
+        hashed_pwd = await hash_password_async(signup_data.password)
         
         # Create user document matching MongoDB structure
         user_document = {
@@ -48,8 +71,11 @@ class AuthService:
             "created_at": datetime.utcnow()
         }
         
-        # Insert user into database
-        result = await users_collection.insert_one(user_document)
+        # Insert user into database (the unique email index catches concurrent signups)
+        try:
+            await users_collection.insert_one(user_document)
+        except DuplicateKeyError:
+            return None  # User already exists
         
         # Return user response (without password)
         return UserResponse(
@@ -69,6 +95,9 @@ class AuthService:
             
         Returns:
             Dictionary with user data and token if successful, None if invalid credentials
+            
+        Raises:
+            PasswordHasherBusy: If the password hashing queue is saturated
         """
         # Get users collection from database
         users_collection = Database.get_collection("users")
@@ -78,8 +107,8 @@ class AuthService:
         if not user:
             return None  # User not found
         
-        # Verify password against hashed password
-        if not verify_password(login_data.password, user["hashed_password"]):
+        # Verify password against hashed password (off the event loop)
+        if not await verify_password_async(login_data.password, user["hashed_password"]):
             return None  # Invalid password
         
         # Check if user account is active
@@ -87,9 +116,11 @@ class AuthService:
             return None  # Account is banned/inactive
         
         # Create JWT token with user information
+        # (name is included so stateless mode can build the principal from claims alone)
         token_data = {
             "email": user["email"],
             "role": user["role"],
+            "name": user.get("full_name") or user["email"].split("@")[0],
             "sub": str(user["_id"])  # Subject: user ID
         }
         access_token = create_access_token(token_data)
@@ -134,28 +165,79 @@ class AuthService:
         )
 
     @staticmethod
-    async def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
-        """Get full user document by MongoDB _id (string)."""
+    async def get_user_by_id(user_id: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get user document by MongoDB _id (string), optionally limited to a projection."""
         try:
             users_collection = Database.get_collection("users")
             if not ObjectId.is_valid(user_id):
                 return None
 
-            user = await users_collection.find_one({"_id": ObjectId(user_id)})
+            user = await users_collection.find_one({"_id": ObjectId(user_id)}, projection)
             return user
         except Exception:
             return None
+
+    @staticmethod
+    async def load_user_profile(user_id: str, include_embedding: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Lazily load the heavy profile fields of a user
+        Only handlers that need resume/profile data should call this
+
+        Args:
+            user_id: User's MongoDB _id as string
+            include_embedding: Also load the raw resume_embedding vector
+
+        Returns:
+            Profile dictionary, or None if user not found
+        """
+        projection = dict(PROFILE_PROJECTION)
+        if include_embedding:
+            projection["resume_embedding"] = 1
+        else:
+            # Only fetch whether an embedding exists, not the vector itself
+            projection["has_resume_embedding"] = {"$gt": [{"$size": {"$ifNull": ["$resume_embedding", []]}}, 0]}
+
+        user_doc = await AuthService.get_user_by_id(user_id, projection)
+        if not user_doc:
+            return None
+
+        email = user_doc.get("email")
+        profile = {
+            "user_id": str(user_doc["_id"]),
+            "email": email,
+            "role": user_doc.get("role", "worker"),
+            "is_active": bool(user_doc.get("is_active", True)),
+            "created_at": user_doc.get("created_at"),
+            "updated_at": user_doc.get("updated_at"),
+            "full_name": user_doc.get("full_name") or (email.split("@")[0] if email else "User"),
+            "profile_photo": user_doc.get("profile_photo"),
+            "phone": user_doc.get("phone"),
+            "address": user_doc.get("address"),
+            "city": user_doc.get("city"),
+            "state": user_doc.get("state"),
+            "skills": user_doc.get("skills"),
+            "experience": user_doc.get("experience"),
+            "resume_url": user_doc.get("resume_url"),
+            "resume_text": user_doc.get("resume_text"),
+        }
+        if include_embedding:
+            profile["resume_embedding"] = user_doc.get("resume_embedding")
+            profile["has_resume_embedding"] = bool(user_doc.get("resume_embedding"))
+        else:
+            profile["has_resume_embedding"] = bool(user_doc.get("has_resume_embedding"))
+        return profile
     
     @staticmethod
-    async def verify_user_token(token: str) -> Optional[Dict[str, Any]]:
+    async def verify_user_token(token: str) -> Optional[Principal]:
         """
-        Verify JWT token and return user data
+        Verify JWT token and return the slim principal of its user
+        Only identity fields are read from MongoDB; use load_user_profile for profile data
         
         Args:
             token: JWT token to verify
             
         Returns:
-            Dictionary with user data if token valid, None otherwise
+            Principal with user_id, email, role, is_active and full_name if token valid, None otherwise
         """
         from app.core.security import decode_access_token
         
@@ -163,18 +245,40 @@ class AuthService:
         payload = decode_access_token(token)
         if not payload:
             return None  # Invalid or expired token
+
+        # Reject logged-out tokens and tokens of banned / force-logged-out users
+        if RevocationList.is_revoked(payload):
+            return None
         
         user_id = payload.get("sub")
         email = payload.get("email")
 
+        # Stateless mode: trust the signed claims and skip MongoDB entirely.
+        # Deactivation only takes effect through revoke_user_sessions, and a changed
+        # full_name only shows up in tokens issued after the change.
+        if settings.AUTH_MODE == "stateless" and user_id and email and payload.get("name"):
+            return {
+                "user_id": str(user_id),
+                "email": email,
+                "role": payload.get("role", "worker"),
+                "is_active": True,
+                "full_name": payload["name"],
+            }
+
+        # Serve repeated requests with the same token from the principal cache
+        cache_key = (str(user_id or email), hashlib.sha256(token.encode("utf-8")).hexdigest())
+        cached = principal_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
         # Prefer looking up by user_id (JWT subject). Fallback to email for older tokens.
         user_doc: Optional[Dict[str, Any]] = None
         if user_id:
-            user_doc = await AuthService.get_user_by_id(str(user_id))
+            user_doc = await AuthService.get_user_by_id(str(user_id), PRINCIPAL_PROJECTION)
 
         if not user_doc and email:
             users_collection = Database.get_collection("users")
-            user_doc = await users_collection.find_one({"email": email})
+            user_doc = await users_collection.find_one({"email": email}, PRINCIPAL_PROJECTION)
 
         if not user_doc:
             return None
@@ -185,25 +289,73 @@ class AuthService:
         is_active = bool(user_doc.get("is_active", True))
         full_name = user_doc.get("full_name") or (resolved_email.split("@")[0] if resolved_email else "User")
 
-        # Return a safe, frontend-ready user payload.
-        return {
+        principal: Principal = {
             "user_id": resolved_user_id,
             "email": resolved_email,
             "role": resolved_role,
             "is_active": is_active,
-            "created_at": user_doc.get("created_at"),
-            "updated_at": user_doc.get("updated_at"),
             "full_name": full_name,
-            "profile_photo": user_doc.get("profile_photo"),
-            "phone": user_doc.get("phone"),
-            "address": user_doc.get("address"),
-            "city": user_doc.get("city"),
-            "state": user_doc.get("state"),
-            "skills": user_doc.get("skills"),
-            "experience": user_doc.get("experience"),
-            "resume_url": user_doc.get("resume_url"),
-            "resume_text": user_doc.get("resume_text"),
-            # include a flag or embedding if available (embedding can be large)
-            "has_resume_embedding": True if user_doc.get("resume_embedding") else False,
-            "resume_embedding": user_doc.get("resume_embedding"),
         }
+
+        # Never cache a principal past the token's own expiry
+        ttl = None
+        if payload.get("exp"):
+            ttl = float(payload["exp"]) - time.time()
+        principal_cache.set(cache_key, principal, group=resolved_user_id, ttl=ttl)
+
+        return dict(principal)
+
+    @staticmethod
+    async def revoke_token(token: str) -> bool:
+        """
+        Revoke a single token so it can no longer be used (logout)
+        
+        Args:
+            token: JWT token to revoke
+            
+        Returns:
+            True if the token was valid and has been revoked
+        """
+        from app.core.security import decode_access_token
+
+        payload = decode_access_token(token)
+        if not payload or not payload.get("jti"):
+            return False
+
+        await RevocationList.revoke_token(payload, reason="logout")
+        if payload.get("sub"):
+            AuthService.invalidate_cached_user(str(payload["sub"]))
+        return True
+
+    @staticmethod
+    async def revoke_user_sessions(user_id: str, reason: str = "forced_logout"):
+        """
+        Revoke every token issued to a user (logout everywhere, bans and forced logouts)
+        Anything that deactivates a user must call this too: stateless mode never re-reads
+        is_active, so until revoked the user's tokens keep working
+        
+        Args:
+            user_id: User's MongoDB _id as string
+            reason: Why the sessions were revoked (e.g. 'banned')
+        """
+        await RevocationList.revoke_user(user_id, reason=reason)
+        AuthService.invalidate_cached_user(user_id)
+
+    @staticmethod
+    def invalidate_cached_user(user_id: str) -> int:
+        """
+        Drop cached principals for a user
+        Must be called after any write that changes the user document
+
+        Args:
+            user_id: User's MongoDB _id as string
+
+        Returns:
+            Number of cache entries removed
+        """
+        return principal_cache.invalidate_group(str(user_id))
+
+    @staticmethod
+    def principal_cache_stats() -> Dict[str, Any]:
+        """Get hit/miss counters of the principal cache"""
+        return principal_cache.stats()
@@ -2,16 +2,60 @@
 Job Service
 Business logic for job-related operations
 """
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, AsyncIterator
 from datetime import datetime
+import asyncio
+import time
+from functools import partial
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne, UpdateMany
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.core.background import cascade_worker
+from app.core.config import settings
 from app.core.database import Database
+from app.core.monitoring import write_path_stats
+from app.core.pagination import keyset_filter
+from app.services.message_service import MessageService, APPLICATION_LIST_PROJECTION
 from app.schemas.job import CreateJobRequest, UpdateJobRequest, ApplyJobRequest
 from app.models.job import JobModel, ApplicationModel
 
 
+# Fields shown on job cards (explore page, listings)
+_JOB_CARD_FIELDS = [
+    "title", "description", "job_type", "category", "location", "salary",
+    "employer_id", "employer_name", "employer_contact", "requirements", "skills_required",
+    "positions_available", "work_hours", "start_date", "end_date", "status",
+    "created_at", "is_active", "is_sample", "cover_image", "applicants_count",
+]
+
+# Named projection profiles for job documents.
+# Only "match" returns the embedding vector, and callers using it must strip it before responding.
+JOB_PROJECTIONS: Dict[str, Dict] = {
+    # Public listings
+    "card": {f: 1 for f in _JOB_CARD_FIELDS},
+    # Single job page
+    "detail": {**{f: 1 for f in _JOB_CARD_FIELDS}, "updated_at": 1},
+    # Employer's own postings (includes assignment state)
+    "owner": {
+        **{f: 1 for f in _JOB_CARD_FIELDS},
+        "updated_at": 1,
+        "assigned_worker_id": 1,
+        "assigned_worker_name": 1,
+    },
+    # Resume matching (internal)
+    "match": {**{f: 1 for f in _JOB_CARD_FIELDS}, "embedding": 1},
+}
+
+
 class JobService:
     """Service class for job operations"""
+
+    @staticmethod
+    def _serialize_job(job: Dict) -> Dict:
+        """Convert ObjectId to string and make sure applicants_count is present"""
+        job["_id"] = str(job["_id"])
+        job.setdefault("applicants_count", 0)
+        return job
     
     @staticmethod
     async def create_job(job_data: CreateJobRequest, user_id: str, user_name: str) -> Optional[Dict]:
@@ -33,7 +77,8 @@ class JobService:
             job_dict = job_data.model_dump()
             job_dict["employer_id"] = user_id
             job_dict["employer_name"] = user_name
-            job_dict["applicants"] = []
+            # Maintained with $inc on apply/cancel; the applications collection lists who applied
+            job_dict["applicants_count"] = 0
             job_dict["created_at"] = datetime.utcnow()
             job_dict["updated_at"] = datetime.utcnow()
             job_dict["is_active"] = True
@@ -66,16 +111,14 @@ class JobService:
             return None
     
     @staticmethod
-    async def get_job_by_id(job_id: str) -> Optional[Dict]:
-        """Get job by ID"""
+    async def get_job_by_id(job_id: str, projection: str = "detail") -> Optional[Dict]:
+        """Get job by ID using a named projection profile (see JOB_PROJECTIONS)"""
         try:
             jobs_collection = Database.get_collection("jobs")
-            job = await jobs_collection.find_one({"_id": ObjectId(job_id)})
+            job = await jobs_collection.find_one({"_id": ObjectId(job_id)}, JOB_PROJECTIONS[projection])
             
             if job:
-                job["_id"] = str(job["_id"])
-                job["applicants_count"] = len(job.get("applicants", []))
-                return job
+                return JobService._serialize_job(job)
             return None
             
         except Exception as e:
@@ -89,22 +132,32 @@ class JobService:
         status: str = "open",
         skip: int = 0,
         limit: int = 20,
-        employer_id: Optional[str] = None
+        employer_id: Optional[str] = None,
+        projection: str = "card",
+        cursor: Optional[str] = None
     ) -> List[Dict]:
         """
-        Get list of jobs with filters
+        Get list of jobs with filters, newest first
         
         Args:
             job_type: Filter by job type (daily_wage or long_term)
             category: Filter by category
             status: Filter by status (default: open)
-            skip: Number of records to skip
+            skip: Number of records to skip (deprecated, ignored when cursor is given)
             limit: Maximum records to return
             employer_id: Filter by employer ID
+            projection: Named projection profile (see JOB_PROJECTIONS)
+            cursor: Opaque keyset cursor from a previous page (created_at, _id)
             
         Returns:
             List of jobs
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
+        # Decode before the try block so a bad cursor surfaces as a client error
+        after = keyset_filter("created_at", cursor) if cursor else None
+        
         try:
             jobs_collection = Database.get_collection("jobs")
             
@@ -119,45 +172,121 @@ class JobService:
             if employer_id:
                 query["employer_id"] = employer_id
             
+            # Keyset pagination: range scan on the (created_at, _id) index instead of skip
+            if after:
+                query = {"$and": [query, after]}
+                skip = 0
+            
             # Fetch jobs
-            cursor = jobs_collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
-            jobs = await cursor.to_list(length=limit)
+            db_cursor = (
+                jobs_collection.find(query, JOB_PROJECTIONS[projection])
+                .sort([("created_at", -1), ("_id", -1)])
+                .skip(skip)
+                .limit(limit)
+            )
+            jobs = await db_cursor.to_list(length=limit)
             
             # Convert ObjectId to string
-            for job in jobs:
-                job["_id"] = str(job["_id"])
-                job["applicants_count"] = len(job.get("applicants", []))
-            
-            return jobs
+            return [JobService._serialize_job(job) for job in jobs]
             
         except Exception as e:
             print(f"Error getting jobs: {e}")
             return []
     
     @staticmethod
-    async def get_user_posted_jobs(user_id: str) -> List[Dict]:
-        """Get all jobs posted by a user"""
-        try:
-            jobs_collection = Database.get_collection("jobs")
-            
-            cursor = jobs_collection.find({"employer_id": user_id}).sort("created_at", -1)
-            jobs = await cursor.to_list(length=None)
+    def _posted_jobs_cursor(user_id: str, cursor: Optional[str] = None):
+        """Motor cursor over a user's postings, newest first (raises ValueError on a bad cursor)"""
+        query: Dict = {"employer_id": user_id}
+        if cursor:
+            query = {"$and": [query, keyset_filter("created_at", cursor)]}
+        return (
+            Database.get_collection("jobs")
+            .find(query, JOB_PROJECTIONS["owner"])
+            .sort([("created_at", -1), ("_id", -1)])
+        )
+
+    @staticmethod
+    async def get_user_posted_jobs(user_id: str, limit: int = 100, cursor: Optional[str] = None) -> List[Dict]:
+        """
+        Get one page of jobs posted by a user
+        
+        Args:
+            user_id: ID of the employer
+            limit: Page size (0 for no limit)
+            cursor: Opaque cursor from the previous page
             
-            for job in jobs:
-                job["_id"] = str(job["_id"])
-                job["applicants_count"] = len(job.get("applicants", []))
+        Returns:
+            List of jobs (owner projection)
             
-            return jobs
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        db_cursor = JobService._posted_jobs_cursor(user_id, cursor)
+        
+        try:
+            jobs = await db_cursor.limit(limit).to_list(length=limit or None)
+            return [JobService._serialize_job(job) for job in jobs]
             
         except Exception as e:
             print(f"Error getting user jobs: {e}")
             return []
+
+    @staticmethod
+    async def stream_user_posted_jobs(user_id: str) -> AsyncIterator[Dict]:
+        """
+        Yield every job posted by a user, newest first, without materializing the list
+        Cursor errors propagate so the stream ends with an error instead of looking complete
+        """
+        async for job in JobService._posted_jobs_cursor(user_id):
+            yield JobService._serialize_job(job)
     
+    @staticmethod
+    def _status_cascade(job_id: str, new_status: str, assigned_worker_id: Optional[str], now: datetime) -> List[UpdateMany]:
+        """Application writes that keep applicants in sync with a job lifecycle change"""
+        assigned = {
+            "job_id": job_id,
+            "$or": [
+                {"applicant_id": assigned_worker_id},
+                {"worker_id": assigned_worker_id},
+            ],
+        }
+
+        if new_status == "completed":
+            if assigned_worker_id:
+                return [UpdateMany(assigned, {"$set": {"status": "completed", "updated_at": now}})]
+            return [UpdateMany(
+                {"job_id": job_id, "status": {"$in": ["accepted", "ongoing"]}},
+                {"$set": {"status": "completed", "updated_at": now}},
+            )]
+
+        if new_status == "ongoing" and assigned_worker_id:
+            return [UpdateMany(assigned, {"$set": {"status": "accepted", "updated_at": now}})]
+
+        if new_status == "open":
+            return [UpdateMany(
+                {"job_id": job_id, "status": {"$in": ["accepted", "negotiating"]}},
+                {"$set": {"status": "pending", "updated_at": now}},
+            )]
+
+        return []
+
+    @staticmethod
+    async def _apply_status_cascade(job_id: str, new_status: str, operations: List[UpdateMany]):
+        """Run a job status cascade as one ordered bulk_write and record its latency"""
+        started = time.perf_counter()
+        applications_collection = Database.get_collection("applications")
+        await applications_collection.bulk_write(operations, ordered=True)
+        write_path_stats.record(f"job_cascade.{new_status}", 1, (time.perf_counter() - started) * 1000)
+
     @staticmethod
     async def update_job(job_id: str, user_id: str, update_data: UpdateJobRequest) -> Optional[Dict]:
         """
         Update a job (only by owner)
         
+        The job is updated and returned by one find_one_and_update. A status change then
+        cascades to the job's applications in one ordered bulk_write, inline or, with
+        DEFER_JOB_STATUS_CASCADE, on the background cascade worker after the response.
+        
         Args:
             job_id: ID of job to update
             user_id: ID of user requesting update
@@ -166,75 +295,45 @@ class JobService:
         Returns:
             Updated job or None
         """
+        started = time.perf_counter()
+        round_trips = 0
         try:
             jobs_collection = Database.get_collection("jobs")
-            applications_collection = Database.get_collection("applications")
-            
-            # Verify ownership
-            job = await jobs_collection.find_one({"_id": ObjectId(job_id), "employer_id": user_id})
-            if not job:
-                return None
             
             # Prepare update data
+            now = datetime.utcnow()
             update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
-            update_dict["updated_at"] = datetime.utcnow()
+            update_dict["updated_at"] = now
             
-            # Update job
-            await jobs_collection.update_one(
-                {"_id": ObjectId(job_id)},
-                {"$set": update_dict}
+            # Update job (ownership is part of the filter)
+            job = await jobs_collection.find_one_and_update(
+                {"_id": ObjectId(job_id), "employer_id": user_id},
+                {"$set": update_dict},
+                projection=JOB_PROJECTIONS["owner"],
+                return_document=ReturnDocument.AFTER,
             )
+            round_trips += 1
+            if not job:
+                return None
 
             # Keep application status in sync when poster updates job lifecycle from Posted Jobs page
             if "status" in update_dict:
                 new_status = update_dict["status"]
-                assigned_worker_id = job.get("assigned_worker_id")
-
-                if new_status == "completed":
-                    if assigned_worker_id:
-                        await applications_collection.update_many(
-                            {
-                                "job_id": job_id,
-                                "$or": [
-                                    {"applicant_id": assigned_worker_id},
-                                    {"worker_id": assigned_worker_id},
-                                ],
-                            },
-                            {"$set": {"status": "completed", "updated_at": datetime.utcnow()}},
-                        )
-                    else:
-                        await applications_collection.update_many(
-                            {"job_id": job_id, "status": {"$in": ["accepted", "ongoing"]}},
-                            {"$set": {"status": "completed", "updated_at": datetime.utcnow()}},
-                        )
-
-                elif new_status == "ongoing" and assigned_worker_id:
-                    await applications_collection.update_many(
-                        {
-                            "job_id": job_id,
-                            "$or": [
-                                {"applicant_id": assigned_worker_id},
-                                {"worker_id": assigned_worker_id},
-                            ],
-                        },
-                        {"$set": {"status": "accepted", "updated_at": datetime.utcnow()}},
-                    )
-
-                elif new_status == "open":
-                    await applications_collection.update_many(
-                        {
-                            "job_id": job_id,
-                            "status": {"$in": ["accepted", "negotiating"]},
-                        },
-                        {"$set": {"status": "pending", "updated_at": datetime.utcnow()}},
-                    )
+                operations = JobService._status_cascade(job_id, new_status, job.get("assigned_worker_id"), now)
+                if operations:
+                    cascade = partial(JobService._apply_status_cascade, job_id, new_status, operations)
+                    deferred = settings.DEFER_JOB_STATUS_CASCADE and cascade_worker.submit(f"{job_id}:{new_status}", cascade)
+                    if not deferred:
+                        await cascade()
+                        round_trips += 1
             
-            # Return updated job
-            return await JobService.get_job_by_id(job_id)
+            return JobService._serialize_job(job)
             
         except Exception as e:
             print(f"Error updating job: {e}")
             return None
+        finally:
+            write_path_stats.record("job_update", round_trips, (time.perf_counter() - started) * 1000)
     
     @staticmethod
     async def delete_job(job_id: str, user_id: str) -> bool:
@@ -281,19 +380,23 @@ class JobService:
             jobs_collection = Database.get_collection("jobs")
             applications_collection = Database.get_collection("applications")
             
-            # Check if job exists and is open
-            job = await jobs_collection.find_one({"_id": ObjectId(job_id), "status": "open", "is_active": True})
+            # Count the applicant up front; only open jobs match.
+            # Already-applied users are caught by the insert below (unique partial index).
+            job = await jobs_collection.find_one_and_update(
+                {"_id": ObjectId(job_id), "status": "open", "is_active": True},
+                {"$inc": {"applicants_count": 1}},
+                projection={"_id": 1},
+            )
             if not job:
                 return None
             
-            # Check if user already applied; only block if there's an active application
-            existing = await applications_collection.find_one({
-                "job_id": job_id,
-                "applicant_id": user_id,
-                "status": {"$nin": ["cancelled", "completed", "rejected"]}
-            })
-            if existing:
-                return None  # Already applied (active application exists)
+            first_message = {
+                "sender": "worker",
+                "sender_name": user_name,
+                "message": application_data.cover_letter or "Applied to this job",
+                "offer_amount": None,
+                "sent_at": datetime.utcnow()
+            }
             
             # Create application
             application = {
@@ -306,25 +409,22 @@ class JobService:
                 "status": "pending",
                 "applied_at": datetime.utcnow(),
                 "reviewed_at": None,
-                "messages": [
-                    {
-                        "sender": "worker",
-                        "sender_name": user_name,
-                        "message": application_data.cover_letter or "Applied to this job",
-                        "offer_amount": None,
-                        "sent_at": datetime.utcnow()
-                    }
-                ]
+                **MessageService.thread_fields(first_message),
             }
             
-            result = await applications_collection.insert_one(application)
-            application["_id"] = str(result.inserted_id)
-            
-            # Add applicant to job's applicants list
-            await jobs_collection.update_one(
-                {"_id": ObjectId(job_id)},
-                {"$push": {"applicants": user_id}}
-            )
+            # Insert application alongside its thread's first bucket; undo the counter if it is rejected
+            try:
+                await MessageService.insert_with_thread(applications_collection, application, first_message)
+            except Exception as e:
+                await jobs_collection.update_one(
+                    {"_id": ObjectId(job_id), "applicants_count": {"$gt": 0}},
+                    {"$inc": {"applicants_count": -1}}
+                )
+                if isinstance(e, DuplicateKeyError):
+                    return None  # Already applied (active application exists)
+                raise
+            application["_id"] = str(application["_id"])
+            application["messages"] = [{**first_message, "seq": 0}]
             
             return application
             
@@ -333,48 +433,180 @@ class JobService:
             return None
     
     @staticmethod
-    async def get_job_applicants(job_id: str, employer_id: str) -> List[Dict]:
-        """Get all applicants for a job (employer only)"""
+    async def is_job_owner(job_id: str, employer_id: str) -> bool:
+        """Check that a job exists and belongs to the employer"""
         try:
             jobs_collection = Database.get_collection("jobs")
-            applications_collection = Database.get_collection("applications")
+            job = await jobs_collection.find_one({"_id": ObjectId(job_id), "employer_id": employer_id}, {"_id": 1})
+            return job is not None
+        except Exception as e:
+            print(f"Error checking job ownership: {e}")
+            return False
+
+    @staticmethod
+    def _applications_cursor(query: Dict, cursor: Optional[str] = None):
+        """Motor cursor over applications, most recently applied first (raises ValueError on a bad cursor)"""
+        if cursor:
+            query = {"$and": [query, keyset_filter("applied_at", cursor)]}
+        return (
+            Database.get_collection("applications")
+            .find(query, APPLICATION_LIST_PROJECTION)
+            .sort([("applied_at", -1), ("_id", -1)])
+        )
+
+    @staticmethod
+    async def _applications_page(db_cursor, limit: int) -> List[Dict]:
+        """Fetch one page from an applications cursor"""
+        applications = await db_cursor.limit(limit).to_list(length=limit or None)
+        for app in applications:
+            app["_id"] = str(app["_id"])
+        return applications
+
+    @staticmethod
+    async def _stream_applications(query: Dict) -> AsyncIterator[Dict]:
+        """Yield every application matching a query, most recently applied first"""
+        async for app in JobService._applications_cursor(query):
+            app["_id"] = str(app["_id"])
+            yield app
+
+    @staticmethod
+    async def get_job_applicants(
+        job_id: str,
+        employer_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Get one page of applicants for a job (employer only)
+        
+        Args:
+            job_id: Job ID
+            employer_id: ID of the requesting employer
+            limit: Page size (0 for no limit)
+            cursor: Opaque cursor from the previous page
+            
+        Returns:
+            List of applications, empty if the job is not owned by the employer
             
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        db_cursor = JobService._applications_cursor({"job_id": job_id}, cursor)
+        
+        try:
             # Verify ownership
-            job = await jobs_collection.find_one({"_id": ObjectId(job_id), "employer_id": employer_id})
-            if not job:
+            if not await JobService.is_job_owner(job_id, employer_id):
                 return []
             
-            # Get applications
-            cursor = applications_collection.find({"job_id": job_id}).sort("applied_at", -1)
-            applications = await cursor.to_list(length=None)
-            
-            for app in applications:
-                app["_id"] = str(app["_id"])
-            
-            return applications
+            return await JobService._applications_page(db_cursor, limit)
             
         except Exception as e:
             print(f"Error getting applicants: {e}")
             return []
+
+    @staticmethod
+    async def stream_job_applicants(job_id: str) -> AsyncIterator[Dict]:
+        """Yield every applicant of a job; callers must check ownership first (cursor errors propagate)"""
+        async for app in JobService._stream_applications({"job_id": job_id}):
+            yield app
     
     @staticmethod
-    async def get_user_applications(user_id: str) -> List[Dict]:
-        """Get all applications submitted by a user"""
+    async def get_applied_job_ids(user_id: str, job_ids: List[str]) -> set:
+        """
+        Get which of the given jobs a user has applied to (and not cancelled)
+        The applications collection is the source of truth for who applied
+        
+        Args:
+            user_id: ID of the applicant
+            job_ids: Candidate job IDs
+            
+        Returns:
+            Set of job IDs the user applied to
+        """
+        if not job_ids:
+            return set()
         try:
             applications_collection = Database.get_collection("applications")
+            cursor = applications_collection.find(
+                {
+                    "job_id": {"$in": job_ids},
+                    "$or": [{"applicant_id": user_id}, {"worker_id": user_id}],
+                    "status": {"$ne": "cancelled"},
+                },
+                {"job_id": 1, "_id": 0},
+            )
+            return {app["job_id"] async for app in cursor}
+        except Exception as e:
+            print(f"Error getting applied job ids: {e}")
+            return set()
+
+    @staticmethod
+    async def get_user_applications(user_id: str, limit: int = 100, cursor: Optional[str] = None) -> List[Dict]:
+        """
+        Get one page of applications submitted by a user
+        
+        Args:
+            user_id: ID of the applicant
+            limit: Page size (0 for no limit)
+            cursor: Opaque cursor from the previous page
             
-            cursor = applications_collection.find({"applicant_id": user_id}).sort("applied_at", -1)
-            applications = await cursor.to_list(length=None)
-            
-            for app in applications:
-                app["_id"] = str(app["_id"])
+        Returns:
+            List of applications
             
-            return applications
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        db_cursor = JobService._applications_cursor({"applicant_id": user_id}, cursor)
+        
+        try:
+            return await JobService._applications_page(db_cursor, limit)
             
         except Exception as e:
             print(f"Error getting user applications: {e}")
             return []
 
+    @staticmethod
+    async def stream_user_applications(user_id: str) -> AsyncIterator[Dict]:
+        """Yield every application submitted by a user (cursor errors propagate)"""
+        async for app in JobService._stream_applications({"applicant_id": user_id}):
+            yield app
+
+    @staticmethod
+    async def _run_writes(writes: List, session=None) -> int:
+        """
+        Await independent follow-up writes: concurrently, or one by one inside a
+        transaction (a session cannot run operations in parallel)
+
+        Returns:
+            Number of round trips issued
+        """
+        if session is not None:
+            for write in writes:
+                await write
+        elif writes:
+            await asyncio.gather(*writes)
+        return len(writes)
+
+    @staticmethod
+    def _completion_update(role: str, now: datetime, negotiated_price: Optional[float]) -> List[Dict]:
+        """
+        Pipeline update marking one side complete
+        The application only becomes 'completed' once both sides are; until then it stays 'accepted'
+        """
+        fields = {f"{role}_completed": True, "reviewed_at": now, "updated_at": now}
+        if negotiated_price is not None:
+            fields["negotiated_price"] = negotiated_price
+        both_complete = {
+            "$and": [
+                {"$eq": ["$worker_completed", True]},
+                {"$eq": ["$employer_completed", True]},
+            ]
+        }
+        return [
+            {"$set": fields},
+            {"$set": {"status": {"$cond": [both_complete, "completed", "accepted"]}}},
+        ]
+
     @staticmethod
     async def update_applicant_status(
         job_id: str,
@@ -383,105 +615,217 @@ class JobService:
         new_status: str,
         negotiated_price: Optional[float] = None,
     ) -> Optional[Dict]:
-        """Update applicant status for a job and reflect assignment on job document"""
+        """
+        Update applicant status for a job and reflect assignment on job document
+        
+        The application is updated and returned by a single find_one_and_update; follow-up
+        writes on the job and sibling applications run concurrently. Every transition takes
+        at most three sequential round trips (recorded in write_path_stats). With
+        APPLICANT_STATUS_TRANSACTIONS enabled all writes commit atomically.
+        
+        Raises:
+            DuplicateKeyError: If reopening the application conflicts with another active
+                application of the same applicant for this job
+        """
+        started = time.perf_counter()
+        round_trips = 0
         try:
             jobs_collection = Database.get_collection("jobs")
             applications_collection = Database.get_collection("applications")
 
-            job = await jobs_collection.find_one({"_id": ObjectId(job_id), "employer_id": employer_id})
-            if not job:
-                return None
+            async with Database.transaction(settings.APPLICANT_STATUS_TRANSACTIONS) as session:
+                job = await jobs_collection.find_one(
+                    {"_id": ObjectId(job_id), "employer_id": employer_id},
+                    {"status": 1, "employer_id": 1},
+                    session=session,
+                )
+                round_trips += 1
+                if not job:
+                    return None
 
-            app = await applications_collection.find_one({"_id": ObjectId(application_id), "job_id": job_id})
-            if not app:
-                return None
+                now = datetime.utcnow()
+                if new_status == "completed":
+                    role = "employer" if str(employer_id) == str(job.get("employer_id", "")) else "worker"
+                    update = JobService._completion_update(role, now, negotiated_price)
+                else:
+                    update_fields = {"status": new_status, "reviewed_at": now}
+                    if negotiated_price is not None:
+                        update_fields["negotiated_price"] = negotiated_price
+                    update = {"$set": update_fields}
 
-            update_fields = {
-                "status": new_status,
-                "reviewed_at": datetime.utcnow(),
-            }
-            if negotiated_price is not None:
-                update_fields["negotiated_price"] = negotiated_price
+                updated = await applications_collection.find_one_and_update(
+                    {"_id": ObjectId(application_id), "job_id": job_id},
+                    update,
+                    return_document=ReturnDocument.AFTER,
+                    session=session,
+                )
+                round_trips += 1
+                if not updated:
+                    return None
 
-            await applications_collection.update_one(
-                {"_id": ObjectId(application_id)},
-                {"$set": update_fields}
+                follow_ups = []
+                if new_status == "accepted":
+                    follow_ups.append(jobs_collection.update_one(
+                        {"_id": ObjectId(job_id)},
+                        {
+                            "$set": {
+                                "status": "ongoing",
+                                "assigned_worker_id": updated.get("applicant_id") or updated.get("worker_id"),
+                                "assigned_worker_name": updated.get("applicant_name") or updated.get("worker_name") or updated.get("applicant_contact", ""),
+                                "updated_at": now,
+                            }
+                        },
+                        session=session,
+                    ))
+                    # Every other open application is rejected in one write
+                    follow_ups.append(applications_collection.update_many(
+                        {
+                            "job_id": job_id,
+                            "_id": {"$ne": ObjectId(application_id)},
+                            "status": {"$in": ["pending", "negotiating"]},
+                        },
+                        {"$set": {"status": "rejected", "reviewed_at": now}},
+                        session=session,
+                    ))
+                elif new_status == "completed" and updated.get("status") == "completed":
+                    follow_ups.append(jobs_collection.update_one(
+                        {"_id": ObjectId(job_id)},
+                        {"$set": {"status": "completed", "updated_at": now}},
+                        session=session,
+                    ))
+                elif new_status in ["pending", "negotiating"] and job.get("status") != "ongoing":
+                    follow_ups.append(jobs_collection.update_one(
+                        {"_id": ObjectId(job_id)},
+                        {"$set": {"status": "open", "updated_at": now}},
+                        session=session,
+                    ))
+
+                round_trips += await JobService._run_writes(follow_ups, session)
+
+            updated["_id"] = str(updated["_id"])
+            return updated
+
+        except DuplicateKeyError:
+            # Reopening would leave the applicant with two active applications
+            raise
+        except Exception as e:
+            print(f"Error updating applicant status: {e}")
+            return None
+        finally:
+            write_path_stats.record(
+                f"applicant_status.{new_status}",
+                round_trips,
+                (time.perf_counter() - started) * 1000,
             )
 
-            if new_status == "accepted":
-                assigned_worker_id = app.get("applicant_id") or app.get("worker_id")
-                assigned_worker_name = app.get("applicant_name") or app.get("worker_name") or app.get("applicant_contact", "")
+    @staticmethod
+    async def bulk_update_applicant_status(
+        job_id: str,
+        employer_id: str,
+        updates: List[Dict],
+    ) -> Optional[Dict]:
+        """
+        Apply many non-cascading status changes (pending/negotiating/rejected) in one bulk_write
+        Accepting and completing change the job itself and go through update_applicant_status
+        
+        Args:
+            job_id: Job ID
+            employer_id: ID of the requesting employer
+            updates: List of {"application_id", "status"}
+            
+        Returns:
+            Dict with matched and modified counts, or None if the job is not owned by the employer
+            
+        Raises:
+            DuplicateKeyError: If a reopened application conflicts with another active
+                application of the same applicant (the other updates are still applied)
+        """
+        started = time.perf_counter()
+        round_trips = 0
+        try:
+            jobs_collection = Database.get_collection("jobs")
+            applications_collection = Database.get_collection("applications")
 
-                await jobs_collection.update_one(
-                    {"_id": ObjectId(job_id)},
-                    {
-                        "$set": {
-                            "status": "ongoing",
-                            "assigned_worker_id": assigned_worker_id,
-                            "assigned_worker_name": assigned_worker_name,
-                            "updated_at": datetime.utcnow(),
-                        }
-                    }
-                )
+            job = await jobs_collection.find_one(
+                {"_id": ObjectId(job_id), "employer_id": employer_id},
+                {"status": 1},
+            )
+            round_trips += 1
+            if not job:
+                return None
 
-                await applications_collection.update_many(
-                    {
-                        "job_id": job_id,
-                        "_id": {"$ne": ObjectId(application_id)},
-                        "status": {"$in": ["pending", "negotiating"]},
-                    },
-                    {"$set": {"status": "rejected", "reviewed_at": datetime.utcnow()}}
+            now = datetime.utcnow()
+            operations = [
+                UpdateOne(
+                    {"_id": ObjectId(item["application_id"]), "job_id": job_id},
+                    {"$set": {"status": item["status"], "reviewed_at": now}},
                 )
+                for item in updates
+            ]
+            if not operations:
+                return {"matched": 0, "modified": 0}
 
-            if new_status == "completed":
-                role = "employer" if str(employer_id) == str(job.get("employer_id", "")) else "worker"
-                
-                # Update the completion flags on the application
-                update_doc = {
-                    "$set": {
-                        f"{role}_completed": True, 
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-                await applications_collection.update_one(
-                    {"_id": ObjectId(application_id)},
-                    update_doc
-                )
-                
-                # Fetch fresh app to check both flags
-                fresh_app = await applications_collection.find_one({"_id": ObjectId(application_id)})
-                
-                # If both are true, or if we assume employer completion is enough for now
-                is_worker_complete = fresh_app.get("worker_completed", False)
-                is_employer_complete = fresh_app.get("employer_completed", False)
-                
-                if is_worker_complete and is_employer_complete:
-                    await jobs_collection.update_one(
-                        {"_id": ObjectId(job_id)},
-                        {"$set": {"status": "completed", "updated_at": datetime.utcnow()}}
-                    )
-                    # Keep the application status as 'completed'
-                else:
-                    # Update status to 'accepted' to keep it active until both complete
-                    # (preventing the default new_status update from overriding to 'completed' prematurely)
-                    await applications_collection.update_one(
-                        {"_id": ObjectId(application_id)},
-                        {"$set": {"status": "accepted", "updated_at": datetime.utcnow()}}
-                    )
-
-            if new_status in ["pending", "negotiating"] and job.get("status") != "ongoing":
-                await jobs_collection.update_one(
+            writes = [applications_collection.bulk_write(operations, ordered=False)]
+            reopens = any(item["status"] in ["pending", "negotiating"] for item in updates)
+            if reopens and job.get("status") != "ongoing":
+                writes.append(jobs_collection.update_one(
                     {"_id": ObjectId(job_id)},
-                    {"$set": {"status": "open", "updated_at": datetime.utcnow()}}
-                )
+                    {"$set": {"status": "open", "updated_at": now}},
+                ))
+            results = await asyncio.gather(*writes, return_exceptions=True)
+            round_trips += len(writes)
+            for result in results:
+                if isinstance(result, BulkWriteError) and any(
+                    error.get("code") == 11000 for error in result.details.get("writeErrors", [])
+                ):
+                    raise DuplicateKeyError("Reopened application conflicts with an active one")
+                if isinstance(result, BaseException):
+                    raise result
 
-            updated = await applications_collection.find_one({"_id": ObjectId(application_id)})
-            if updated:
-                updated["_id"] = str(updated["_id"])
-            return updated
+            return {"matched": results[0].matched_count, "modified": results[0].modified_count}
 
+        except DuplicateKeyError:
+            # Reopening would leave an applicant with two active applications
+            raise
         except Exception as e:
-            print(f"Error updating applicant status: {e}")
+            print(f"Error bulk updating applicant status: {e}")
+            return None
+        finally:
+            write_path_stats.record(
+                "applicant_status.bulk",
+                round_trips,
+                (time.perf_counter() - started) * 1000,
+            )
+
+    @staticmethod
+    async def get_applicant_messages(
+        job_id: str,
+        application_id: str,
+        employer_id: str,
+        before: Optional[int] = None,
+        limit: int = 50,
+    ) -> Optional[Dict]:
+        """
+        Get one page of an applicant's message thread (employer only)
+        
+        Returns:
+            Dict with messages (oldest first) and next_before, or None if not found
+        """
+        try:
+            if not await JobService.is_job_owner(job_id, employer_id):
+                return None
+            applications_collection = Database.get_collection("applications")
+            application = await applications_collection.find_one(
+                {"_id": ObjectId(application_id), "job_id": job_id},
+                {"message_count": 1, "messages": 1, "thread_migration": 1},
+            )
+            if not application:
+                return None
+            application["_id"] = str(application["_id"])
+            return await MessageService.get_application_thread(application, before, limit)
+
+        except Exception as e:
+            print(f"Error getting applicant messages: {e}")
             return None
 
     @staticmethod
@@ -495,11 +839,9 @@ class JobService:
     ) -> Optional[Dict]:
         """Append a message in applicant negotiation thread"""
         try:
-            jobs_collection = Database.get_collection("jobs")
             applications_collection = Database.get_collection("applications")
 
-            job = await jobs_collection.find_one({"_id": ObjectId(job_id), "employer_id": employer_id})
-            if not job:
+            if not await JobService.is_job_owner(job_id, employer_id):
                 return None
 
             msg_doc = {
@@ -510,19 +852,20 @@ class JobService:
                 "sent_at": datetime.utcnow(),
             }
 
-            await applications_collection.update_one(
+            update_doc = MessageService.append_update(msg_doc)
+            update_doc["$set"].update({"status": "negotiating", "reviewed_at": datetime.utcnow()})
+            updated = await applications_collection.find_one_and_update(
                 {"_id": ObjectId(application_id), "job_id": job_id},
-                {
-                    "$set": {"status": "negotiating", "reviewed_at": datetime.utcnow()},
-                    "$push": {"messages": msg_doc}
-                }
+                update_doc,
+                return_document=ReturnDocument.AFTER,
             )
-
-            updated = await applications_collection.find_one({"_id": ObjectId(application_id), "job_id": job_id})
             if not updated:
                 return None
+
+            await MessageService.store(application_id, updated["message_count"] - 1, msg_doc)
+
             updated["_id"] = str(updated["_id"])
-            return updated
+            return await MessageService.attach_recent(updated)
 
         except Exception as e:
             print(f"Error sending applicant message: {e}")
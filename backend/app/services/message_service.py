@@ -0,0 +1,235 @@
+"""
+Message Service
+Application chat threads stored in count-bucketed documents
+"""
+import asyncio
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.core.database import Database
+
+
+# Application lists never carry chat threads (legacy embedded `messages` included)
+APPLICATION_LIST_PROJECTION = {"messages": 0}
+
+
+class MessageService:
+    """
+    Service class for application message threads
+
+    Document structure (application_messages collection):
+    {
+        "application_id": "65f0...",
+        "bucket": 0,                  # seq // APPLICATION_MESSAGE_BUCKET_SIZE
+        "count": 3,
+        "messages": [
+            {"seq": 0, "sender": "worker", "sender_name": "...", "message": "...",
+             "offer_amount": None, "sent_at": datetime},
+            ...
+        ],
+        "first_at": datetime,
+        "last_at": datetime
+    }
+
+    The application document only keeps `message_count` (which also hands out
+    sequence numbers) and `last_message`, so application lists never carry threads.
+    """
+
+    @staticmethod
+    def _collection():
+        return Database.get_collection("application_messages")
+
+    @staticmethod
+    def _bucket_of(seq: int) -> int:
+        return seq // max(1, settings.APPLICATION_MESSAGE_BUCKET_SIZE)
+
+    @staticmethod
+    def thread_fields(first_message: Dict[str, Any]) -> Dict[str, Any]:
+        """Thread summary fields for a new application whose first message is `first_message`"""
+        return {"message_count": 1, "last_message": first_message}
+
+    @staticmethod
+    def append_update(message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update operators recording a new message on the application document
+        Merge into the caller's update and run it with find_one_and_update (ReturnDocument.AFTER);
+        the new message's seq is then message_count - 1
+        """
+        return {"$inc": {"message_count": 1}, "$set": {"last_message": message}}
+
+    @staticmethod
+    async def store(application_id: str, seq: int, message: Dict[str, Any]):
+        """
+        Append a message to its bucket (creating the bucket when it starts)
+
+        Args:
+            application_id: Application the thread belongs to
+            seq: Sequence number assigned through message_count
+            message: Message document
+        """
+        sent_at = message.get("sent_at") if isinstance(message.get("sent_at"), datetime) else datetime.utcnow()
+        bucket_filter = {"application_id": str(application_id), "bucket": MessageService._bucket_of(seq)}
+        update = {
+            "$push": {"messages": {**message, "seq": seq}},
+            "$inc": {"count": 1},
+            "$min": {"first_at": sent_at},
+            "$max": {"last_at": sent_at},
+        }
+        try:
+            await MessageService._collection().update_one(bucket_filter, update, upsert=True)
+        except DuplicateKeyError:
+            # Two writers created the same new bucket at once; the loser retries as a plain update
+            await MessageService._collection().update_one(bucket_filter, update)
+
+    @staticmethod
+    async def start_thread(application_id: str, first_message: Dict[str, Any]):
+        """Store the first message (seq 0) of a newly created application"""
+        await MessageService.store(application_id, 0, first_message)
+
+    @staticmethod
+    async def insert_with_thread(applications_collection, application: Dict[str, Any], first_message: Dict[str, Any]):
+        """
+        Insert a new application and its opening bucket concurrently (one round trip)
+        The application _id is generated up front so both writes can go out together.
+        If the insert is rejected the bucket is removed again and the error re-raised.
+
+        Args:
+            applications_collection: The applications collection
+            application: Application document (gets its _id set here)
+            first_message: First message of the thread
+        """
+        application["_id"] = ObjectId()
+        application_id = str(application["_id"])
+        inserted, thread = await asyncio.gather(
+            applications_collection.insert_one(application),
+            MessageService.start_thread(application_id, first_message),
+            return_exceptions=True,
+        )
+        if isinstance(inserted, BaseException):
+            try:
+                await MessageService._collection().delete_many({"application_id": application_id})
+            except Exception as e:
+                print(f"Error removing thread of rejected application: {e}")
+            raise inserted
+        if isinstance(thread, BaseException):
+            # The application is stored; retry its opening bucket once
+            await MessageService.start_thread(application_id, first_message)
+
+    @staticmethod
+    async def get_thread(
+        application_id: str,
+        message_count: int,
+        before: Optional[int] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of a thread, oldest first, ending just before `before`
+
+        Args:
+            application_id: Application the thread belongs to
+            message_count: The application's message_count
+            before: Sequence number from a previous page's next_before (None for the latest page)
+            limit: Page size
+
+        Returns:
+            Dict with messages and next_before (None when the start of the thread was reached)
+        """
+        end = message_count if before is None else max(0, min(before, message_count))
+        start = max(0, end - limit)
+        if end <= start:
+            return {"messages": [], "next_before": None}
+
+        cursor = MessageService._collection().find(
+            {
+                "application_id": str(application_id),
+                "bucket": {"$gte": MessageService._bucket_of(start), "$lte": MessageService._bucket_of(end - 1)},
+            },
+            {"_id": 0, "messages": 1},
+        )
+        messages: List[Dict[str, Any]] = []
+        async for bucket in cursor:
+            messages.extend(m for m in bucket.get("messages", []) if start <= m.get("seq", -1) < end)
+        messages.sort(key=lambda m: m["seq"])
+
+        return {"messages": messages, "next_before": start if start > 0 else None}
+
+    @staticmethod
+    def merge_legacy_thread(
+        legacy: List[Dict[str, Any]],
+        buckets: List[Dict[str, Any]],
+        migration: Optional[Dict[str, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Full thread of an application still embedding its history, numbered as after migration:
+        the embedded messages first, then the bucketed ones shifted past them
+
+        Args:
+            legacy: The application's embedded `messages`
+            buckets: Every application_messages document of the application
+            migration: The application's thread_migration while the migration is rewriting it
+                ({"legacy_count", "total"}); rewritten buckets are flagged `renumbered` and
+                messages stored since then already use the new numbering (seq >= total)
+
+        Returns:
+            Messages with seq 0..n-1, oldest first
+        """
+        offset = len(legacy)
+        by_seq: Dict[int, Dict[str, Any]] = {}
+        for bucket in buckets:
+            for m in bucket.get("messages", []):
+                seq = m.get("seq", 0)
+                if migration and (bucket.get("renumbered") or seq >= migration["total"]):
+                    by_seq[seq] = m
+                else:
+                    by_seq.setdefault(seq + offset, {**m, "seq": seq + offset})
+        for seq, m in enumerate(legacy):
+            by_seq[seq] = {**{k: v for k, v in m.items() if k != "seq"}, "seq": seq}
+        return [by_seq[seq] for seq in sorted(by_seq)]
+
+    @staticmethod
+    async def get_application_thread(
+        application: Dict[str, Any],
+        before: Optional[int] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of an application's thread (see get_thread)
+        Applications not migrated yet still embed their history in `messages`; it is returned
+        whole, followed by anything bucketed since the deploy, numbered the way the migration will
+
+        Args:
+            application: Application document with _id, message_count, messages and
+                thread_migration (if any)
+            before: Sequence number from a previous page's next_before (None for the latest page)
+            limit: Page size
+
+        Returns:
+            Dict with messages and next_before
+        """
+        legacy = application.get("messages")
+        if not isinstance(legacy, list):
+            return await MessageService.get_thread(application["_id"], int(application.get("message_count", 0)), before, limit)
+
+        buckets = await MessageService._collection().find(
+            {"application_id": str(application["_id"])},
+            {"_id": 0, "messages": 1, "renumbered": 1},
+        ).to_list(length=None)
+        thread = MessageService.merge_legacy_thread(legacy, buckets, application.get("thread_migration"))
+        return {"messages": thread, "next_before": None}
+
+    @staticmethod
+    async def attach_recent(application: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the latest page of the thread as `messages` (single-application responses only)"""
+        if "message_count" not in application:
+            # Not migrated and never messaged since: the thread is still embedded in the document
+            return application
+        try:
+            page = await MessageService.get_application_thread(application, limit=settings.THREAD_PAGE_SIZE)
+            application["messages"] = page["messages"]
+            application["messages_next_before"] = page["next_before"]
+        except Exception as e:
+            print(f"Error loading application messages: {e}")
+            application.setdefault("messages", [])
+        return application
@@ -0,0 +1,276 @@
+"""
+Notification Service
+Persistence and inbox reads of user notifications (live push goes through NotificationManager)
+"""
+import asyncio
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from collections import Counter, defaultdict
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from app.core.bus import message_bus, user_channel
+from app.core.config import settings
+from app.core.database import Database
+from app.core.journal import notification_writer
+from app.core.pagination import keyset_filter
+
+
+class NotificationService:
+    """
+    Service class for stored notifications
+
+    Document structure (notifications collection):
+    {
+        "user_id": "65f0...",
+        "type": "negotiation_started",
+        "title": "...",
+        "message": "...",
+        ...                           # type-specific fields (negotiation_id, job_id, ...)
+        "read": False,
+        "seq": 42,                    # per-user, increasing in storage order
+        "created_at": datetime
+    }
+
+    Per-user counters live in notification_counters ({"_id": user_id, "seq": int, "unread": int}).
+    seq hands out sequence numbers when a batch is stored. unread is incremented at the same
+    point and decremented when notifications are marked read, so the badge count is a single
+    document read.
+
+    Stored notifications are pushed live once their batch is stored, carrying their seq, so a
+    reconnecting socket can ask for everything after the last seq it saw.
+    """
+
+    @staticmethod
+    def _collection():
+        return Database.get_collection("notifications")
+
+    @staticmethod
+    def _counters():
+        return Database.get_collection("notification_counters")
+
+    @staticmethod
+    def record(user_id: str, notification: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a notification for storage and live push (never waits on the database)
+        Stored and pushed within NOTIFICATION_FLUSH_INTERVAL_MS, and always stored before shutdown completes
+
+        Args:
+            user_id: Recipient
+            notification: Notification fields (type, title, message, ...)
+
+        Returns:
+            The queued document
+        """
+        doc = {
+            "user_id": str(user_id),
+            **notification,
+            "read": False,
+            "created_at": datetime.utcnow(),
+        }
+        notification_writer.append(doc)
+        return doc
+
+    @staticmethod
+    async def assign_seq(batch: List[Dict[str, Any]]):
+        """
+        Give each queued notification the next seq of its recipient (one counter update per
+        recipient per batch). Documents kept from a failed attempt keep their numbers.
+        """
+        per_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for doc in batch:
+            if "seq" not in doc:
+                per_user[doc["user_id"]].append(doc)
+
+        async def _reserve(user_id: str, docs: List[Dict[str, Any]]):
+            counter = await NotificationService._counters().find_one_and_update(
+                {"_id": user_id},
+                {"$inc": {"seq": len(docs)}},
+                projection={"seq": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            first = counter["seq"] - len(docs) + 1
+            for offset, doc in enumerate(docs):
+                doc["seq"] = first + offset
+
+        await asyncio.gather(*[_reserve(user_id, docs) for user_id, docs in per_user.items()])
+
+    @staticmethod
+    def live_message(doc: Dict[str, Any]) -> Dict[str, Any]:
+        """WebSocket payload of a stored notification"""
+        data = {k: v for k, v in doc.items() if k not in ("_id", "user_id", "read", "read_at", "seq", "created_at")}
+        return {
+            "type": "personal_notification",
+            "data": {**data, "notification_id": str(doc["_id"])},
+            "seq": doc["seq"],
+        }
+
+    @staticmethod
+    async def on_stored(batch: List[Dict[str, Any]]):
+        """
+        Add a stored batch to its recipients' unread counters (one bulk write per batch)
+        and push each notification to its recipient's sockets
+        """
+        per_user = Counter(doc["user_id"] for doc in batch if not doc.get("read"))
+        if per_user:
+            await NotificationService._counters().bulk_write(
+                [
+                    UpdateOne({"_id": user_id}, {"$inc": {"unread": count}}, upsert=True)
+                    for user_id, count in per_user.items()
+                ],
+                ordered=False,
+            )
+
+        for doc in batch:
+            try:
+                await message_bus.publish(user_channel(doc["user_id"]), NotificationService.live_message(doc))
+            except Exception as e:
+                print(f"Error publishing notification: {e}")
+
+    @staticmethod
+    async def get_since(user_id: str, last_seq: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get a user's notifications stored after `last_seq`, oldest first (reconnect replay)
+
+        Args:
+            user_id: Recipient
+            last_seq: Highest seq the client already received
+            limit: Most notifications returned (NOTIFICATION_REPLAY_LIMIT by default)
+
+        Returns:
+            List of notifications (empty on error)
+        """
+        limit = limit or settings.NOTIFICATION_REPLAY_LIMIT
+        try:
+            cursor = NotificationService._collection().find(
+                {"user_id": user_id, "seq": {"$gt": last_seq}},
+            ).sort("seq", 1).limit(limit)
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            print(f"Error getting notifications to replay: {e}")
+            return []
+
+    @staticmethod
+    def _inbox_cursor(user_id: str, unread_only: bool = False, cursor: Optional[str] = None):
+        """Motor cursor over a user's notifications, newest first (raises ValueError on a bad cursor)"""
+        query: Dict[str, Any] = {"user_id": user_id}
+        if unread_only:
+            query["read"] = False
+        if cursor:
+            query = {"$and": [query, keyset_filter("created_at", cursor)]}
+        return NotificationService._collection().find(query).sort([("created_at", -1), ("_id", -1)])
+
+    @staticmethod
+    async def get_notifications(
+        user_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        unread_only: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one page of a user's notifications, newest first
+
+        Args:
+            user_id: Recipient
+            limit: Page size
+            cursor: Opaque cursor from the previous page
+            unread_only: Only return unread notifications
+
+        Returns:
+            List of notifications
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        db_cursor = NotificationService._inbox_cursor(user_id, unread_only, cursor)
+
+        try:
+            notifications = await db_cursor.limit(limit).to_list(length=limit)
+            for notification in notifications:
+                notification["_id"] = str(notification["_id"])
+            return notifications
+        except Exception as e:
+            print(f"Error getting notifications: {e}")
+            return []
+
+    @staticmethod
+    async def get_unread_count(user_id: str) -> int:
+        """
+        Get a user's unread notification count from their counter document
+        Counters missing for a user are started at zero; counts from before counters
+        existed come from the notification_unread_counts migration
+        """
+        try:
+            counter = await NotificationService._counters().find_one_and_update(
+                {"_id": user_id},
+                {"$setOnInsert": {"unread": 0}},
+                projection={"unread": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return max(0, counter.get("unread", 0))
+        except Exception as e:
+            print(f"Error getting unread notification count: {e}")
+            return 0
+
+    @staticmethod
+    async def mark_read(user_id: str, notification_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Mark one of a user's notifications as read
+
+        Returns:
+            The notification, or None if it does not exist or belongs to someone else
+        """
+        if not ObjectId.is_valid(notification_id):
+            return None
+        try:
+            query = {"_id": ObjectId(notification_id), "user_id": user_id}
+            notification = await NotificationService._collection().find_one_and_update(
+                {**query, "read": False},
+                {"$set": {"read": True, "read_at": datetime.utcnow()}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if notification:
+                await NotificationService._counters().update_one(
+                    {"_id": user_id},
+                    {"$inc": {"unread": -1}},
+                )
+            else:
+                # Already read (or not this user's)
+                notification = await NotificationService._collection().find_one(query)
+                if not notification:
+                    return None
+            notification["_id"] = str(notification["_id"])
+            return notification
+        except Exception as e:
+            print(f"Error marking notification read: {e}")
+            return None
+
+    @staticmethod
+    async def mark_all_read(user_id: str) -> Optional[int]:
+        """
+        Mark every unread notification of a user as read
+
+        Returns:
+            Number of notifications marked, or None on error
+        """
+        try:
+            result = await NotificationService._collection().update_many(
+                {"user_id": user_id, "read": False},
+                {"$set": {"read": True, "read_at": datetime.utcnow()}},
+            )
+            if result.modified_count:
+                # Relative update: batches stored meanwhile keep their increments
+                await NotificationService._counters().update_one(
+                    {"_id": user_id},
+                    {"$inc": {"unread": -result.modified_count}},
+                )
+            return result.modified_count
+        except Exception as e:
+            print(f"Error marking notifications read: {e}")
+            return None
+
+
+# Sequence numbers are handed out per batch; counters and live pushes follow what was stored
+notification_writer.before_write = NotificationService.assign_seq
+notification_writer.on_written = NotificationService.on_stored
@@ -0,0 +1,16 @@
+"""
+Shared test setup
+Settings need a secret and a MongoDB URL to load; tests never connect to either.
+Async tests run on asyncio through the anyio pytest plugin (installed with FastAPI).
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:1")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
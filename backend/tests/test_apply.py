@@ -0,0 +1,95 @@
+"""
+Tests for the two-step apply: counter increment, then the insert and opening bucket together
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.core.database import Database
+from app.schemas.job import ApplyJobRequest
+from app.services.job_service import JobService
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeDatabase:
+    """jobs, applications and application_messages with just enough behaviour for apply"""
+
+    def __init__(self, duplicate=False):
+        self.duplicate = duplicate
+        self.applicants_count = 0
+        self.applications = []
+        self.buckets = []
+        self.log = []
+
+    def get_collection(self, name):
+        return getattr(self, "_" + name)()
+
+    def _jobs(self):
+        return SimpleNamespace(find_one_and_update=self.inc_count, update_one=self.dec_count)
+
+    def _applications(self):
+        return SimpleNamespace(insert_one=self.insert)
+
+    def _application_messages(self):
+        return SimpleNamespace(update_one=self.store_bucket, delete_many=self.delete_buckets)
+
+    async def inc_count(self, query, update, projection=None):
+        self.log.append("inc")
+        self.applicants_count += 1
+        return {"_id": query["_id"]}
+
+    async def dec_count(self, query, update):
+        self.applicants_count -= 1
+
+    async def insert(self, doc):
+        self.log.append("insert:start")
+        await asyncio.sleep(0)
+        if self.duplicate:
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.applications.append(doc)
+        self.log.append("insert:end")
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def store_bucket(self, query, update, upsert=False):
+        self.log.append("bucket:start")
+        await asyncio.sleep(0)
+        self.buckets.append(query["application_id"])
+        self.log.append("bucket:end")
+
+    async def delete_buckets(self, query):
+        self.buckets = [b for b in self.buckets if b != query["application_id"]]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDatabase()
+    monkeypatch.setattr(Database, "get_collection", classmethod(lambda cls, name: fake.get_collection(name)))
+    return fake
+
+
+async def _apply():
+    return await JobService.apply_to_job(str(ObjectId()), "u1", "Ravi", "ravi@example.com", ApplyJobRequest(cover_letter="Hi"))
+
+
+async def test_insert_and_opening_bucket_go_out_together(db):
+    application = await _apply()
+
+    assert application["messages"][0]["seq"] == 0
+    assert db.buckets == [application["_id"]]
+    assert str(db.applications[0]["_id"]) == application["_id"]
+    # Nothing before the counter; then both writes start before either finishes
+    assert db.log[0] == "inc"
+    assert set(db.log[1:3]) == {"insert:start", "bucket:start"}
+
+
+async def test_duplicate_apply_releases_counter_and_bucket(db):
+    db.duplicate = True
+
+    assert await _apply() is None
+    assert db.applicants_count == 0
+    assert db.buckets == []
@@ -0,0 +1,132 @@
+"""
+Tests for the message bus backends
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core.bus import InProcessBus, RedisBus, create_bus, user_channel
+from app.core.config import settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels = set()
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=1.0):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class FakeRedis:
+    """Publishing loops straight back into the pub/sub connection"""
+
+    def __init__(self):
+        self.pubsub_connection = FakePubSub()
+        self.payloads = []
+
+    async def publish(self, channel, payload):
+        self.payloads.append(payload)
+        if channel in self.pubsub_connection.channels:
+            await self.pubsub_connection.messages.put({"type": "message", "channel": channel, "data": payload})
+
+
+def _redis_bus():
+    bus = RedisBus()
+    bus.client = FakeRedis()
+    bus.pubsub = bus.client.pubsub_connection
+    return bus
+
+
+async def test_in_process_publish_reaches_the_subscribed_handler():
+    bus = InProcessBus()
+    received = []
+
+    async def handler(message):
+        received.append(message)
+
+    await bus.subscribe(user_channel("u1"), handler)
+    await bus.publish(user_channel("u1"), {"type": "notification"})
+    await bus.publish(user_channel("u2"), {"type": "notification"})
+
+    assert received == [{"type": "notification"}]
+    assert bus.stats()["published"] == 2
+    assert bus.stats()["received"] == 1
+
+
+async def test_unsubscribed_channels_are_not_delivered():
+    bus = InProcessBus()
+    received = []
+
+    async def handler(message):
+        received.append(message)
+
+    await bus.subscribe("negotiation:n1", handler)
+    await bus.unsubscribe("negotiation:n1")
+    await bus.publish("negotiation:n1", {"type": "message"})
+
+    assert received == []
+    assert bus.stats()["channels"] == 0
+
+
+async def test_handler_errors_are_counted_not_raised():
+    bus = InProcessBus()
+
+    async def handler(message):
+        raise RuntimeError("socket gone")
+
+    await bus.subscribe("user:u1", handler)
+    await bus.publish("user:u1", {})
+
+    assert bus.stats()["errors"] == 1
+
+
+async def test_redis_subscriptions_are_prefixed_once():
+    bus = _redis_bus()
+
+    async def handler(message):
+        pass
+
+    await bus.subscribe("user:u1", handler)
+    await bus.subscribe("user:u1", handler)
+    assert bus.pubsub.channels == {f"{settings.MESSAGE_BUS_CHANNEL_PREFIX}user:u1"}
+
+    await bus.unsubscribe("user:u1")
+    assert bus.pubsub.channels == set()
+
+
+async def test_redis_messages_are_json_encoded_and_dispatched_by_channel():
+    bus = _redis_bus()
+    received = asyncio.Queue()
+    await bus.subscribe("user:u1", received.put)
+    bus._reader = asyncio.create_task(bus._read())
+    try:
+        await bus.publish("user:u1", {"created_at": datetime(2024, 1, 2, 3, 4, 5)})
+        message = await asyncio.wait_for(received.get(), 1)
+    finally:
+        bus._reader.cancel()
+        await asyncio.gather(bus._reader, return_exceptions=True)
+
+    assert json.loads(bus.client.payloads[0]) == {"created_at": "2024-01-02T03:04:05"}
+    assert message == {"created_at": "2024-01-02T03:04:05"}
+
+
+def test_create_bus_follows_the_setting(monkeypatch):
+    monkeypatch.setattr(settings, "MESSAGE_BUS", "redis")
+    assert isinstance(create_bus(), RedisBus)
+    monkeypatch.setattr(settings, "MESSAGE_BUS", "memory")
+    assert isinstance(create_bus(), InProcessBus)
@@ -0,0 +1,113 @@
+"""
+Tests for the heartbeat sweeper: pings, idle reaping and registry pruning
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.api import notifications as notifications_api
+from app.core.config import settings
+from app.core.outbound import IDLE_CLOSE_CODE, HeartbeatSweeper, OutboundSocket
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = (code, reason)
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture(autouse=True)
+def timeouts(monkeypatch):
+    monkeypatch.setattr(settings, "WS_PING_INTERVAL_SECONDS", 10)
+    monkeypatch.setattr(settings, "WS_IDLE_TIMEOUT_SECONDS", 30)
+
+
+def _socket(quiet_for: float) -> OutboundSocket:
+    sock = OutboundSocket(FakeWebSocket())
+    sock.last_seen = sock.last_ping = time.monotonic() - quiet_for
+    return sock
+
+
+async def test_quiet_sockets_are_pinged_once_per_interval():
+    sweeper = HeartbeatSweeper()
+    quiet, active = _socket(15), _socket(1)
+
+    await sweeper.sweep()
+    await sweeper.sweep()
+    await _settle()
+
+    assert quiet.ws.sent == [{"type": "ping"}]
+    assert active.ws.sent == []
+    assert sweeper.pings == 1
+    quiet.discard()
+    active.discard()
+
+
+async def test_silent_sockets_are_reaped():
+    sweeper = HeartbeatSweeper()
+    silent, answering = _socket(45), _socket(45)
+    answering.touch()
+
+    await sweeper.sweep()
+    await _settle()
+
+    assert silent.closed and silent.ws.closed_with == (IDLE_CLOSE_CODE, "Idle timeout")
+    assert not answering.closed
+    assert sweeper.reaped == 1
+    answering.discard()
+
+
+async def test_prune_hooks_drop_reaped_sockets_from_the_registry(monkeypatch):
+    released = []
+
+    async def release(user_id):
+        released.append(user_id)
+        notifications_api.active_connections.pop(user_id, None)
+
+    monkeypatch.setattr(notifications_api.NotificationManager, "_release", staticmethod(release))
+    sweeper = HeartbeatSweeper()
+    sweeper.register("notifications", notifications_api.prune_connections)
+    silent, alive = _socket(45), _socket(1)
+    notifications_api.active_connections.update({"u1": [silent], "u2": [alive]})
+    try:
+        await sweeper.sweep()
+    finally:
+        notifications_api.active_connections.clear()
+    alive.discard()
+
+    assert released == ["u1"]
+    assert sweeper.pruned == 1
+
+
+async def test_a_failing_prune_hook_does_not_stop_the_sweep():
+    sweeper = HeartbeatSweeper()
+    counted = []
+
+    async def broken():
+        raise RuntimeError("registry gone")
+
+    async def working():
+        counted.append(1)
+        return 0
+
+    sweeper.register("broken", broken)
+    sweeper.register("working", working)
+    await sweeper.sweep()
+
+    assert counted == [1]
+    assert sweeper.sweeps == 1
@@ -0,0 +1,152 @@
+"""
+Tests for the write-behind journal: batching, retries, hooks and shutdown
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.core import journal as journal_module
+from app.core.config import settings
+from app.core.journal import WriteBehindJournal
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCollection:
+    """Records insert_many calls; `fail` is raised once if set, `delay` stalls each insert"""
+
+    def __init__(self, fail=None, delay=0.0):
+        self.inserted = []
+        self.calls = 0
+        self.fail = fail
+        self.delay = delay
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail is not None:
+            error, self.fail = self.fail, None
+            raise error
+        self.inserted.extend(docs)
+        return SimpleNamespace(inserted_ids=list(range(len(docs))))
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    fake = FakeCollection()
+    monkeypatch.setattr(journal_module.Database, "get_collection", staticmethod(lambda name: fake))
+    return fake
+
+
+async def test_flush_writes_buffer(collection):
+    journal = WriteBehindJournal("test")
+    for n in range(3):
+        journal.append({"n": n})
+    await journal.flush()
+
+    assert [entry["n"] for entry in collection.inserted] == [0, 1, 2]
+    assert journal.buffer == []
+    assert journal.written == 3
+
+
+async def test_failed_batch_goes_back_in_front(collection):
+    journal = WriteBehindJournal("test")
+    journal.append({"n": 0})
+    journal.append({"n": 1})
+    collection.fail = RuntimeError("unreachable")
+    await journal.flush()
+
+    journal.append({"n": 2})
+    assert [entry["n"] for entry in journal.buffer] == [0, 1, 2]
+    assert journal.failed_batches == 1
+
+    await journal.flush()
+    assert [entry["n"] for entry in collection.inserted] == [0, 1, 2]
+
+
+async def test_bulk_error_retries_only_rejected_entries(collection):
+    journal = WriteBehindJournal("test")
+    for n in range(3):
+        journal.append({"n": n})
+    collection.fail = BulkWriteError({
+        "writeErrors": [
+            {"index": 0, "code": 11000},  # stored by an earlier attempt
+            {"index": 2, "code": 91},     # transient; must be retried
+        ]
+    })
+    await journal.flush()
+
+    assert [entry["n"] for entry in journal.buffer] == [2]
+    assert journal.written == 1
+
+
+async def test_overflow_drops_oldest_entries(collection, monkeypatch):
+    monkeypatch.setattr(settings, "JOURNAL_MAX_BUFFER", 2)
+    journal = WriteBehindJournal("test")
+    for n in range(4):
+        journal.append({"n": n})
+
+    assert [entry["n"] for entry in journal.buffer] == [2, 3]
+    assert journal.dropped == 2
+
+
+async def test_hooks_run_around_each_batch(collection):
+    seen = {}
+
+    async def before_write(batch):
+        for i, entry in enumerate(batch):
+            entry["seq"] = i
+
+    async def on_written(batch):
+        seen["written"] = [entry["n"] for entry in batch]
+
+    journal = WriteBehindJournal("test", before_write=before_write, on_written=on_written)
+    for n in range(3):
+        journal.append({"n": n})
+    await journal.flush()
+
+    assert [entry["seq"] for entry in collection.inserted] == [0, 1, 2]
+    assert seen["written"] == [0, 1, 2]
+
+
+async def test_on_written_skips_rejected_entries(collection):
+    written = []
+
+    async def on_written(batch):
+        written.extend(entry["n"] for entry in batch)
+
+    journal = WriteBehindJournal("test", on_written=on_written)
+    for n in range(3):
+        journal.append({"n": n})
+    collection.fail = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}, {"index": 2, "code": 91}]})
+    await journal.flush()
+
+    assert written == [1]
+
+
+async def test_per_journal_buffer_limit(collection):
+    journal = WriteBehindJournal("test", batch_size=100, max_buffer=2)
+    for n in range(4):
+        journal.append({"n": n})
+
+    assert [entry["n"] for entry in journal.buffer] == [2, 3]
+
+
+async def test_stop_keeps_the_batch_being_written(collection):
+    collection.delay = 0.05
+    journal = WriteBehindJournal("test", flush_interval_ms=1, batch_size=1)
+    journal.start()
+    journal.append({"n": 0})
+
+    # Let the writer take the batch and start inserting it
+    while collection.calls == 0:
+        await asyncio.sleep(0)
+    journal.append({"n": 1})
+    await journal.stop()
+
+    assert [entry["n"] for entry in collection.inserted] == [0, 1]
+    assert journal.buffer == []
@@ -0,0 +1,78 @@
+"""
+Tests for LeaseTable against a mocked leases collection (multi-worker mode)
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.core import leases as leases_module
+from app.core.bus import WORKER_ID
+from app.core.leases import LeaseTable
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    monkeypatch.setattr(leases_module.settings, "MESSAGE_BUS", "redis")
+    fake = MagicMock()
+    fake.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    fake.update_many = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    fake.distinct = AsyncMock(return_value=[])
+    fake.delete_one = AsyncMock()
+    fake.delete_many = AsyncMock()
+    monkeypatch.setattr(leases_module.Database, "get_collection", staticmethod(lambda name: fake))
+    return fake
+
+
+async def test_acquire_takes_free_or_expired_lease(collection):
+    table = LeaseTable("leases", ttl_seconds=30)
+
+    assert await table.acquire("a") is True
+    assert table.held == {"a"}
+
+    query, update = collection.update_one.call_args.args
+    assert query["_id"] == "a"
+    assert {"owner": WORKER_ID} in query["$or"]
+    assert update["$set"]["owner"] == WORKER_ID
+    assert collection.update_one.call_args.kwargs["upsert"] is True
+
+
+async def test_acquire_fails_while_another_worker_holds_it(collection):
+    collection.update_one.side_effect = DuplicateKeyError("E11000 duplicate key")
+    table = LeaseTable("leases", ttl_seconds=30)
+
+    assert await table.acquire("a") is False
+    assert table.held == set()
+
+
+async def test_renew_reports_leases_taken_over(collection):
+    table = LeaseTable("leases", ttl_seconds=30)
+    await table.acquire("a")
+    await table.acquire("b")
+    collection.distinct.return_value = ["a"]
+
+    lost = await table.renew()
+
+    assert lost == {"b"}
+    assert table.held == {"a"}
+    assert table.stats() == {"held": 1, "lost": 1}
+    query = collection.update_many.call_args.args[0]
+    assert sorted(query["_id"]["$in"]) == ["a", "b"]
+    assert query["owner"] == WORKER_ID
+
+
+async def test_local_mode_never_touches_the_database(collection, monkeypatch):
+    monkeypatch.setattr(leases_module.settings, "MESSAGE_BUS", "memory")
+    table = LeaseTable("leases", ttl_seconds=30)
+
+    assert await table.acquire("a") is True
+    assert await table.renew() == set()
+    await table.release("a")
+
+    collection.update_one.assert_not_called()
+    collection.update_many.assert_not_called()
+    collection.delete_one.assert_not_called()
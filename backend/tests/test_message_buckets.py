@@ -0,0 +1,130 @@
+"""
+Tests for bucketed application threads: rollover, paging, attach_recent and legacy merging
+"""
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import Database
+from app.services.message_service import MessageService
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class FakeBuckets:
+    """application_messages supporting the store() upsert and the thread queries"""
+
+    def __init__(self):
+        self.docs = []
+
+    def _matches(self, doc, query):
+        for key, value in query.items():
+            if isinstance(value, dict):
+                if not value.get("$gte", doc[key]) <= doc[key] <= value.get("$lte", doc[key]):
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if self._matches(d, query)), None)
+        if doc is None:
+            assert upsert
+            doc = {**query, "messages": [], "count": 0}
+            self.docs.append(doc)
+        doc["messages"].append(update["$push"]["messages"])
+        doc["count"] += update["$inc"]["count"]
+
+    def find(self, query, projection=None):
+        return FakeCursor([d for d in self.docs if self._matches(d, query)])
+
+
+@pytest.fixture
+def buckets(monkeypatch):
+    fake = FakeBuckets()
+    monkeypatch.setattr(Database, "get_collection", classmethod(lambda cls, name: fake))
+    monkeypatch.setattr(settings, "APPLICATION_MESSAGE_BUCKET_SIZE", 3)
+    monkeypatch.setattr(settings, "THREAD_PAGE_SIZE", 4)
+    return fake
+
+
+async def _send(count, application_id="a1"):
+    for seq in range(count):
+        await MessageService.store(application_id, seq, {"text": f"m{seq}", "sent_at": datetime(2024, 1, 1, 0, seq)})
+
+
+async def test_store_rolls_over_to_a_new_bucket_when_full(buckets):
+    await _send(7)
+
+    assert [(d["bucket"], d["count"]) for d in buckets.docs] == [(0, 3), (1, 3), (2, 1)]
+    assert [m["seq"] for m in buckets.docs[1]["messages"]] == [3, 4, 5]
+
+
+async def test_get_thread_pages_backwards_across_buckets(buckets):
+    await _send(7)
+
+    latest = await MessageService.get_thread("a1", 7, limit=4)
+    older = await MessageService.get_thread("a1", 7, before=latest["next_before"], limit=4)
+
+    assert [m["seq"] for m in latest["messages"]] == [3, 4, 5, 6]
+    assert [m["seq"] for m in older["messages"]] == [0, 1, 2]
+    assert older["next_before"] is None
+
+
+async def test_attach_recent_adds_the_latest_page(buckets):
+    await _send(5)
+    application = {"_id": "a1", "message_count": 5}
+
+    await MessageService.attach_recent(application)
+
+    assert [m["seq"] for m in application["messages"]] == [1, 2, 3, 4]
+    assert application["messages_next_before"] == 1
+
+
+async def test_attach_recent_leaves_unmigrated_threads_embedded(buckets):
+    application = {"_id": "a1", "messages": [{"text": "old"}]}
+
+    await MessageService.attach_recent(application)
+
+    assert application["messages"] == [{"text": "old"}]
+
+
+async def test_attach_recent_merges_legacy_history_with_newer_buckets(buckets):
+    await _send(2)
+    application = {"_id": "a1", "message_count": 2, "messages": [{"text": "old0"}, {"text": "old1"}]}
+
+    await MessageService.attach_recent(application)
+
+    assert [(m["seq"], m["text"]) for m in application["messages"]] == [(0, "old0"), (1, "old1"), (2, "m0"), (3, "m1")]
+
+
+def test_merge_legacy_thread_mid_migration():
+    legacy = [{"text": "old0"}, {"text": "old1"}]
+    migration = {"legacy_count": 2, "total": 4}
+    buckets = [
+        # Old numbering, not rewritten yet: m0 becomes seq 2
+        {"messages": [{"seq": 0, "text": "m0"}, {"seq": 1, "text": "m1"}]},
+        # Already rewritten, plus a message sent after the claim
+        {"renumbered": True, "messages": [{"seq": 3, "text": "m1"}, {"seq": 4, "text": "new"}]},
+    ]
+
+    thread = MessageService.merge_legacy_thread(legacy, buckets, migration)
+
+    assert [(m["seq"], m["text"]) for m in thread] == [(0, "old0"), (1, "old1"), (2, "m0"), (3, "m1"), (4, "new")]
@@ -0,0 +1,31 @@
+"""
+Tests for connection pool monitoring used by /ready
+"""
+from types import SimpleNamespace
+
+from app.core.monitoring import PoolMonitor
+
+
+def _event(host, port=27017):
+    return SimpleNamespace(address=(host, port))
+
+
+def test_checked_out_is_tracked_per_server():
+    monitor = PoolMonitor()
+    for _ in range(3):
+        monitor.connection_checked_out(_event("primary"))
+    monitor.connection_checked_out(_event("secondary"))
+    monitor.connection_checked_in(_event("primary"))
+
+    stats = monitor.stats()
+    assert stats["checked_out"] == 3
+    assert stats["checked_out_by_server"] == {"primary:27017": 2, "secondary:27017": 1}
+    assert stats["max_server_checked_out"] == 2
+
+
+def test_closed_pool_is_forgotten():
+    monitor = PoolMonitor()
+    monitor.connection_checked_out(_event("old"))
+    monitor.pool_closed(_event("old"))
+
+    assert monitor.stats()["max_server_checked_out"] == 0
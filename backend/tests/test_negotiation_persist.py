@@ -0,0 +1,99 @@
+"""
+Tests for appending live negotiation sessions to their stored document
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+
+from app.api import negotiation
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeNegotiations:
+    """Single stored negotiation honouring the message_count guard of _count_filter"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+        expected = query["$or"][0]["message_count"]
+        if expected != len(self.messages):
+            return SimpleNamespace(matched_count=0)
+        self.messages.extend(update.get("$push", {}).get("messages", {}).get("$each", []))
+        return SimpleNamespace(matched_count=1)
+
+    async def find_one(self, query, projection=None):
+        return {"_id": query["_id"], "message_count": len(self.messages)}
+
+
+def _message(n):
+    return {"sender_id": "w", "message": f"m{n}", "offer_amount": None}
+
+
+@pytest.fixture
+def session(monkeypatch):
+    nid = str(ObjectId())
+    doc = {
+        "_id": ObjectId(nid),
+        "worker_id": "w",
+        "employer_id": "e",
+        "original_price": 500,
+        "messages": [_message(0), _message(1)],
+    }
+    session = negotiation._session_from_doc(doc)
+    session["owner"] = True
+    for n in (2, 3):
+        negotiation._record_message(session, _message(n))
+    monkeypatch.setitem(negotiation.active_sessions, nid, session)
+    return session
+
+
+@pytest.fixture
+def journal(monkeypatch):
+    fake = MagicMock()
+    fake.delete_many = AsyncMock()
+    monkeypatch.setattr(negotiation, "_journal_col", lambda: fake)
+    return fake
+
+
+async def test_appends_only_unflushed_messages(session, journal, monkeypatch):
+    stored = FakeNegotiations([_message(0), _message(1)])
+    monkeypatch.setattr(negotiation, "_col", lambda: stored)
+
+    await negotiation._persist_session(session["negotiation_id"])
+
+    assert [m["message"] for m in stored.messages] == ["m0", "m1", "m2", "m3"]
+    assert len(stored.updates) == 1
+    assert stored.updates[0][1]["$set"]["message_count"] == 4
+    assert session["flushed"] == 4
+    journal.delete_many.assert_awaited_once_with(
+        {"negotiation_id": session["negotiation_id"], "seq": {"$lt": 4}}
+    )
+
+
+async def test_count_guard_retries_after_journal_recovery(session, journal, monkeypatch):
+    # Recovery already appended m2 from the journal, so the first append misses the guard
+    stored = FakeNegotiations([_message(0), _message(1), _message(2)])
+    monkeypatch.setattr(negotiation, "_col", lambda: stored)
+
+    await negotiation._persist_session(session["negotiation_id"])
+
+    assert [m["message"] for m in stored.messages] == ["m0", "m1", "m2", "m3"]
+    assert len(stored.updates) == 2
+    first, retry = stored.updates
+    assert first[0]["$or"][0] == {"message_count": 2}
+    assert retry[0]["$or"][0] == {"message_count": 3}
+    assert [m["message"] for m in retry[1]["$push"]["messages"]["$each"]] == ["m3"]
+    assert session["flushed"] == 4
+
+
+async def test_count_filter_guards_legacy_documents_by_size():
+    legacy = negotiation._count_filter(3)["$or"][1]
+
+    assert legacy == {"message_count": {"$exists": False}, "messages": {"$size": 3}}
@@ -0,0 +1,190 @@
+"""
+Tests for notification unread counters, sequence numbers and reconnect replay
+"""
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.api import notifications as notifications_api
+from app.core.database import Database
+from app.services.notification_service import NotificationService
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCounters:
+    """notification_counters with the operators the service uses"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            doc = self.docs[query["_id"]] = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        return dict(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            if not upsert:
+                return SimpleNamespace(modified_count=0)
+            doc = self.docs[query["_id"]] = {"_id": query["_id"]}
+        for field, amount in update["$inc"].items():
+            doc[field] = doc.get(field, 0) + amount
+        return SimpleNamespace(modified_count=1)
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+
+class FakeNotifications:
+    def __init__(self):
+        self.docs = []
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        for doc in self.docs:
+            if all(doc.get(k) == v for k, v in query.items()):
+                doc.update(update["$set"])
+                return dict(doc)
+        return None
+
+    async def find_one(self, query):
+        return next((dict(d) for d in self.docs if all(d.get(k) == v for k, v in query.items())), None)
+
+    async def update_many(self, query, update):
+        matched = [d for d in self.docs if all(d.get(k) == v for k, v in query.items())]
+        for doc in matched:
+            doc.update(update["$set"])
+        return SimpleNamespace(modified_count=len(matched))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    collections = {"notification_counters": FakeCounters(), "notifications": FakeNotifications()}
+    monkeypatch.setattr(Database, "get_collection", classmethod(lambda cls, name: collections[name]))
+    monkeypatch.setattr("app.services.notification_service.message_bus.publish", _discard)
+    return SimpleNamespace(counters=collections["notification_counters"], notifications=collections["notifications"])
+
+
+async def _discard(channel, message):
+    pass
+
+
+def _stored(user_id, **fields):
+    return {"_id": ObjectId(), "user_id": user_id, "read": False, "seq": 1, **fields}
+
+
+async def test_unread_count_starts_at_zero_for_new_users(db):
+    assert await NotificationService.get_unread_count("u1") == 0
+    assert db.counters.docs["u1"]["unread"] == 0
+
+
+async def test_unread_count_keeps_an_existing_counter(db):
+    db.counters.docs["u1"] = {"_id": "u1", "seq": 9, "unread": 4}
+
+    assert await NotificationService.get_unread_count("u1") == 4
+    assert db.counters.docs["u1"] == {"_id": "u1", "seq": 9, "unread": 4}
+
+
+async def test_stored_batches_increment_unread_per_user(db):
+    await NotificationService.on_stored([_stored("u1"), _stored("u1"), _stored("u2"), _stored("u2", read=True)])
+
+    assert await NotificationService.get_unread_count("u1") == 2
+    assert await NotificationService.get_unread_count("u2") == 1
+
+
+async def test_marking_read_decrements_unread_once(db):
+    doc = _stored("u1")
+    db.notifications.docs.append(doc)
+    await NotificationService.on_stored([doc])
+
+    await NotificationService.mark_read("u1", str(doc["_id"]))
+    again = await NotificationService.mark_read("u1", str(doc["_id"]))
+
+    assert again["read"] is True
+
+    assert await NotificationService.get_unread_count("u1") == 0
+
+
+async def test_mark_all_read_subtracts_what_it_marked(db):
+    docs = [_stored("u1") for _ in range(3)]
+    db.notifications.docs.extend(docs)
+    await NotificationService.on_stored(docs)
+    await NotificationService.on_stored([_stored("u1")])  # stored after the others
+
+    assert await NotificationService.mark_all_read("u1") == 3
+    assert await NotificationService.get_unread_count("u1") == 1
+
+
+async def test_assign_seq_numbers_each_user_in_batch_order(db):
+    db.counters.docs["u1"] = {"_id": "u1", "seq": 5}
+    batch = [{"user_id": "u1"}, {"user_id": "u2"}, {"user_id": "u1"}, {"user_id": "u2", "seq": 1}]
+
+    await NotificationService.assign_seq(batch)
+
+    assert [doc["seq"] for doc in batch] == [6, 1, 7, 1]
+    assert db.counters.docs["u1"]["seq"] == 7
+
+
+async def test_assign_seq_keeps_numbers_from_a_failed_attempt(db):
+    batch = [{"user_id": "u1"}, {"user_id": "u1"}]
+    await NotificationService.assign_seq(batch)
+    await NotificationService.assign_seq(batch)
+
+    assert [doc["seq"] for doc in batch] == [1, 2]
+    assert db.counters.docs["u1"]["seq"] == 2
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+        return True
+
+
+def _live(seq):
+    return {"type": "personal_notification", "data": {}, "seq": seq}
+
+
+async def test_replay_sends_the_gap_then_only_newer_held_pushes(monkeypatch):
+    conn = FakeSocket()
+    notifications_api._replaying[conn] = [_live(3), {"type": "broadcast"}, _live(5), _live(5), _live(6)]
+
+    async def get_since(user_id, last_seq):
+        return [_stored("u1", seq=seq) for seq in (3, 4, 5)]
+
+    monkeypatch.setattr(NotificationService, "get_since", staticmethod(get_since))
+    await notifications_api._replay("u1", conn, 2)
+
+    assert [(m["type"], m.get("seq")) for m in conn.sent] == [
+        ("personal_notification", 3),
+        ("personal_notification", 4),
+        ("personal_notification", 5),
+        ("replay_complete", None),
+        ("broadcast", None),
+        ("personal_notification", 6),
+    ]
+    assert conn.sent[3]["last_seq"] == 5
+    assert conn not in notifications_api._replaying
+
+
+async def test_replay_with_nothing_missed_keeps_the_client_seq(monkeypatch):
+    conn = FakeSocket()
+    notifications_api._replaying[conn] = [_live(8)]
+
+    async def get_since(user_id, last_seq):
+        return []
+
+    monkeypatch.setattr(NotificationService, "get_since", staticmethod(get_since))
+    await notifications_api._replay("u1", conn, 7)
+
+    assert conn.sent[0] == {"type": "replay_complete", "last_seq": 7, "truncated": False}
+    assert conn.sent[1]["seq"] == 8
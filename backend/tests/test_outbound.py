@@ -0,0 +1,85 @@
+"""
+Tests for OutboundSocket delivery and slow-consumer eviction
+"""
+import asyncio
+
+import pytest
+
+from app.core import outbound as outbound_module
+from app.core.outbound import OutboundSocket, SLOW_CONSUMER_CLOSE_CODE, live_sockets, outbound_stats
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeWebSocket:
+    """Records sent messages; sends block while `stalled` is set"""
+
+    def __init__(self, stalled=False):
+        self.sent = []
+        self.closed_with = None
+        self.stalled = stalled
+        self._release = asyncio.Event()
+
+    async def send_json(self, message):
+        if self.stalled:
+            await self._release.wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=None):
+        self.closed_with = (code, reason)
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def test_messages_are_sent_in_order_then_closed():
+    ws = FakeWebSocket()
+    sock = OutboundSocket(ws, max_queue=8)
+
+    assert sock.send({"n": 1})
+    assert sock.send({"n": 2})
+    sock.close(1000, "bye")
+    await sock.wait_closed(timeout=1)
+
+    assert ws.sent == [{"n": 1}, {"n": 2}]
+    assert ws.closed_with == (1000, "bye")
+    assert sock not in live_sockets
+    assert not sock.send({"n": 3})
+
+
+async def test_full_queue_evicts_the_slow_consumer():
+    ws = FakeWebSocket(stalled=True)
+    evicted = outbound_stats.evicted
+    opened = outbound_stats.open
+    sock = OutboundSocket(ws, max_queue=2)
+
+    assert sock.send({"n": 1})
+    await _settle()  # the writer is now stuck sending n=1
+    assert sock.send({"n": 2})
+    assert sock.send({"n": 3})
+    assert not sock.send({"n": 4})
+    await _settle()
+
+    assert sock.closed
+    assert outbound_stats.evicted == evicted + 1
+    assert ws.closed_with == (SLOW_CONSUMER_CLOSE_CODE, "Slow consumer")
+    assert sock not in live_sockets
+    assert outbound_stats.open == opened
+
+
+async def test_stalled_send_times_out_and_evicts(monkeypatch):
+    monkeypatch.setattr(outbound_module.settings, "WS_SEND_TIMEOUT_SECONDS", 0.01)
+    ws = FakeWebSocket(stalled=True)
+    evicted = outbound_stats.evicted
+    sock = OutboundSocket(ws, max_queue=8)
+
+    sock.send({"n": 1})
+    await asyncio.sleep(0.05)
+    await _settle()
+
+    assert sock.closed
+    assert outbound_stats.evicted == evicted + 1
+    assert ws.closed_with == (SLOW_CONSUMER_CLOSE_CODE, "Slow consumer")
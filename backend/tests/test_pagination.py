@@ -0,0 +1,83 @@
+"""
+Tests for keyset cursor pagination
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.api import jobs as jobs_api
+from app.core.pagination import decode_cursor, encode_cursor, keyset_filter, next_cursor, page_size
+
+
+def _matches(doc, condition):
+    """Evaluate the {"$or": [{field: {op: v}}, {field: v, "_id": {op: id}}]} shape of keyset_filter"""
+    ops = {"$lt": lambda a, b: a < b, "$gt": lambda a, b: a > b}
+    for branch in condition["$or"]:
+        ok = True
+        for field, expected in branch.items():
+            if isinstance(expected, dict):
+                (op, value), = expected.items()
+                ok = ok and ops[op](doc[field], value)
+            else:
+                ok = ok and doc[field] == expected
+        if ok:
+            return True
+    return False
+
+
+def test_cursor_round_trips_datetimes_and_plain_values():
+    doc_id = ObjectId()
+    when = datetime(2026, 1, 2, 3, 4, 5, 678000)
+
+    assert decode_cursor(encode_cursor(when, doc_id)) == (when, doc_id)
+    assert decode_cursor(encode_cursor(42, str(doc_id))) == (42, doc_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor(1, "x" * 24)[:-4]])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        keyset_filter("created_at", cursor)
+
+
+def test_pages_cover_every_document_once_across_timestamp_ties():
+    start = datetime(2026, 1, 1)
+    # Three documents share each timestamp, so _id has to break the ties
+    docs = [{"_id": ObjectId(), "created_at": start + timedelta(minutes=i // 3)} for i in range(10)]
+    ordered = sorted(docs, key=lambda d: (d["created_at"], d["_id"]), reverse=True)
+
+    seen, cursor = [], None
+    while True:
+        remaining = [d for d in ordered if cursor is None or _matches(d, keyset_filter("created_at", cursor))]
+        page = remaining[:4]
+        seen.extend(page)
+        cursor = next_cursor(page, 4, "created_at")
+        if cursor is None:
+            break
+
+    assert [d["_id"] for d in seen] == [d["_id"] for d in ordered]
+
+
+def test_short_page_has_no_next_cursor():
+    docs = [{"_id": ObjectId(), "created_at": datetime(2026, 1, 1)}]
+
+    assert next_cursor(docs, 2, "created_at") is None
+    assert next_cursor(docs, 1, "created_at") is not None
+
+
+def test_page_size_is_clamped(monkeypatch):
+    monkeypatch.setattr("app.core.pagination.settings.LIST_PAGE_SIZE", 100)
+    monkeypatch.setattr("app.core.pagination.settings.LIST_MAX_PAGE_SIZE", 500)
+
+    assert page_size(None) == 100
+    assert page_size(0) == 1
+    assert page_size(10_000) == 500
+
+
+@pytest.mark.anyio
+async def test_job_listing_rejects_a_bad_cursor_with_400():
+    with pytest.raises(HTTPException) as exc:
+        await jobs_api.get_jobs(cursor="garbage")
+
+    assert exc.value.status_code == 400
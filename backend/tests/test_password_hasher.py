@@ -0,0 +1,63 @@
+"""
+Tests for the bounded bcrypt executor and its fast 429 when saturated
+"""
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+
+from app.api import auth as auth_api
+from app.core import security
+from app.core.database import Database
+from app.core.security import PasswordHasherBusy, hash_password_async, verify_password_async
+from app.schemas.auth import LoginRequest
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    """Every worker busy and no queue slot left"""
+    monkeypatch.setattr(security.settings, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(security.settings, "PASSWORD_HASH_MAX_QUEUE", 0)
+    monkeypatch.setitem(security._password_hash_stats, "pending", 1)
+
+
+async def test_hash_and_verify_round_trip():
+    hashed = await hash_password_async("Secret123")
+
+    assert await verify_password_async("Secret123", hashed)
+    assert not await verify_password_async("Wrong123", hashed)
+    assert security._password_hash_stats["pending"] == 0
+
+
+async def test_full_queue_rejects_without_hashing(saturated):
+    rejected = security._password_hash_stats["rejected"]
+
+    with pytest.raises(PasswordHasherBusy):
+        await hash_password_async("Secret123")
+
+    assert security._password_hash_stats["rejected"] == rejected + 1
+    assert security._password_hash_stats["pending"] == 1
+
+
+async def test_login_returns_429_when_hasher_is_saturated(saturated, monkeypatch):
+    user = {
+        "_id": ObjectId(),
+        "email": "ravi@example.com",
+        "hashed_password": security.hash_password("Secret123"),
+        "role": "worker",
+        "is_active": True,
+    }
+
+    class FakeUsers:
+        async def find_one(self, query, projection=None):
+            return dict(user)
+
+    monkeypatch.setattr(Database, "get_collection", classmethod(lambda cls, name: FakeUsers()))
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_api.login(LoginRequest(email="ravi@example.com", password="Secret123"), Response())
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
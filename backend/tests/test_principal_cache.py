@@ -0,0 +1,96 @@
+"""
+Tests for the principal cache in AuthService.verify_user_token
+"""
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.api import auth as auth_api
+from app.core.database import Database
+from app.core.security import create_access_token
+from app.services import auth_service
+from app.services.auth_service import AuthService, principal_cache
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeUsers:
+    """One stored user; counts the reads that reach the collection"""
+
+    def __init__(self, user):
+        self.user = user
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        if query.get("_id") != self.user["_id"]:
+            return None
+        return dict(self.user)
+
+    async def update_one(self, query, update):
+        self.user.update(update["$set"])
+        return SimpleNamespace(modified_count=1)
+
+
+@pytest.fixture
+def users(monkeypatch):
+    fake = FakeUsers({
+        "_id": ObjectId(),
+        "email": "ravi@example.com",
+        "role": "worker",
+        "is_active": True,
+        "full_name": "Ravi",
+    })
+    monkeypatch.setattr(Database, "get_collection", classmethod(lambda cls, name: fake))
+    monkeypatch.setattr(auth_service.settings, "AUTH_MODE", "database")
+    principal_cache.clear()
+    yield fake
+    principal_cache.clear()
+
+
+def _token(user):
+    return create_access_token({"email": user["email"], "role": user["role"], "sub": str(user["_id"])})
+
+
+async def test_repeated_token_is_served_from_cache(users):
+    token = _token(users.user)
+    hits = principal_cache.hits
+
+    first = await AuthService.verify_user_token(token)
+    second = await AuthService.verify_user_token(token)
+
+    assert first == second
+    assert first["user_id"] == str(users.user["_id"])
+    assert users.reads == 1
+    assert principal_cache.hits == hits + 1
+
+
+async def test_different_tokens_do_not_share_entries(users):
+    await AuthService.verify_user_token(_token(users.user))
+    await AuthService.verify_user_token(_token(users.user))
+
+    assert users.reads == 2
+
+
+async def test_cached_principal_is_a_copy(users):
+    token = _token(users.user)
+    principal = await AuthService.verify_user_token(token)
+    principal["role"] = "employer"
+
+    assert (await AuthService.verify_user_token(token))["role"] == "worker"
+
+
+async def test_invalid_token_is_not_cached(users):
+    assert await AuthService.verify_user_token("not-a-token") is None
+    assert principal_cache.stats()["size"] == 0
+
+
+async def test_profile_update_invalidates_cached_principal(users):
+    token = _token(users.user)
+    assert (await AuthService.verify_user_token(token))["full_name"] == "Ravi"
+
+    await auth_api.update_profile(auth_api.UpdateProfileRequest(full_name="Ravi Kumar"), access_token=token)
+
+    assert (await AuthService.verify_user_token(token))["full_name"] == "Ravi Kumar"
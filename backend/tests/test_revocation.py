@@ -0,0 +1,78 @@
+"""
+Tests for token revocation: single tokens (logout) and every token of a user (logout-all)
+"""
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import Response
+
+from app.api import auth as auth_api
+from app.core.database import Database
+from app.core.revocation import RevocationList
+from app.core.security import create_access_token, decode_access_token
+from app.services import auth_service
+from app.services.auth_service import AuthService, principal_cache
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def revoked_tokens(monkeypatch):
+    fake = MagicMock()
+    fake.insert_one = AsyncMock()
+    monkeypatch.setattr(Database, "get_collection", classmethod(lambda cls, name: fake))
+    monkeypatch.setattr(RevocationList, "revoked_jtis", {})
+    monkeypatch.setattr(RevocationList, "user_cutoffs", {})
+    monkeypatch.setattr(auth_service.settings, "AUTH_MODE", "stateless")
+    principal_cache.clear()
+    return fake
+
+
+def _token(user_id="65f000000000000000000001"):
+    return create_access_token({"email": "ravi@example.com", "role": "worker", "name": "Ravi", "sub": user_id})
+
+
+async def test_logout_revokes_only_that_token(revoked_tokens):
+    token, other = _token(), _token()
+
+    assert await AuthService.revoke_token(token)
+
+    assert await AuthService.verify_user_token(token) is None
+    assert await AuthService.verify_user_token(other) is not None
+    stored = revoked_tokens.insert_one.call_args.args[0]
+    assert stored["jti"] == decode_access_token(token)["jti"]
+    assert stored["reason"] == "logout"
+
+
+async def test_logout_all_revokes_every_earlier_token(revoked_tokens):
+    user_id = "65f000000000000000000001"
+    first, second = _token(user_id), _token(user_id)
+    bystander = _token("65f000000000000000000002")
+
+    result = await auth_api.logout_all(Response(), user_id=user_id)
+
+    assert result["message"] == "Logged out of all sessions"
+    assert await AuthService.verify_user_token(first) is None
+    assert await AuthService.verify_user_token(second) is None
+    assert await AuthService.verify_user_token(bystander) is not None
+    assert revoked_tokens.insert_one.call_args.args[0]["jti"] is None
+
+
+async def test_login_right_after_logout_all_is_not_revoked(revoked_tokens):
+    user_id = "65f000000000000000000001"
+    await RevocationList.revoke_user(user_id)
+    time.sleep(0.001)
+
+    # Same second as the cutoff, but issued after it
+    fresh = _token(user_id)
+
+    assert await AuthService.verify_user_token(fresh) is not None
+
+
+def test_tokens_without_issue_time_are_revoked_with_their_user(revoked_tokens):
+    RevocationList.user_cutoffs["u1"] = time.time()
+
+    assert RevocationList.is_revoked({"sub": "u1"})
+    assert not RevocationList.is_revoked({"sub": "u2"})
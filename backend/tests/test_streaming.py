@@ -0,0 +1,61 @@
+"""
+Tests for NDJSON list streaming and the unpaged defaults of the my-* lists
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core.pagination import list_page_size
+from app.core.streaming import NDJSON_MEDIA_TYPE, ndjson_response
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def _documents(docs, fail_after=None):
+    for i, doc in enumerate(docs):
+        if fail_after is not None and i == fail_after:
+            raise RuntimeError("cursor died")
+        yield doc
+
+
+async def _read(response):
+    lines = []
+    async for chunk in response.body_iterator:
+        lines.append(chunk)
+    return lines
+
+
+async def test_each_document_is_one_json_line():
+    docs = [{"_id": "a", "created_at": datetime(2026, 1, 1)}, {"_id": "b", "title": "Plumber"}]
+    response = ndjson_response(_documents(docs))
+
+    lines = await _read(response)
+
+    assert response.media_type == NDJSON_MEDIA_TYPE
+    assert all(line.endswith(b"\n") for line in lines)
+    assert [json.loads(line) for line in lines] == [
+        {"_id": "a", "created_at": "2026-01-01T00:00:00"},
+        {"_id": "b", "title": "Plumber"},
+    ]
+
+
+async def test_mid_stream_failure_ends_with_error_line_and_aborts():
+    response = ndjson_response(_documents([{"n": 0}, {"n": 1}, {"n": 2}], fail_after=2))
+    lines = []
+
+    with pytest.raises(RuntimeError):
+        async for chunk in response.body_iterator:
+            lines.append(json.loads(chunk))
+
+    assert lines[:2] == [{"n": 0}, {"n": 1}]
+    assert "error" in lines[-1]
+
+
+def test_lists_stay_unpaged_without_limit_or_cursor(monkeypatch):
+    monkeypatch.setattr("app.core.pagination.settings.LIST_PAGE_SIZE", 100)
+
+    assert list_page_size(None, None) == 0
+    assert list_page_size(None, "abc") == 100
+    assert list_page_size(5, None) == 5
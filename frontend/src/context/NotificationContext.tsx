@@ -1,4 +1,4 @@
-import React, { createContext, useContext, useEffect, useState } from 'react';
+import React, { createContext, useContext, useEffect, useRef, useState } from 'react';
 import { AnimatePresence, motion } from 'framer-motion';
 import { X, Bell } from 'lucide-react';
 import { useNavigate, useLocation } from 'react-router-dom';
@@ -25,6 +25,8 @@ export const NotificationProvider: React.FC<{ children: React.ReactNode }> = ({
     const [notifications, setNotifications] = useState<NotificationMessage[]>([]);
     const navigate = useNavigate();
     const { user } = useAuth();
+    // Highest notification seq received; sent on reconnect so the server replays the gap
+    const lastSeqRef = useRef<number | null>(null);
 
     useEffect(() => {
         const token = localStorage.getItem('token');
@@ -38,11 +40,28 @@ export const NotificationProvider: React.FC<{ children: React.ReactNode }> = ({
         let reconnectTimer: ReturnType<typeof setTimeout>;
 
         const connect = () => {
-            ws = new WebSocket(wsUrl);
+            const lastSeq = lastSeqRef.current;
+            ws = new WebSocket(lastSeq === null ? wsUrl : `${wsUrl}&last_seq=${lastSeq}`);
 
             ws.onmessage = (event) => {
                 try {
                     const data = JSON.parse(event.data);
+                    if (data.type === 'ping') {
+                        // Server heartbeat: answer so the socket is not reaped as idle
+                        ws.send(JSON.stringify({ type: 'pong' }));
+                        return;
+                    }
+                    if (data.type === 'replay_complete') {
+                        if (lastSeqRef.current === null || data.last_seq > lastSeqRef.current) {
+                            lastSeqRef.current = data.last_seq;
+                        }
+                        return;
+                    }
+                    if (typeof data.seq === 'number') {
+                        // Already shown (replayed and pushed live around a reconnect)
+                        if (lastSeqRef.current !== null && data.seq <= lastSeqRef.current) return;
+                        lastSeqRef.current = data.seq;
+                    }
                     if (data.type === 'personal_notification' || data.type === 'broadcast') {
                         const newNotif = { ...data.data, id: Math.random().toString(36).substr(2, 9) };
                         setNotifications(prev => [...prev, newNotif]);
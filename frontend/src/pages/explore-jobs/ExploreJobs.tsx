@@ -406,6 +406,11 @@ const ExploreJobs: React.FC = () => {
         ws.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
+                if (data.type === 'ping') {
+                    // Server heartbeat: answer so the socket is not reaped as idle
+                    ws.send(JSON.stringify({ type: 'pong' }));
+                    return;
+                }
                 if (data.type === 'history') {
                     const msgs = (data.messages || []).map(mapWsMessage);
                     setNegotiationMessages(msgs);
@@ -266,6 +266,11 @@ const JobDetail: React.FC = () => {
         ws.onmessage = (event) => {
             try {
                 const data = JSON.parse(event.data);
+                if (data.type === 'ping') {
+                    // Server heartbeat: answer so the socket is not reaped as idle
+                    ws.send(JSON.stringify({ type: 'pong' }));
+                    return;
+                }
 
                 if (data.type === 'history') {
                     setNegotiationMessages((data.messages || []).map(mapWsMessage));